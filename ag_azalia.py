@@ -12,6 +12,7 @@ from datetime import datetime, timedelta
 import os
 import sys
 import random
+from services.seleccion import seleccion_torneo
 
 # Importar la clase AlgoritmoGeneticoGasolina
 class AlgoritmoGeneticoGasolina:
@@ -201,22 +202,9 @@ class AlgoritmoGeneticoGasolina:
         return beneficio_total - costo_total
     
     def _seleccionar_padres(self, poblacion, fitness):
-        """Selecciona individuos para reproducción mediante torneo"""
-        padres = []
-        
-        for _ in range(len(poblacion)):
-            # Selección por torneo (tamaño 3)
-            indices_torneo = random.sample(range(len(poblacion)), 3)
-            
-            # Elegir el mejor del torneo
-            idx_ganador = indices_torneo[0]
-            for idx in indices_torneo[1:]:
-                if fitness[idx] > fitness[idx_ganador]:
-                    idx_ganador = idx
-            
-            padres.append(poblacion[idx_ganador])
-        
-        return padres
+        """Selecciona individuos para reproducción mediante torneo (tamaño 3, vectorizado)"""
+        indices = seleccion_torneo(fitness, len(poblacion), tamano_torneo=3)
+        return [poblacion[idx] for idx in indices.tolist()]
     
     def _cruzar(self, padre1, padre2):
         """Operador de cruce para dos planes de distribución"""
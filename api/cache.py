@@ -0,0 +1,105 @@
+import gzip
+from functools import wraps
+from flask import request, Response, make_response
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él se sirve solo gzip
+    brotli = None
+
+
+class CacheRespuestas:
+    """Cache de respuestas JSON de solo lectura ligadas a la versión del catálogo.
+
+    Guarda el cuerpo ya serializado (y sus variantes comprimidas) de cada endpoint
+    mientras la versión del catálogo no cambie, de modo que las consultas repetidas
+    no vuelven a recorrer ni a serializar los datos. Implementa ETags fuertes y
+    respuestas 304 para las peticiones con If-None-Match.
+    """
+
+    def __init__(self, obtener_version, nivel_gzip=6, calidad_brotli=5):
+        """Inicializa la cache.
+
+        Args:
+            obtener_version (callable): Función sin argumentos que devuelve la versión actual del catálogo.
+            nivel_gzip (int): Nivel de compresión gzip (1-9).
+            calidad_brotli (int): Calidad de compresión brotli (0-11), si está disponible.
+        """
+        self.obtener_version = obtener_version
+        self.nivel_gzip = nivel_gzip
+        self.calidad_brotli = calidad_brotli
+        self._entradas = {}
+
+    def codificaciones_soportadas(self):
+        """Devuelve las codificaciones disponibles, en orden de preferencia."""
+        if brotli is not None:
+            return ['br', 'gzip', 'identity']
+        return ['gzip', 'identity']
+
+    def _comprimir(self, cuerpo):
+        """Genera las variantes del cuerpo para cada codificación soportada."""
+        variantes = {
+            'identity': cuerpo,
+            'gzip': gzip.compress(cuerpo, compresslevel=self.nivel_gzip)
+        }
+        if brotli is not None:
+            variantes['br'] = brotli.compress(cuerpo, quality=self.calidad_brotli)
+        return variantes
+
+    def _elegir_codificacion(self):
+        """Elige la mejor codificación aceptada por el cliente."""
+        codificacion = request.accept_encodings.best_match(self.codificaciones_soportadas())
+        return codificacion or 'identity'
+
+    def invalidar(self):
+        """Elimina todas las entradas de la cache."""
+        self._entradas = {}
+
+    def cachear(self, vista):
+        """Decorador para endpoints de solo lectura que dependen únicamente del catálogo.
+
+        La vista se ejecuta solo cuando no hay entrada para la versión actual; las
+        respuestas que no son 200 nunca se guardan. obtener_version debe leer el
+        mismo catálogo que la vista; si aun así la versión cambia mientras la vista
+        se ejecuta (una edición en memoria), la respuesta se sirve sin guardarla.
+        """
+        nombre = vista.__name__
+
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            version = self.obtener_version()
+            entrada = self._entradas.get(nombre)
+
+            if entrada is None or entrada['version'] != version:
+                # Las vistas pueden devolver tuplas (respuesta, código) en los errores
+                respuesta = make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200 or self.obtener_version() != version:
+                    return respuesta
+
+                entrada = {
+                    'version': version,
+                    'mimetype': respuesta.mimetype,
+                    'variantes': self._comprimir(respuesta.get_data())
+                }
+                # Reemplazo atómico: las versiones anteriores se descartan
+                self._entradas[nombre] = entrada
+
+            codificacion = self._elegir_codificacion()
+            etag = f"{nombre}-{entrada['version']}"
+            if codificacion != 'identity':
+                etag = f"{etag}-{codificacion}"
+
+            # If-None-Match usa comparación débil (RFC 7232, sección 3.2)
+            if request.if_none_match.contains_weak(etag):
+                respuesta = Response(status=304)
+            else:
+                respuesta = Response(entrada['variantes'][codificacion], mimetype=entrada['mimetype'])
+                if codificacion != 'identity':
+                    respuesta.headers['Content-Encoding'] = codificacion
+
+            respuesta.set_etag(etag)
+            respuesta.headers['Vary'] = 'Accept-Encoding'
+            respuesta.headers['Cache-Control'] = 'no-cache'
+            return respuesta
+
+        return envoltura
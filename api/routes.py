@@ -1,6 +1,9 @@
-from flask import Blueprint, jsonify, request
-from services.data_loader import DataLoader
-from services.optimizador import Optimizador
+from flask import Blueprint, g, jsonify, request
+from services.catalogo import GestorCatalogo
+from services.procesos_trayectoria import ProcesosTrayectoria
+from api.cache import CacheRespuestas
+import config
+import functools
 import traceback
 import time
 
@@ -11,13 +14,49 @@ def register_api(app):
 # Crear blueprint para la API
 api_bp = Blueprint('api', __name__)
 
-# Instancia global del DataLoader
-data_loader = DataLoader()
-data_loader.cargar_todo()
+# Gestor global del catálogo: cada petición toma la versión activa al comenzar
+# y la conserva hasta terminar, aunque se publique una nueva mientras tanto
+gestor_catalogo = GestorCatalogo(ruta_bd=config.RUTA_BD or None)
+gestor_catalogo.recargar()
+
+def recargar_catalogo():
+    """Carga un catálogo nuevo desde los CSV y lo publica para las siguientes peticiones.
+
+    Las peticiones en curso conservan la referencia al catálogo anterior.
+    """
+    gestor_catalogo.recargar(forzar=True)
+    return gestor_catalogo.actual
+
+def iniciar_vigilancia_catalogo():
+    """Inicia la recarga automática del catálogo si está configurada."""
+    if config.INTERVALO_RECARGA > 0:
+        gestor_catalogo.iniciar_vigilancia(config.INTERVALO_RECARGA)
+
+# Procesos para planificar trayectorias con grupos reales (se crean al iniciar el trabajador)
+procesos_trayectoria = ProcesosTrayectoria(config.PROCESOS_TRAYECTORIA, lambda: gestor_catalogo.actual)
+
+def iniciar_procesos_trayectoria():
+    """Crea los procesos de planificación de trayectorias si están configurados.
+
+    Debe llamarse al iniciar el trabajador, antes de atender peticiones.
+    """
+    procesos_trayectoria.iniciar()
+
+def catalogo_peticion():
+    """Catálogo de la petición actual: se lee una sola vez del gestor y se conserva en g."""
+    if 'catalogo' not in g:
+        g.catalogo = gestor_catalogo.actual
+    return g.catalogo
+
+# Cache de respuestas de solo lectura (se invalida al cambiar la versión del catálogo).
+# La versión y los datos de la vista salen del mismo catálogo de la petición
+cache_respuestas = CacheRespuestas(lambda: catalogo_peticion().version_catalogo)
 
 @api_bp.route('/estudiantes', methods=['GET'])
+@cache_respuestas.cachear
 def obtener_estudiantes():
     """Devuelve la lista de todos los estudiantes."""
+    data_loader = catalogo_peticion()
     try:
         estudiantes = []
         for id_estudiante, estudiante in data_loader.estudiantes.items():
@@ -42,8 +81,10 @@ def obtener_estudiantes():
         }), 500
 
 @api_bp.route('/materias', methods=['GET'])
+@cache_respuestas.cachear
 def obtener_materias():
     """Devuelve la lista de todas las materias."""
+    data_loader = catalogo_peticion()
     try:
         materias = []
         for id_materia, materia in data_loader.materias.items():
@@ -63,6 +104,7 @@ def obtener_materias():
 @api_bp.route('/estudiantes/<int:id_estudiante>', methods=['GET'])
 def obtener_estudiante(id_estudiante):
     """Devuelve la información de un estudiante específico."""
+    data_loader = gestor_catalogo.actual
     try:
         estudiante = data_loader.obtener_estudiante(id_estudiante)
         if not estudiante:
@@ -130,6 +172,7 @@ def obtener_estudiante(id_estudiante):
 @api_bp.route('/estudiantes/<int:id_estudiante>/historial', methods=['GET'])
 def obtener_historial(id_estudiante):
     """Devuelve el historial académico de un estudiante."""
+    data_loader = gestor_catalogo.actual
     try:
         estudiante = data_loader.obtener_estudiante(id_estudiante)
         if not estudiante:
@@ -172,6 +215,7 @@ def obtener_historial(id_estudiante):
 @api_bp.route('/optimizar/<int:id_estudiante>', methods=['POST'])
 def optimizar_horario(id_estudiante):
     """Optimiza el horario para un estudiante específico y genera un plan completo."""
+    data_loader = gestor_catalogo.actual
     try:
         inicio = time.time()
         
@@ -197,21 +241,21 @@ def optimizar_horario(id_estudiante):
             if 'dias_preferidos' in nuevas_preferencias:
                 estudiante.preferencias['dias_preferidos'] = nuevas_preferencias['dias_preferidos']
         
-        # Crear optimizador
-        optimizador = Optimizador(
-            materias=data_loader.materias,
-            grupos=data_loader.grupos,
-            seriacion=data_loader.seriacion,
-            dependencias_proyectos=data_loader.dependencias_proyectos
-        )
+        # Optimizador de la versión del catálogo usada en esta petición
+        optimizador = data_loader.obtener_optimizador()
         
         # Inicializar la variable resultado
         resultado = None
         
         try:
             if plan_completo:
-                # Generar plan completo hasta la graduación
-                resultado = optimizador.planificar_trayectoria_completa(estudiante)
+                # Generar plan completo hasta la graduación; con grupos_reales cada
+                # cuatrimestre se optimiza con los grupos existentes
+                resultado = optimizador.planificar_trayectoria_completa(
+                    estudiante,
+                    grupos_reales=params.get('grupos_reales', False),
+                    en_procesos=functools.partial(procesos_trayectoria.planificar, data_loader)
+                )
                 
                 # Añadir información del estudiante
                 resultado['estudiante'] = {
@@ -310,7 +354,7 @@ def optimizar_horario(id_estudiante):
                             'creditos': creditos,
                             'cuatrimestre': cuatrimestre,
                             'tipo': tipo,
-                            'horarios': grupo.horarios or []  # Asegurar que horarios no sea None
+                            'horarios': grupo.horarios_formateados()
                         })
                         creditos_totales += creditos
                 
@@ -390,6 +434,7 @@ def optimizar_horario(id_estudiante):
 @api_bp.route('/estudiantes/<int:id_estudiante>/horario', methods=['GET'])
 def obtener_horario_estudiante(id_estudiante):
     """Devuelve el horario actual de un estudiante."""
+    data_loader = gestor_catalogo.actual
     try:
         # Verificar que el estudiante existe
         estudiante = data_loader.obtener_estudiante(id_estudiante)
@@ -438,7 +483,7 @@ def obtener_horario_estudiante(id_estudiante):
                         'creditos': materia.creditos,
                         'cuatrimestre': materia.cuatrimestre,
                         'tipo': materia.tipo,
-                        'horarios': grupo.horarios
+                        'horarios': grupo.horarios_formateados()
                     })
                     creditos_totales += materia.creditos
         
@@ -455,12 +500,7 @@ def obtener_horario_estudiante(id_estudiante):
                         carga_por_dia[dia] += 1
         
         # Generar visualización del horario
-        optimizador = Optimizador(
-            materias=data_loader.materias,
-            grupos=data_loader.grupos,
-            seriacion=data_loader.seriacion,
-            dependencias_proyectos=data_loader.dependencias_proyectos
-        )
+        optimizador = data_loader.obtener_optimizador()
         horario_semanal = optimizador.generar_horario_semanal(grupos_inscritos)
         
         return jsonify({
@@ -487,4 +527,140 @@ def obtener_horario_estudiante(id_estudiante):
             'status': 'error',
             'message': str(e),
             'traceback': traceback.format_exc()
-        }), 500
\ No newline at end of file
+        }), 500
+
+@api_bp.route('/estudiantes/<int:id_estudiante>/inscripciones', methods=['POST'])
+def inscribir_estudiante(id_estudiante):
+    """Inscribe a un estudiante en un grupo si todavía tiene cupo (reserva atómica)."""
+    data_loader = gestor_catalogo.actual
+    try:
+        datos = request.get_json() or {}
+        id_grupo = datos.get('id_grupo')
+        if id_grupo is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Se requiere id_grupo'
+            }), 400
+        
+        try:
+            inscripcion = data_loader.reservar_lugar(
+                id_estudiante, int(id_grupo),
+                cuatrimestre=datos.get('cuatrimestre'),
+                fecha_inscripcion=datos.get('fecha_inscripcion')
+            )
+        except KeyError as e:
+            return jsonify({
+                'status': 'error',
+                'message': e.args[0]
+            }), 404
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 409
+        
+        if inscripcion is None:
+            return jsonify({
+                'status': 'error',
+                'message': f'El grupo {id_grupo} no tiene cupo disponible'
+            }), 409
+        
+        return jsonify({
+            'status': 'success',
+            'data': inscripcion.to_dict()
+        }), 201
+    except Exception as e:
+        print(f"Error en inscribir_estudiante: {e}")
+        print(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@api_bp.route('/inscripciones/<int:id_inscripcion>', methods=['DELETE'])
+def dar_baja_inscripcion(id_inscripcion):
+    """Da de baja una inscripción activa y libera su lugar en el grupo."""
+    data_loader = gestor_catalogo.actual
+    try:
+        if not data_loader.liberar_lugar(id_inscripcion):
+            return jsonify({
+                'status': 'error',
+                'message': 'Inscripción no encontrada o ya dada de baja'
+            }), 404
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'Inscripción {id_inscripcion} dada de baja'
+        })
+    except Exception as e:
+        print(f"Error en dar_baja_inscripcion: {e}")
+        print(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+def verificar_token_admin():
+    """Verifica el token de administración; devuelve una respuesta de error si no es válido."""
+    if config.TOKEN_ADMIN and request.headers.get('X-Token-Admin') != config.TOKEN_ADMIN:
+        return jsonify({
+            'status': 'error',
+            'message': 'No autorizado'
+        }), 401
+    return None
+
+@api_bp.route('/admin/catalogo', methods=['GET'])
+def obtener_estado_catalogo():
+    """Devuelve la versión activa del catálogo y el historial de recargas."""
+    error = verificar_token_admin()
+    if error:
+        return error
+    
+    data_loader = gestor_catalogo.actual
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'version': data_loader.version_catalogo,
+            'version_inscripciones': data_loader.version_inscripciones,
+            'materias': len(data_loader.materias),
+            'grupos': len(data_loader.grupos),
+            'estudiantes': len(data_loader.estudiantes),
+            'historial': gestor_catalogo.historial
+        }
+    })
+
+@api_bp.route('/admin/catalogo/recargar', methods=['POST'])
+def recargar_catalogo_admin():
+    """Recarga el catálogo desde los CSV y lo publica si es válido.
+    
+    En modo multiproceso solo recarga el trabajador que atiende la petición;
+    para recargar todos se usa SIGHUP sobre el proceso maestro o la vigilancia automática.
+    """
+    error = verificar_token_admin()
+    if error:
+        return error
+    
+    try:
+        params = request.get_json(silent=True) or {}
+        resultado = gestor_catalogo.recargar(forzar=params.get('forzar', False))
+        
+        if resultado['errores'] and not resultado['recargado']:
+            return jsonify({
+                'status': 'error',
+                'message': 'El nuevo catálogo no es válido; se conserva la versión anterior',
+                'data': resultado
+            }), 422
+        
+        return jsonify({
+            'status': 'success' if resultado['recargado'] else 'warning',
+            'message': 'Catálogo recargado' if resultado['recargado'] else 'El catálogo no ha cambiado',
+            'data': resultado
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
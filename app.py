@@ -1,6 +1,6 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
-from api.routes import register_api
+from api.routes import register_api, iniciar_vigilancia_catalogo
 
 app = Flask(__name__)
 CORS(app)  # Habilitar CORS para todas las rutas
@@ -35,4 +35,5 @@ def server_error(e):
     }), 500
 
 if __name__ == '__main__':
+    iniciar_vigilancia_catalogo()
     app.run(debug=True, host='0.0.0.0', port=3000)
\ No newline at end of file
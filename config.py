@@ -0,0 +1,38 @@
+import os
+
+# Configuración del servidor de producción.
+# Todos los valores pueden sobrescribirse con variables de entorno.
+
+# Dirección y puerto de escucha
+HOST = os.environ.get('UNICARGA_HOST', '0.0.0.0')
+PUERTO = int(os.environ.get('UNICARGA_PUERTO', '3000'))
+
+# Ruta del almacén SQLite de inscripciones y cupos (vacío = inscripciones en
+# inscripciones.csv más la bitácora data/inscripciones.log)
+RUTA_BD = os.environ.get('UNICARGA_BD', '')
+
+# Procesos trabajadores: el algoritmo genético es intensivo en CPU, por lo que
+# con el almacén SQLite se usa un proceso por núcleo. La bitácora de inscripciones
+# solo admite un proceso que escriba en ella, así que sin UNICARGA_BD el valor
+# por defecto es 1 (gunicorn.conf.py rechaza más de uno)
+TRABAJADORES = int(os.environ.get('UNICARGA_TRABAJADORES', str((os.cpu_count() or 1) if RUTA_BD else 1)))
+
+# Hilos por trabajador (atienden peticiones ligeras mientras otro hilo optimiza)
+HILOS = int(os.environ.get('UNICARGA_HILOS', '4'))
+
+# Procesos para optimizar en paralelo los cuatrimestres de una trayectoria con
+# grupos reales (1 = en el mismo proceso que atiende la petición)
+PROCESOS_TRAYECTORIA = int(os.environ.get('UNICARGA_PROCESOS_TRAYECTORIA', '1'))
+
+# Segundos antes de reiniciar un trabajador bloqueado
+TIEMPO_ESPERA = int(os.environ.get('UNICARGA_TIEMPO_ESPERA', '120'))
+
+# Segundos que un trabajador antiguo tiene para terminar sus peticiones al recargar
+TIEMPO_GRACIA = int(os.environ.get('UNICARGA_TIEMPO_GRACIA', '60'))
+
+# Segundos entre revisiones de los CSV para recargar el catálogo en caliente (0 = desactivado)
+INTERVALO_RECARGA = float(os.environ.get('UNICARGA_INTERVALO_RECARGA', '0'))
+
+# Token requerido en la cabecera X-Token-Admin para los endpoints de administración
+# (vacío = sin verificación)
+TOKEN_ADMIN = os.environ.get('UNICARGA_TOKEN_ADMIN', '')
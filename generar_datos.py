@@ -1,6 +1,104 @@
+import argparse
 import csv
+import math
 import random
 import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from services.formato_binario import EscritorBinario, leer_bloques, EXTENSION as EXTENSION_BINARIA
+from services.mascaras import mascara_sesion
+
+# Formatos de salida: "csv", "bin" (formato binario que también lee el DataLoader) o "ambos"
+FORMATOS = ("csv", "bin", "ambos")
+
+# Tablas que se generan por estudiante (por lotes de IDs) y sus columnas
+TABLAS_POR_ESTUDIANTE = {
+    "estudiantes.csv": ["id_estudiante", "nombre", "cuatrimestre_actual", "status", "creditos_acumulados", "max_creditos"],
+    "historial_academico.csv": ["id_estudiante", "id_materia", "calificacion", "cuatrimestre", "aprobada"],
+    "preferencias_estudiante.csv": ["id_estudiante", "preferencia_hora", "dias_preferidos", "profesores_preferidos"],
+    "inscripciones.csv": ["id_inscripcion", "id_estudiante", "id_grupo", "cuatrimestre", "fecha_inscripcion", "activa"]
+}
+
+
+class EscritorTabla:
+    """Escribe las filas de una tabla en CSV y/o en formato binario, por bloques.
+
+    Las filas se acumulan en un bloque que se escribe al llenarse, por lo que la
+    memoria usada no crece con el número de filas.
+    """
+
+    def __init__(self, carpeta, nombre, columnas, formato="csv", tamano_bloque=10000):
+        """Abre los archivos de salida de la tabla.
+
+        Args:
+            carpeta (str): Carpeta de salida
+            nombre (str): Nombre del archivo CSV (la versión binaria cambia la extensión)
+            columnas (list): Encabezados de la tabla
+            formato (str): "csv", "bin" o "ambos"
+            tamano_bloque (int): Filas por bloque
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: {formato}")
+
+        self.tamano_bloque = tamano_bloque
+        self.filas_escritas = 0
+        self._bloque = []
+        self._archivo_csv = None
+        self._escritor_csv = None
+        self._escritor_binario = None
+
+        ruta = os.path.join(carpeta, nombre)
+        if formato in ("csv", "ambos"):
+            self._archivo_csv = open(ruta, 'w', newline='', encoding='utf-8')
+            self._escritor_csv = csv.writer(self._archivo_csv)
+            self._escritor_csv.writerow(columnas)
+        if formato in ("bin", "ambos"):
+            self._escritor_binario = EscritorBinario(os.path.splitext(ruta)[0] + EXTENSION_BINARIA, columnas, tamano_bloque)
+
+    def escribir(self, fila):
+        """Agrega una fila a la tabla."""
+        self._bloque.append(fila)
+        if len(self._bloque) >= self.tamano_bloque:
+            self._vaciar_bloque()
+
+    def escribir_filas(self, filas):
+        """Agrega varias filas a la tabla."""
+        self._bloque.extend(filas)
+        if len(self._bloque) >= self.tamano_bloque:
+            self._vaciar_bloque()
+
+    def _vaciar_bloque(self):
+        """Escribe el bloque pendiente en los archivos de salida."""
+        if not self._bloque:
+            return
+        if self._escritor_csv is not None:
+            self._escritor_csv.writerows(self._bloque)
+        if self._escritor_binario is not None:
+            self._escritor_binario.escribir_filas(self._bloque)
+        self.filas_escritas += len(self._bloque)
+        self._bloque = []
+
+    def cerrar(self):
+        """Escribe el último bloque y cierra los archivos."""
+        self._vaciar_bloque()
+        if self._archivo_csv is not None:
+            self._archivo_csv.close()
+        if self._escritor_binario is not None:
+            self._escritor_binario.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+def escribir_tabla(carpeta, nombre, columnas, filas, formato="csv"):
+    """Escribe una tabla completa (para tablas pequeñas ya generadas en memoria)."""
+    with EscritorTabla(carpeta, nombre, columnas, formato) as escritor:
+        escritor.escribir_filas(filas)
 
 def crear_carpeta_datos(carpeta="data"):
     """Crea la carpeta donde se guardarán los archivos CSV."""
@@ -8,7 +106,7 @@ def crear_carpeta_datos(carpeta="data"):
         os.makedirs(carpeta)
     return carpeta
 
-def generar_materias(carpeta):
+def generar_materias(carpeta, formato="csv"):
     """Genera materias.csv con el plan completo de 10 cuatrimestres."""
     
     # Horas correctas por materia según el documento
@@ -224,15 +322,12 @@ def generar_materias(carpeta):
         materias.append((id_materia, nombre, cuatrimestre, creditos, horas, tipo))
     
     # Escribir al archivo CSV
-    with open(os.path.join(carpeta, "materias.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_materia", "nombre", "cuatrimestre", "creditos", "horas_totales", "tipo"])
-        writer.writerows(materias)
+    escribir_tabla(carpeta, "materias.csv", ["id_materia", "nombre", "cuatrimestre", "creditos", "horas_totales", "tipo"], materias, formato)
     
     return materias
 
 
-def generar_seriacion(carpeta):
+def generar_seriacion(carpeta, formato="csv"):
     """Genera seriacion.csv con las dependencias completas."""
     seriacion = [
         # Inglés
@@ -287,14 +382,11 @@ def generar_seriacion(carpeta):
         (58, 57)   # Estadía II requiere Proyecto integrador III
     ]
     
-    with open(os.path.join(carpeta, "seriacion.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_materia", "id_prerequisito"])
-        writer.writerows(seriacion)
+    escribir_tabla(carpeta, "seriacion.csv", ["id_materia", "id_prerequisito"], seriacion, formato)
     
     return seriacion
 
-def generar_dependencias_proyectos(carpeta):
+def generar_dependencias_proyectos(carpeta, formato="csv"):
     """Genera dependencias_proyectos.csv para todos los proyectos integradores."""
     dependencias = [
         # Proyecto integrador I (3er cuatrimestre)
@@ -323,383 +415,621 @@ def generar_dependencias_proyectos(carpeta):
         (58, 57)   # Estadía II depende de Proyecto integrador III
     ]
     
-    with open(os.path.join(carpeta, "dependencias_proyectos.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_proyecto", "id_materia_dependiente"])
-        writer.writerows(dependencias)
+    escribir_tabla(carpeta, "dependencias_proyectos.csv", ["id_proyecto", "id_materia_dependiente"], dependencias, formato)
     
     return dependencias
 
-def generar_profesores(num_profesores=15):
-    """Genera una lista de profesores aleatorios."""
-    nombres = ["Juan", "María", "Pedro", "Ana", "Carlos", "Laura", "José", "Patricia", 
-             "Miguel", "Sofía", "Fernando", "Elena", "Javier", "Silvia", "Ricardo"]
+
+NOMBRES_PROFESORES = ["Juan", "María", "Pedro", "Ana", "Carlos", "Laura", "José", "Patricia", 
+                      "Miguel", "Sofía", "Fernando", "Elena", "Javier", "Silvia", "Ricardo"]
+
+APELLIDOS_PROFESORES = ["García", "López", "Martínez", "Rodríguez", "González", "Hernández", 
+                        "Pérez", "Sánchez", "Ramírez", "Torres", "Flores", "Rivera", "Gómez"]
+
+NOMBRES_ESTUDIANTES = [
+    "Juan", "María", "Pedro", "Ana", "Carlos", "Laura", "José", "Patricia", "Miguel", "Sofía",
+    "Fernando", "Elena", "Javier", "Silvia", "Ricardo", "Gabriel", "Daniela", "Alejandro", "Valentina", "Jorge",
+    "Camila", "Andrés", "Luis", "Adriana", "Antonio", "Isabel", "Francisco", "Lucía", "Raúl", "Marina",
+    "Roberto", "Carmen", "Manuel", "Alejandra", "Sergio", "Diana", "Alberto", "Rosa", "Diego", "Claudia",
+    "Arturo", "Mónica", "Guadalupe", "Verónica", "Rafael", "Teresa", "Jesús", "Alicia", "Oscar", "Beatriz",
+    "Pablo", "Lorena", "Rubén", "Maribel", "Héctor", "Yolanda", "Víctor", "Natalia", "Eduardo", "Angélica",
+    "Salvador", "Cecilia", "Felipe", "Leticia", "Alfonso", "Estela", "Joaquín", "Reyna", "Iván", "Maricela",
+    "Enrique", "Esperanza", "Gerardo", "Consuelo", "Rodolfo", "Olivia", "César", "Paula", "Hugo", "Noemí",
+    "Julio", "Karla", "Ramiro", "Irene", "Emilio", "Miriam", "Mario", "Susana", "Erick", "Magdalena",
+    "Leonardo", "Dolores", "Abel", "Ruth", "Gilberto", "Amalia", "Ernesto", "Elsa", "Federico", "Rocío"
+]
+
+APELLIDOS_ESTUDIANTES = [
+    "García", "López", "Martínez", "Rodríguez", "González", "Hernández", "Pérez", "Sánchez", "Ramírez", "Torres",
+    "Flores", "Rivera", "Gómez", "Vargas", "Castro", "Ortiz", "Ramos", "Romero", "Gutiérrez", "Díaz",
+    "Morales", "Ortega", "Reyes", "Cruz", "Medina", "Aguilar", "Vázquez", "Jiménez", "Mendoza", "Ruiz",
+    "Salazar", "Alvarado", "Castillo", "Chávez", "Juárez", "Núñez", "Guerrero", "Rojas", "Delgado", "Méndez",
+    "Santos", "Cervantes", "Vega", "Cabrera", "Peña", "Ríos", "Mejía", "Soto", "Contreras", "Valdez",
+    "Navarro", "Acosta", "Miranda", "Figueroa", "Cortés", "Luna", "Espinoza", "Álvarez", "León", "Molina",
+    "Campos", "Herrera", "Pacheco", "Rosas", "Aguirre", "Orozco", "Padilla", "Zamora", "Serrano", "Rangel",
+    "Téllez", "Barrera", "Franco", "Gallegos", "Cárdenas", "Velázquez", "Montes", "Soria", "Escobar", "Ibarra",
+    "Quintero", "Zúñiga", "Bravo", "Galván", "Osorio", "De La Cruz", "Ponce", "Valencia", "Corona", "Avila"
+]
+
+# Pesos decrecientes para el cuatrimestre actual de los estudiantes (1 a 10)
+PESOS_CUATRIMESTRES = [25, 20, 18, 15, 12, 10, 8, 6, 4, 2]
+
+# Cupo con el que se estima cuántos grupos necesita cada materia (los cupos generados van de 18 a 30)
+CUPO_REFERENCIA = 20
+
+# Margen sobre los estudiantes de cada cuatrimestre: los irregulares también cursan
+# materias de cuatrimestres anteriores
+HOLGURA_GRUPOS = 1.25
+
+def calcular_grupos_por_materia(num_estudiantes):
+    """Calcula el rango de grupos por materia de cada cuatrimestre según el número de estudiantes.
     
-    apellidos = ["García", "López", "Martínez", "Rodríguez", "González", "Hernández", 
-               "Pérez", "Sánchez", "Ramírez", "Torres", "Flores", "Rivera", "Gómez"]
+    Cada materia de un cuatrimestre necesita lugar para los estudiantes que lo
+    cursan (según PESOS_CUATRIMESTRES, con HOLGURA_GRUPOS de margen), es decir,
+    num_estudiantes / CUPO_REFERENCIA grupos en proporción; nunca menos de 2-3.
     
+    Returns:
+        dict: Cuatrimestre -> rango (mínimo, máximo) de grupos por materia
+    """
+    total_pesos = sum(PESOS_CUATRIMESTRES)
+    rangos = {}
+    for cuatrimestre, peso in enumerate(PESOS_CUATRIMESTRES, 1):
+        necesarios = math.ceil(num_estudiantes * peso / total_pesos * HOLGURA_GRUPOS / CUPO_REFERENCIA)
+        rangos[cuatrimestre] = (max(2, necesarios), max(3, necesarios + 1))
+    return rangos
+
+def generar_profesores(num_profesores=15):
+    """Genera una lista de profesores aleatorios."""
     profesores = []
     for i in range(num_profesores):
-        nombre = random.choice(nombres)
-        apellido1 = random.choice(apellidos)
-        apellido2 = random.choice(apellidos)
+        nombre = random.choice(NOMBRES_PROFESORES)
+        apellido1 = random.choice(APELLIDOS_PROFESORES)
+        apellido2 = random.choice(APELLIDOS_PROFESORES)
         titulo = random.choice(["Dr.", "Dra.", "Mtro.", "Mtra.", "Ing.", "Lic."])
         profesores.append(f"{titulo} {nombre} {apellido1} {apellido2}")
     
     return profesores
 
-def generar_grupos_y_horarios(carpeta, materias):
-    """Genera grupos.csv y horarios.csv."""
-    profesores = generar_profesores(15)
+def generar_grupos_y_horarios(carpeta, materias, grupos_por_materia=(2, 3), formato="csv", tamano_bloque=10000):
+    """Genera los grupos y horarios.csv.
+    
+    grupos.csv se escribe después con escribir_grupos, cuando ya se conocen los
+    lugares ocupados por las inscripciones generadas.
+    
+    Args:
+        carpeta (str): Carpeta de salida
+        materias (list): Materias generadas por generar_materias
+        grupos_por_materia (tuple o dict): Rango (mínimo, máximo) de grupos por
+            materia, o un rango por cuatrimestre (ver calcular_grupos_por_materia)
+        formato (str): "csv", "bin" o "ambos"
+        tamano_bloque (int): Filas por bloque al escribir
+        
+    Returns:
+        tuple: (lista de grupos, número de horarios generados, máscaras de horario por grupo)
+    """
+    # Rango de grupos por cuatrimestre
+    if not isinstance(grupos_por_materia, dict):
+        grupos_por_materia = {materia[2]: grupos_por_materia for materia in materias}
+    
+    # Aproximadamente cuatro grupos por profesor (al menos 15 profesores)
+    grupos_esperados = sum(sum(grupos_por_materia.get(materia[2], (2, 3))) // 2 for materia in materias)
+    profesores = generar_profesores(max(15, grupos_esperados // 4))
     
-    # Preparar datos para grupos
     grupos = []
-    horarios = []
+    mascaras = {}
     id_grupo = 1
     id_horario = 1
     
-    for id_materia, nombre, cuatrimestre, creditos, horas, tipo in materias:
-        if tipo == "Estadía":
-            continue
-        
-        # Crear 2-3 grupos por materia
-        num_grupos = random.randint(2, 3)
-        for i in range(1, num_grupos + 1):
-            # Datos del grupo
-            profesor = random.choice(profesores)
+    with EscritorTabla(carpeta, "horarios.csv", ["id_horario", "id_grupo", "dia", "hora_inicio", "hora_fin", "aula"],
+                       formato, tamano_bloque) as horarios:
+        for id_materia, nombre, cuatrimestre, creditos, horas, tipo in materias:
+            if tipo == "Estadía":
+                continue
             
-            # Generar cupo con 80% de probabilidad alrededor de 20
-            if random.random() < 0.8:
-                cupo_maximo = random.randint(18, 22)  # Cupo estándar (cerca de 20)
-            else:
-                cupo_maximo = random.randint(23, 30)  # Cupo extendido (cargas manuales)
+            num_grupos = random.randint(*grupos_por_materia.get(cuatrimestre, (2, 3)))
+            for i in range(1, num_grupos + 1):
+                # Datos del grupo
+                profesor = random.choice(profesores)
                 
-            cupo_actual = random.randint(0, cupo_maximo)
-            
-            grupos.append((id_grupo, id_materia, profesor, cupo_maximo, cupo_actual))
-            
-            # Crear horarios para este grupo
-            dias_semana = [1, 2, 3, 4, 5]  # Lunes a Viernes
-            random.shuffle(dias_semana)
-            num_sesiones = 2 if horas > 60 else 1
-            
-            for j in range(num_sesiones):
-                dia = dias_semana[j]
+                # Generar cupo con 80% de probabilidad alrededor de 20
+                if random.random() < 0.8:
+                    cupo_maximo = random.randint(18, 22)  # Cupo estándar (cerca de 20)
+                else:
+                    cupo_maximo = random.randint(23, 30)  # Cupo extendido (cargas manuales)
                 
-                # Horarios posibles (ajustados al horario real de la universidad)
-                # Principalmente de 8am a 4pm, con algunos casos hasta las 7pm
-                if random.random() < 0.85:  # 85% de probabilidad para horarios regulares
-                    hora_inicio = random.choice([8, 10, 12, 14, 16])  # Horarios comunes (8am-4pm)
-                else:  # 15% de probabilidad para horarios extendidos
-                    hora_inicio = random.choice([18, 19])  # Horarios extendidos (6pm-7pm)
+                # El cupo actual se completa en escribir_grupos con las inscripciones generadas
+                grupos.append((id_grupo, id_materia, profesor, cupo_maximo, 0))
+                mascaras[id_grupo] = 0
                 
-                hora_fin = hora_inicio + 2  # Clases de 2 horas
+                # Crear horarios para este grupo
+                dias_semana = [1, 2, 3, 4, 5]  # Lunes a Viernes
+                random.shuffle(dias_semana)
+                num_sesiones = 2 if horas > 60 else 1
                 
-                aula = f"{random.choice(['A', 'B', 'C'])}{random.randint(101, 310)}"
+                for j in range(num_sesiones):
+                    dia = dias_semana[j]
+                    
+                    # Horarios posibles (ajustados al horario real de la universidad)
+                    # Principalmente de 8am a 4pm, con algunos casos hasta las 7pm
+                    if random.random() < 0.85:  # 85% de probabilidad para horarios regulares
+                        hora_inicio = random.choice([8, 10, 12, 14, 16])  # Horarios comunes (8am-4pm)
+                    else:  # 15% de probabilidad para horarios extendidos
+                        hora_inicio = random.choice([18, 19])  # Horarios extendidos (6pm-7pm)
+                    
+                    hora_fin = hora_inicio + 2  # Clases de 2 horas
+                    
+                    aula = f"{random.choice(['A', 'B', 'C'])}{random.randint(101, 310)}"
+                    
+                    horarios.escribir((id_horario, id_grupo, dia, f"{hora_inicio:02d}:00", f"{hora_fin:02d}:00", aula))
+                    mascaras[id_grupo] |= mascara_sesion(dia, hora_inicio, hora_fin)
+                    id_horario += 1
                 
-                horarios.append((id_horario, id_grupo, dia, f"{hora_inicio:02d}:00", f"{hora_fin:02d}:00", aula))
-                id_horario += 1
-            
-            id_grupo += 1
-    
-    # Guardar grupos.csv
-    with open(os.path.join(carpeta, "grupos.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_grupo", "id_materia", "profesor", "cupo_maximo", "cupo_actual"])
-        writer.writerows(grupos)
-    
-    # Guardar horarios.csv
-    with open(os.path.join(carpeta, "horarios.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_horario", "id_grupo", "dia", "hora_inicio", "hora_fin", "aula"])
-        writer.writerows(horarios)
-    
-    return grupos, horarios
-
-def generar_estudiantes(carpeta, num_estudiantes=200):
-    """Genera estudiantes.csv."""
-    estudiantes = []
-    
-    nombres = [
-        "Juan", "María", "Pedro", "Ana", "Carlos", "Laura", "José", "Patricia", "Miguel", "Sofía",
-        "Fernando", "Elena", "Javier", "Silvia", "Ricardo", "Gabriel", "Daniela", "Alejandro", "Valentina", "Jorge",
-        "Camila", "Andrés", "Luis", "Adriana", "Antonio", "Isabel", "Francisco", "Lucía", "Raúl", "Marina",
-        "Roberto", "Carmen", "Manuel", "Alejandra", "Sergio", "Diana", "Alberto", "Rosa", "Diego", "Claudia",
-        "Arturo", "Mónica", "Guadalupe", "Verónica", "Rafael", "Teresa", "Jesús", "Alicia", "Oscar", "Beatriz",
-        "Pablo", "Lorena", "Rubén", "Maribel", "Héctor", "Yolanda", "Víctor", "Natalia", "Eduardo", "Angélica",
-        "Salvador", "Cecilia", "Felipe", "Leticia", "Alfonso", "Estela", "Joaquín", "Reyna", "Iván", "Maricela",
-        "Enrique", "Esperanza", "Gerardo", "Consuelo", "Rodolfo", "Olivia", "César", "Paula", "Hugo", "Noemí",
-        "Julio", "Karla", "Ramiro", "Irene", "Emilio", "Miriam", "Mario", "Susana", "Erick", "Magdalena",
-        "Leonardo", "Dolores", "Abel", "Ruth", "Gilberto", "Amalia", "Ernesto", "Elsa", "Federico", "Rocío"
-    ]
+                id_grupo += 1
     
-    apellidos = [
-        "García", "López", "Martínez", "Rodríguez", "González", "Hernández", "Pérez", "Sánchez", "Ramírez", "Torres",
-        "Flores", "Rivera", "Gómez", "Vargas", "Castro", "Ortiz", "Ramos", "Romero", "Gutiérrez", "Díaz",
-        "Morales", "Ortega", "Reyes", "Cruz", "Medina", "Aguilar", "Vázquez", "Jiménez", "Mendoza", "Ruiz",
-        "Salazar", "Alvarado", "Castillo", "Chávez", "Juárez", "Núñez", "Guerrero", "Rojas", "Delgado", "Méndez",
-        "Santos", "Cervantes", "Vega", "Cabrera", "Peña", "Ríos", "Mejía", "Soto", "Contreras", "Valdez",
-        "Navarro", "Acosta", "Miranda", "Figueroa", "Cortés", "Luna", "Espinoza", "Álvarez", "León", "Molina",
-        "Campos", "Herrera", "Pacheco", "Rosas", "Aguirre", "Orozco", "Padilla", "Zamora", "Serrano", "Rangel",
-        "Téllez", "Barrera", "Franco", "Gallegos", "Cárdenas", "Velázquez", "Montes", "Soria", "Escobar", "Ibarra",
-        "Quintero", "Zúñiga", "Bravo", "Galván", "Osorio", "De La Cruz", "Ponce", "Valencia", "Corona", "Avila"
-    ]
+    return grupos, id_horario - 1, mascaras
+
+def escribir_grupos(carpeta, grupos, ocupados, formato="csv"):
+    """Escribe grupos.csv con el cupo actual igual a las inscripciones activas de cada grupo.
     
-    for id_estudiante in range(1, num_estudiantes + 1):
-        nombre = f"{random.choice(nombres)} {random.choice(apellidos)} {random.choice(apellidos)}"
-        pesos_cuatrimestres = [25, 20, 18, 15, 12, 10, 8, 6, 4, 2]  # Pesos decrecientes
-        cuatrimestre = random.choices(range(1, 11), weights=pesos_cuatrimestres, k=1)[0]
-        # Modificar la línea de asignación de estatus:
-        status = "Regular" if cuatrimestre == 1 or random.random() < 0.8 else "Irregular"
-        
-        # Creditos basados en cuatrimestre y status
-        if status == "Regular":
-            creditos_base = cuatrimestre * 32.81
-            creditos_acumulados = round(creditos_base, 2)
-        else:
-            creditos_base = (cuatrimestre - 1) * 32.81
-            factor_creditos = random.uniform(0.7, 0.9)
-            creditos_acumulados = round(creditos_base * factor_creditos, 2)
-        
-        max_creditos = random.randint(30, 36)
-        
-        estudiantes.append((id_estudiante, nombre, cuatrimestre, status, creditos_acumulados, max_creditos))
+    Args:
+        carpeta (str): Carpeta de salida
+        grupos (list): Grupos generados por generar_grupos_y_horarios
+        ocupados (dict): Inscripciones activas generadas por grupo
+        formato (str): "csv", "bin" o "ambos"
+    """
+    escribir_tabla(carpeta, "grupos.csv", ["id_grupo", "id_materia", "profesor", "cupo_maximo", "cupo_actual"],
+                   [grupo[:4] + (ocupados.get(grupo[0], 0),) for grupo in grupos], formato)
+
+def generar_estudiante(id_estudiante):
+    """Genera la fila de estudiantes.csv de un estudiante."""
+    nombre = f"{random.choice(NOMBRES_ESTUDIANTES)} {random.choice(APELLIDOS_ESTUDIANTES)} {random.choice(APELLIDOS_ESTUDIANTES)}"
+    cuatrimestre = random.choices(range(1, 11), weights=PESOS_CUATRIMESTRES, k=1)[0]
+    status = "Regular" if cuatrimestre == 1 or random.random() < 0.8 else "Irregular"
+    
+    # Creditos basados en cuatrimestre y status
+    if status == "Regular":
+        creditos_base = cuatrimestre * 32.81
+        creditos_acumulados = round(creditos_base, 2)
+    else:
+        creditos_base = (cuatrimestre - 1) * 32.81
+        factor_creditos = random.uniform(0.7, 0.9)
+        creditos_acumulados = round(creditos_base * factor_creditos, 2)
     
-    with open(os.path.join(carpeta, "estudiantes.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_estudiante", "nombre", "cuatrimestre_actual", "status", "creditos_acumulados", "max_creditos"])
-        writer.writerows(estudiantes)
+    max_creditos = random.randint(30, 36)
     
-    return estudiantes
+    return (id_estudiante, nombre, cuatrimestre, status, creditos_acumulados, max_creditos)
 
-def generar_historial_academico(carpeta, estudiantes, materias):
-    """Genera historial_academico.csv."""
+def generar_historial_estudiante(estudiante, materias_por_cuatrimestre):
+    """Genera las filas de historial_academico.csv de un estudiante."""
+    id_estudiante, _, cuatrimestre_actual, status, _, _ = estudiante
     historial = []
     
-    # Agrupar materias por cuatrimestre
+    for cuatri in range(1, cuatrimestre_actual):
+        for materia in materias_por_cuatrimestre.get(cuatri, []):
+            id_materia = materia[0]
+            
+            # Estudiantes regulares aprueban todo, irregulares pueden reprobar
+            if status == "Regular":
+                aprobada = True
+                calificacion = round(random.uniform(7.0, 10.0), 1)
+            else:
+                aprobada = random.random() < 0.8  # 80% de probabilidad de aprobar
+                calificacion = round(random.uniform(7.0, 10.0), 1) if aprobada else round(random.uniform(5.0, 6.9), 1)
+            
+            historial.append((id_estudiante, id_materia, calificacion, cuatri, aprobada))
+    
+    return historial
+
+def generar_preferencia_estudiante(estudiante):
+    """Genera la fila de preferencias_estudiante.csv de un estudiante."""
+    # Preferencia de horario
+    preferencia_hora = random.choice(["mañana", "tarde", "noche"])
+    
+    # Días preferidos
+    num_dias = random.randint(2, 5)
+    dias_posibles = [1, 2, 3, 4, 5]  # Lunes a Viernes
+    dias_preferidos = random.sample(dias_posibles, num_dias)
+    dias_preferidos.sort()
+    dias_str = ",".join(map(str, dias_preferidos))
+    
+    # Profesores preferidos
+    profesores_preferidos = ""  # Dejar vacío por simplicidad
+    
+    return (estudiante[0], preferencia_hora, dias_str, profesores_preferidos)
+
+def preparar_contexto_inscripciones(materias, grupos, mascaras, seriacion, dependencias, num_estudiantes):
+    """Construye los índices por materia que usa generar_inscripciones_estudiante.
+    
+    Args:
+        materias (list): Materias generadas por generar_materias
+        grupos (list): Grupos generados por generar_grupos_y_horarios
+        mascaras (dict): Máscara de horario de cada grupo (la misma representación
+            que usan el DataLoader y el optimizador)
+        seriacion (list): Pares (id_materia, id_prerequisito)
+        dependencias (list): Pares (id_proyecto, id_materia_dependiente)
+        num_estudiantes (int): Estudiantes de la carrera (para repartir los cupos entre lotes)
+    """
+    grupos_por_materia = {}
+    for grupo_tupla in grupos:
+        id_grupo, id_materia = grupo_tupla[0], grupo_tupla[1]
+        grupos_por_materia.setdefault(id_materia, []).append((id_grupo, mascaras.get(id_grupo, 0)))
+    
+    # Requisitos de cada materia: seriación y dependencias de proyectos
+    requisitos = {}
+    for id_materia, id_requisito in list(seriacion) + list(dependencias):
+        requisitos.setdefault(id_materia, set()).add(id_requisito)
+    
     materias_por_cuatrimestre = {}
     for materia in materias:
-        id_materia, nombre, cuatrimestre, creditos, horas, tipo = materia
-        if cuatrimestre not in materias_por_cuatrimestre:
-            materias_por_cuatrimestre[cuatrimestre] = []
-        materias_por_cuatrimestre[cuatrimestre].append(materia)
-    
-    for id_estudiante, nombre, cuatrimestre_actual, status, creditos_acumulados, max_creditos in estudiantes:
-        # Determinar cuatrimestres que ha cursado
-        cuatrimestres_cursados = list(range(1, cuatrimestre_actual))
-        
-        for cuatri in cuatrimestres_cursados:
-            if cuatri in materias_por_cuatrimestre:
-                materias_cuatri = materias_por_cuatrimestre[cuatri]
-                
-                for materia in materias_cuatri:
-                    id_materia = materia[0]
-                    
-                    # Estudiantes regulares aprueban todo, irregulares pueden reprobar
-                    if status == "Regular":
-                        aprobada = True
-                        calificacion = round(random.uniform(7.0, 10.0), 1)
-                    else:
-                        aprobada = random.random() < 0.8  # 80% de probabilidad de aprobar
-                        calificacion = round(random.uniform(7.0, 10.0), 1) if aprobada else round(random.uniform(5.0, 6.9), 1)
-                    
-                    historial.append((id_estudiante, id_materia, calificacion, cuatri, aprobada))
+        materias_por_cuatrimestre.setdefault(materia[2], []).append(materia)
     
-    with open(os.path.join(carpeta, "historial_academico.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_estudiante", "id_materia", "calificacion", "cuatrimestre", "aprobada"])
-        writer.writerows(historial)
+    return {
+        'materias': materias,
+        'materias_por_cuatrimestre': materias_por_cuatrimestre,
+        'grupos_por_materia': grupos_por_materia,
+        'requisitos': {id_materia: frozenset(ids) for id_materia, ids in requisitos.items()},
+        'materias_estadia': {m[0] for m in materias if m[5] == "Estadía"},
+        'cupos': {grupo_tupla[0]: grupo_tupla[3] for grupo_tupla in grupos},
+        'num_estudiantes': num_estudiantes
+    }
+
+def repartir_lugares(contexto, id_inicial, id_final):
+    """Devuelve los lugares de cada grupo que corresponden a un lote de estudiantes.
     
-    return historial
+    Cada lote recibe la parte del cupo máximo proporcional a su rango de IDs, y
+    las partes de todos los lotes suman exactamente el cupo: los lotes se generan
+    en paralelo sin exceder ningún cupo y el resultado no depende del número de
+    procesos.
+    """
+    total = contexto['num_estudiantes']
+    return {id_grupo: cupo * id_final // total - cupo * (id_inicial - 1) // total
+            for id_grupo, cupo in contexto['cupos'].items()}
 
-def generar_preferencias(carpeta, estudiantes):
-    """Genera preferencias_estudiante.csv."""
-    preferencias = []
+def generar_inscripciones_estudiante(estudiante, aprobadas, contexto, id_inscripcion, fecha_inscripcion):
+    """Genera las filas de inscripciones.csv de un estudiante.
+    
+    Solo se ofrecen materias no aprobadas cuyos requisitos (seriación y
+    dependencias de proyectos) están aprobados en el historial generado, y cada
+    grupo elegido no se traslapa con los grupos ya elegidos y todavía tiene
+    lugares en contexto['lugares'] (que se descuentan al inscribir).
     
-    for id_estudiante, nombre, cuatrimestre, status, creditos_acumulados, max_creditos in estudiantes:
-        # Preferencia de horario
-        preferencia_hora = random.choice(["mañana", "tarde", "noche"])
+    Args:
+        estudiante (tuple): Fila del estudiante
+        aprobadas (set): IDs de las materias aprobadas en su historial
+        contexto (dict): Índices de preparar_contexto_inscripciones más los
+            lugares restantes del lote ('lugares', ver repartir_lugares)
+        id_inscripcion (int): ID de la primera inscripción del estudiante
+        fecha_inscripcion (str): Fecha de las inscripciones
         
-        # Días preferidos
-        num_dias = random.randint(2, 5)
-        dias_posibles = [1, 2, 3, 4, 5]  # Lunes a Viernes
-        dias_preferidos = random.sample(dias_posibles, num_dias)
-        dias_preferidos.sort()
-        dias_str = ",".join(map(str, dias_preferidos))
+    Returns:
+        list: Filas de inscripciones generadas
+    """
+    id_estudiante, _, cuatrimestre, status, _, _ = estudiante
+    grupos_por_materia = contexto['grupos_por_materia']
+    requisitos = contexto['requisitos']
+    lugares = contexto['lugares']
+    inscripciones = []
+    
+    # Solo consideramos estudiantes en cuatrimestres activos (1-10)
+    if not 1 <= cuatrimestre <= 10:
+        return inscripciones
+    
+    # Regulares: materias de su cuatrimestre; irregulares: también las de cuatrimestres anteriores
+    if status == "Regular":
+        cuatrimestres = [cuatrimestre]
+    else:
+        cuatrimestres = range(1, cuatrimestre + 1)
+    
+    # Materias disponibles por cuatrimestre: no aprobadas y con requisitos cumplidos
+    materias_cuatrimestre_actual = []
+    materias_otros_cuatrimestres = []
+    for cuatri in cuatrimestres:
+        for materia in contexto['materias_por_cuatrimestre'].get(cuatri, []):
+            id_materia = materia[0]
+            if id_materia in aprobadas or not requisitos.get(id_materia, frozenset()) <= aprobadas:
+                continue
+            if cuatri == cuatrimestre:
+                materias_cuatrimestre_actual.append(id_materia)
+            else:
+                materias_otros_cuatrimestres.append(id_materia)
+    
+    materias_disponibles = materias_cuatrimestre_actual + materias_otros_cuatrimestres
+    
+    # Si hay estadías disponibles, solo se puede cursar esa materia
+    estadias_disponibles = [id_materia for id_materia in materias_disponibles 
+                          if id_materia in contexto['materias_estadia']]
+    if estadias_disponibles:
+        grupos_estadia = [id_grupo for id_grupo, _ in grupos_por_materia.get(estadias_disponibles[0], ())
+                          if lugares[id_grupo] > 0]
+        if grupos_estadia:
+            id_grupo = random.choice(grupos_estadia)
+            lugares[id_grupo] -= 1
+            inscripciones.append((id_inscripcion, id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion, True))
+        return inscripciones
+    
+    # Determinar número de materias a inscribir según tipo de estudiante
+    if status == "Regular":
+        num_materias = min(len(materias_disponibles), 7)  # Exactamente 7 materias para regulares
+    else:
+        num_materias = min(len(materias_disponibles), random.randint(3, 5))  # 3-5 materias para irregulares
+    
+    # Priorizar materias del cuatrimestre actual
+    random.shuffle(materias_cuatrimestre_actual)
+    random.shuffle(materias_otros_cuatrimestres)
+    
+    # Inscribir en un grupo compatible para cada materia, hasta completar la carga;
+    # si una materia no tiene grupo compatible se pasa a la siguiente
+    ocupado = 0
+    for id_materia in materias_cuatrimestre_actual + materias_otros_cuatrimestres:
+        if len(inscripciones) >= num_materias:
+            break
         
-        # Profesores preferidos
-        profesores_preferidos = ""  # Dejar vacío por simplicidad
+        compatibles = [(id_grupo, mascara) for id_grupo, mascara in grupos_por_materia.get(id_materia, ())
+                       if not mascara & ocupado and lugares[id_grupo] > 0]
+        if not compatibles:
+            continue
+        
+        id_grupo, mascara = random.choice(compatibles)
+        lugares[id_grupo] -= 1
+        ocupado |= mascara
+        inscripciones.append((id_inscripcion, id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion, True))
+        id_inscripcion += 1
+    
+    return inscripciones
+
+def generar_estudiantes_y_registros(carpeta, id_inicial, id_final, contexto, formato="csv",
+                                    tamano_bloque=10000, fecha_inscripcion=None):
+    """Genera estudiantes, historial, preferencias e inscripciones en una sola pasada.
+    
+    Cada estudiante se genera junto con todos sus registros y se escribe de
+    inmediato, de modo que ningún archivo se acumula completo en memoria. Las
+    inscripciones se numeran desde 1 y solo usan los lugares que le tocan al
+    lote (ver repartir_lugares).
+    
+    Args:
+        carpeta (str): Carpeta de salida
+        id_inicial (int): Primer ID de estudiante del rango
+        id_final (int): Último ID de estudiante del rango (incluido)
+        contexto (dict): Índices de preparar_contexto_inscripciones
+        formato (str): "csv", "bin" o "ambos"
+        tamano_bloque (int): Filas por bloque al escribir
+        fecha_inscripcion (str, optional): Fecha de las inscripciones (por defecto, hoy)
+    
+    Returns:
+        tuple: (número de filas escritas por tabla, inscripciones generadas por grupo)
+    """
+    lugares_lote = repartir_lugares(contexto, id_inicial, id_final)
+    contexto = dict(contexto, lugares=dict(lugares_lote))
+    materias_por_cuatrimestre = contexto['materias_por_cuatrimestre']
+    fecha_inscripcion = fecha_inscripcion or datetime.now().strftime("%Y-%m-%d")
+    id_inscripcion = 1
+    
+    def abrir(nombre):
+        return EscritorTabla(carpeta, nombre, TABLAS_POR_ESTUDIANTE[nombre], formato, tamano_bloque)
+    
+    with abrir("estudiantes.csv") as estudiantes, \
+         abrir("historial_academico.csv") as historial, \
+         abrir("preferencias_estudiante.csv") as preferencias, \
+         abrir("inscripciones.csv") as inscripciones:
         
-        preferencias.append((id_estudiante, preferencia_hora, dias_str, profesores_preferidos))
+        for id_estudiante in range(id_inicial, id_final + 1):
+            estudiante = generar_estudiante(id_estudiante)
+            estudiantes.escribir(estudiante)
+            filas_historial = generar_historial_estudiante(estudiante, materias_por_cuatrimestre)
+            historial.escribir_filas(filas_historial)
+            preferencias.escribir(generar_preferencia_estudiante(estudiante))
+            
+            aprobadas = {fila[1] for fila in filas_historial if fila[4]}
+            filas = generar_inscripciones_estudiante(estudiante, aprobadas, contexto, id_inscripcion, fecha_inscripcion)
+            inscripciones.escribir_filas(filas)
+            id_inscripcion += len(filas)
     
-    with open(os.path.join(carpeta, "preferencias_estudiante.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["id_estudiante", "preferencia_hora", "dias_preferidos", "profesores_preferidos"])
-        writer.writerows(preferencias)
+    conteos = {
+        'estudiantes': estudiantes.filas_escritas,
+        'historial': historial.filas_escritas,
+        'preferencias': preferencias.filas_escritas,
+        'inscripciones': inscripciones.filas_escritas
+    }
+    ocupados = {id_grupo: lugares - contexto['lugares'][id_grupo]
+                for id_grupo, lugares in lugares_lote.items() if lugares != contexto['lugares'][id_grupo]}
+    return conteos, ocupados
+
+def generar_lote(carpeta, numero_lote, id_inicial, id_final, contexto, semilla, formato="csv",
+                 tamano_bloque=10000, fecha_inscripcion=None):
+    """Genera los registros de un lote de estudiantes con su propia semilla.
     
-    return preferencias
+    La semilla del lote depende solo de la semilla base y del número de lote,
+    por lo que el resultado es el mismo sin importar qué proceso lo genere.
+    """
+    random.seed(f"{semilla}-{numero_lote}")
+    return generar_estudiantes_y_registros(carpeta, id_inicial, id_final, contexto,
+                                           formato, tamano_bloque, fecha_inscripcion)
 
-def generar_todos_los_datos(carpeta="data"):
-    """Genera todos los archivos CSV."""
+def _generar_lote_en_proceso(argumentos):
+    """Punto de entrada de generar_lote en un proceso trabajador."""
+    return generar_lote(*argumentos)
+
+def combinar_lotes(carpeta, carpetas_lotes, formato="csv", tamano_bloque=10000):
+    """Une los archivos de los lotes en los archivos finales de la carpeta.
+    
+    Los lotes se concatenan en orden de ID de estudiante; las inscripciones se
+    renumeran para que sus IDs sean únicos y consecutivos en todo el campus.
+    """
+    for nombre, columnas in TABLAS_POR_ESTUDIANTE.items():
+        renumerar = nombre == "inscripciones.csv"
+        
+        if formato in ("csv", "ambos"):
+            with open(os.path.join(carpeta, nombre), 'w', newline='', encoding='utf-8') as destino:
+                escritor = csv.writer(destino)
+                escritor.writerow(columnas)
+                id_inscripcion = 1
+                for carpeta_lote in carpetas_lotes:
+                    with open(os.path.join(carpeta_lote, nombre), newline='', encoding='utf-8') as origen:
+                        next(origen)  # Encabezado
+                        if not renumerar:
+                            shutil.copyfileobj(origen, destino)
+                            continue
+                        for fila in csv.reader(origen):
+                            fila[0] = id_inscripcion
+                            escritor.writerow(fila)
+                            id_inscripcion += 1
+        
+        if formato in ("bin", "ambos"):
+            nombre_binario = os.path.splitext(nombre)[0] + EXTENSION_BINARIA
+            with EscritorBinario(os.path.join(carpeta, nombre_binario), columnas, tamano_bloque) as escritor:
+                id_inscripcion = 1
+                for carpeta_lote in carpetas_lotes:
+                    _, bloques = leer_bloques(os.path.join(carpeta_lote, nombre_binario))
+                    for bloque in bloques:
+                        if renumerar:
+                            bloque = [(id_inscripcion + i,) + fila[1:] for i, fila in enumerate(bloque)]
+                            id_inscripcion += len(bloque)
+                        escritor.escribir_filas(bloque)
+
+def generar_carrera(carpeta, num_estudiantes=200, grupos_por_materia=None, formato="csv", tamano_bloque=10000,
+                    semilla=None, procesos=1, estudiantes_por_lote=5000):
+    """Genera todos los archivos de una carrera en una carpeta.
+    
+    El catálogo (materias, seriación, grupos y horarios) se genera en este
+    proceso. Los estudiantes y sus registros se generan por lotes de IDs
+    consecutivos, en paralelo si procesos > 1, y al final se combinan; todos los
+    lotes usan el mismo catálogo, por lo que las referencias entre archivos son
+    consistentes. El resultado no depende del número de procesos.
+    
+    Sin grupos_por_materia, el número de grupos crece con los estudiantes (ver
+    calcular_grupos_por_materia).
+    """
     carpeta = crear_carpeta_datos(carpeta)
     print(f"Generando datos en carpeta: {carpeta}")
+    inicio = time.time()
+    
+    if semilla is None:
+        semilla = random.getrandbits(64)
+    random.seed(semilla)
     
     print("Generando materias.csv...")
-    materias = generar_materias(carpeta)
+    materias = generar_materias(carpeta, formato)
     
     print("Generando seriacion.csv...")
-    seriacion = generar_seriacion(carpeta)
+    seriacion = generar_seriacion(carpeta, formato)
     
     print("Generando dependencias_proyectos.csv...")
-    dependencias = generar_dependencias_proyectos(carpeta)
+    dependencias = generar_dependencias_proyectos(carpeta, formato)
     
-    print("Generando grupos.csv y horarios.csv...")
-    grupos, horarios = generar_grupos_y_horarios(carpeta, materias)
+    print("Generando grupos y horarios.csv...")
+    if grupos_por_materia is None:
+        grupos_por_materia = calcular_grupos_por_materia(num_estudiantes)
+    grupos, num_horarios, mascaras = generar_grupos_y_horarios(carpeta, materias, grupos_por_materia, formato, tamano_bloque)
+    contexto = preparar_contexto_inscripciones(materias, grupos, mascaras, seriacion, dependencias, num_estudiantes)
     
-    print("Generando estudiantes.csv...")
-    estudiantes = generar_estudiantes(carpeta)
+    print("Generando estudiantes, historial académico, preferencias e inscripciones...")
+    fecha_inscripcion = datetime.now().strftime("%Y-%m-%d")
+    rangos = [(id_inicial, min(id_inicial + estudiantes_por_lote - 1, num_estudiantes))
+              for id_inicial in range(1, num_estudiantes + 1, estudiantes_por_lote)]
     
-    print("Generando historial_academico.csv...")
-    historial = generar_historial_academico(carpeta, estudiantes, materias)
+    if len(rangos) == 1:
+        # Un solo lote: se escribe directamente en la carpeta
+        resultados = [generar_lote(carpeta, 1, 1, num_estudiantes, contexto, semilla,
+                                   formato, tamano_bloque, fecha_inscripcion)]
+    else:
+        carpeta_lotes = os.path.join(carpeta, ".lotes")
+        carpetas = [crear_carpeta_datos(os.path.join(carpeta_lotes, f"lote_{numero}"))
+                    for numero in range(1, len(rangos) + 1)]
+        argumentos = [(carpeta_lote, numero, id_inicial, id_final, contexto, semilla,
+                       formato, tamano_bloque, fecha_inscripcion)
+                      for numero, (carpeta_lote, (id_inicial, id_final)) in enumerate(zip(carpetas, rangos), 1)]
+        
+        try:
+            if procesos > 1:
+                with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+                    resultados = list(ejecutor.map(_generar_lote_en_proceso, argumentos))
+            else:
+                resultados = [_generar_lote_en_proceso(argumento) for argumento in argumentos]
+            
+            print(f"Combinando {len(carpetas)} lotes...")
+            combinar_lotes(carpeta, carpetas, formato, tamano_bloque)
+        finally:
+            shutil.rmtree(carpeta_lotes, ignore_errors=True)
     
-    print("Generando preferencias_estudiante.csv...")
-    preferencias = generar_preferencias(carpeta, estudiantes)
+    conteos = {tabla: sum(conteo[tabla] for conteo, _ in resultados) for tabla in resultados[0][0]}
     
-    print("Generando inscripciones.csv...")
-    inscripciones = generar_inscripciones(carpeta, estudiantes, grupos, materias, seriacion)
+    # grupos.csv al final: su cupo actual son las inscripciones de todos los lotes
+    ocupados = {}
+    for _, ocupados_lote in resultados:
+        for id_grupo, cantidad in ocupados_lote.items():
+            ocupados[id_grupo] = ocupados.get(id_grupo, 0) + cantidad
+    escribir_grupos(carpeta, grupos, ocupados, formato)
     
     print("¡Datos generados con éxito!")
     print(f"Materias: {len(materias)}")
     print(f"Seriaciones: {len(seriacion)}")
     print(f"Dependencias: {len(dependencias)}")
     print(f"Grupos: {len(grupos)}")
-    print(f"Horarios: {len(horarios)}")
-    print(f"Estudiantes: {len(estudiantes)}")
-    print(f"Registros de historial: {len(historial)}")
-    print(f"Preferencias: {len(preferencias)}")
-    print(f"Inscripciones: {len(inscripciones)}")
+    print(f"Horarios: {num_horarios}")
+    print(f"Estudiantes: {conteos['estudiantes']}")
+    print(f"Registros de historial: {conteos['historial']}")
+    print(f"Preferencias: {conteos['preferencias']}")
+    print(f"Inscripciones: {conteos['inscripciones']}")
+    print(f"Tiempo: {time.time() - inicio:.1f} s")
 
-def generar_inscripciones(carpeta, estudiantes, grupos, materias, seriacion):
-    """Genera inscripciones.csv."""
-    from datetime import datetime
+def generar_todos_los_datos(carpeta="data", escala=1, num_carreras=1, grupos_por_materia=None,
+                            semilla=None, formato="csv", tamano_bloque=10000, procesos=1,
+                            estudiantes_por_lote=5000):
+    """Genera todos los archivos de datos.
     
-    inscripciones = []
-    id_inscripcion = 1
+    Con varias carreras, cada subcarpeta es un conjunto de datos independiente y
+    completo: todas usan el mismo plan de estudios (los mismos IDs de materia),
+    con grupos, estudiantes e inscripciones propios, y cada una se carga con su
+    propio DataLoader. No forman un catálogo combinado.
     
-    # Agrupar grupos por materia
-    grupos_por_materia = {}
-    # Corregimos esta parte: grupos es una lista de tuplas de 5 elementos
-    for grupo_tupla in grupos:
-        id_grupo, id_materia = grupo_tupla[0], grupo_tupla[1]  # Los dos primeros elementos
-        if id_materia not in grupos_por_materia:
-            grupos_por_materia[id_materia] = []
-        grupos_por_materia[id_materia].append(id_grupo)
+    Args:
+        carpeta (str): Carpeta de salida
+        escala (float): Factor de escala; cada carrera tiene 200 * escala estudiantes
+            y, salvo que se indique grupos_por_materia, grupos en proporción
+        num_carreras (int): Número de carreras; con más de una, cada carrera se
+            genera en su propia subcarpeta (carrera_1, carrera_2, ...)
+        grupos_por_materia (tuple, optional): Rango (mínimo, máximo) fijo de grupos
+            por materia; por defecto se calcula con el número de estudiantes
+        semilla (int, optional): Semilla para obtener datos reproducibles
+        formato (str): "csv", "bin" o "ambos"
+        tamano_bloque (int): Filas por bloque al escribir
+        procesos (int): Procesos para generar los lotes de estudiantes
+        estudiantes_por_lote (int): Estudiantes por lote
+    """
+    if semilla is None:
+        semilla = random.getrandbits(64)
     
-    # Fecha actual para inscripciones
-    fecha_inscripcion = datetime.now().strftime("%Y-%m-%d")
+    num_estudiantes = max(1, round(200 * escala))
     
-    # Obtener IDs de materias de estadía
-    materias_estadia = [m[0] for m in materias if m[5] == "Estadía"]
+    if num_carreras <= 1:
+        generar_carrera(carpeta, num_estudiantes, grupos_por_materia, formato, tamano_bloque,
+                        semilla, procesos, estudiantes_por_lote)
+        return
     
-    for id_estudiante, nombre, cuatrimestre, status, creditos_acumulados, max_creditos in estudiantes:
-        # Solo consideramos estudiantes en cuatrimestres activos (1-10)
-        if not 1 <= cuatrimestre <= 10:
-            continue
-            
-        # Determinar materias disponibles (considerando seriación)
-        materias_disponibles = []
-        for id_materia, nombre_materia, cuatri_materia, creditos, horas, tipo in materias:
-            # Verificar que la materia corresponde al cuatrimestre actual o anterior
-            if (status == "Regular" and cuatri_materia != cuatrimestre) or \
-               (status == "Irregular" and cuatri_materia > cuatrimestre):
-                continue
-                
-            # Verificar seriación (simplificada)
-            prerequisitos_cumplidos = True
-            for id_req, id_prereq in seriacion:
-                if id_req == id_materia:
-                    # Simplificación: Asumimos que los prerrequisitos están cumplidos
-                    # En un caso real, habría que verificar el historial académico
-                    pass
-            
-            if prerequisitos_cumplidos:
-                materias_disponibles.append(id_materia)
-        
-        # Verificar si hay materias de estadía disponibles
-        estadias_disponibles = [id_materia for id_materia in materias_disponibles 
-                              if id_materia in materias_estadia]
-        
-        # Si hay estadías disponibles, solo se puede cursar esa materia
-        if estadias_disponibles:
-            id_estadia = estadias_disponibles[0]  # Tomar la primera estadía disponible
-            
-            if id_estadia in grupos_por_materia and grupos_por_materia[id_estadia]:
-                id_grupo = random.choice(grupos_por_materia[id_estadia])
-                
-                inscripciones.append((
-                    id_inscripcion,
-                    id_estudiante,
-                    id_grupo,
-                    cuatrimestre,
-                    fecha_inscripcion,
-                    True  # activa
-                ))
-                
-                id_inscripcion += 1
-                
-            # Si hay una estadía disponible, no se deben inscribir otras materias
-            continue
-        
-        # Determinar número de materias a inscribir según tipo de estudiante
-        if status == "Regular":
-            num_materias = min(len(materias_disponibles), 7)  # Exactamente 7 materias para regulares
-        else:
-            num_materias = min(len(materias_disponibles), random.randint(3, 5))  # 3-5 materias para irregulares
-        
-        # Seleccionar materias priorizando las del cuatrimestre actual
-        materias_cuatrimestre_actual = []
-        materias_otros_cuatrimestres = []
-        
-        for id_materia in materias_disponibles:
-            materia_data = next((m for m in materias if m[0] == id_materia), None)
-            if materia_data and materia_data[2] == cuatrimestre:
-                materias_cuatrimestre_actual.append(id_materia)
-            else:
-                materias_otros_cuatrimestres.append(id_materia)
-        
-        # Priorizar materias del cuatrimestre actual
-        random.shuffle(materias_cuatrimestre_actual)
-        random.shuffle(materias_otros_cuatrimestres)
-        
-        materias_seleccionadas = (materias_cuatrimestre_actual + 
-                                 materias_otros_cuatrimestres)[:num_materias]
-        
-        # Inscribir en un grupo para cada materia
-        for id_materia in materias_seleccionadas:
-            if id_materia in grupos_por_materia and grupos_por_materia[id_materia]:
-                id_grupo = random.choice(grupos_por_materia[id_materia])
-                
-                inscripciones.append((
-                    id_inscripcion,
-                    id_estudiante,
-                    id_grupo,
-                    cuatrimestre,
-                    fecha_inscripcion,
-                    True  # activa
-                ))
-                
-                id_inscripcion += 1
-    
-    # Guardar a CSV
-    with open(os.path.join(carpeta, "inscripciones.csv"), 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "id_inscripcion", "id_estudiante", "id_grupo", 
-            "cuatrimestre", "fecha_inscripcion", "activa"
-        ])
-        writer.writerows(inscripciones)
-    
-    return inscripciones
+    for numero in range(1, num_carreras + 1):
+        generar_carrera(os.path.join(carpeta, f"carrera_{numero}"), num_estudiantes, grupos_por_materia,
+                        formato, tamano_bloque, f"{semilla}-carrera{numero}", procesos, estudiantes_por_lote)
+
+def leer_rango(texto):
+    """Convierte '2-3' o '20' en una tupla (mínimo, máximo)."""
+    partes = [int(parte) for parte in texto.split('-')]
+    return (partes[0], partes[-1])
 
 if __name__ == "__main__":
-    generar_todos_los_datos()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Genera un campus sintético para UNICARGA")
+    parser.add_argument('--carpeta', default='data', help="Carpeta de salida")
+    parser.add_argument('--escala', type=float, default=1, help="Factor de escala (200 estudiantes por unidad)")
+    parser.add_argument('--carreras', type=int, default=1,
+                        help="Número de carreras (conjuntos de datos independientes, una subcarpeta por carrera)")
+    parser.add_argument('--grupos-por-materia', type=leer_rango, default=None,
+                        help="Rango fijo de grupos por materia, p. ej. 2-3 (por defecto, según el número de estudiantes)")
+    parser.add_argument('--semilla', type=int, default=None, help="Semilla para datos reproducibles")
+    parser.add_argument('--formato', choices=FORMATOS, default='csv', help="Formato de salida")
+    parser.add_argument('--bloque', type=int, default=10000, help="Filas por bloque al escribir")
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1, help="Procesos para generar los estudiantes")
+    parser.add_argument('--estudiantes-por-lote', type=int, default=5000, help="Estudiantes por lote")
+    args = parser.parse_args()
+    
+    generar_todos_los_datos(args.carpeta, args.escala, args.carreras, args.grupos_por_materia,
+                            args.semilla, args.formato, args.bloque, args.procesos,
+                            args.estudiantes_por_lote)
@@ -0,0 +1,75 @@
+"""Configuración de gunicorn para UNICARGA.
+
+El catálogo se carga una sola vez en el proceso maestro (preload_app) antes de
+crear los trabajadores, que lo comparten mediante copia en escritura.
+Enviar SIGHUP al maestro recarga el catálogo desde los CSV y reemplaza a los
+trabajadores de forma gradual: los antiguos terminan sus peticiones en curso.
+"""
+import gc
+import config as config_unicarga
+
+# Sin almacén SQLite las inscripciones se escriben en data/inscripciones.log, que
+# cada trabajador numeraría y compactaría por su cuenta con su propio estado en
+# memoria: con varios trabajadores se repetirían IDs y se perderían cambios
+if config_unicarga.TRABAJADORES > 1 and not config_unicarga.RUTA_BD:
+    raise RuntimeError(
+        f"UNICARGA_TRABAJADORES={config_unicarga.TRABAJADORES} requiere UNICARGA_BD: "
+        "la bitácora de inscripciones solo admite un trabajador"
+    )
+
+bind = f"{config_unicarga.HOST}:{config_unicarga.PUERTO}"
+workers = config_unicarga.TRABAJADORES
+threads = config_unicarga.HILOS
+worker_class = 'gthread'
+timeout = config_unicarga.TIEMPO_ESPERA
+graceful_timeout = config_unicarga.TIEMPO_GRACIA
+preload_app = True
+
+
+def _congelar_memoria():
+    """Mueve los objetos actuales a la generación permanente del recolector.
+
+    Así el recolector de los trabajadores no escribe en las páginas del catálogo
+    heredadas del maestro y estas siguen compartidas.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def when_ready(server):
+    """Se ejecuta en el maestro tras precargar la aplicación."""
+    _congelar_memoria()
+    server.log.info("Catálogo precargado en el proceso maestro")
+
+
+def on_reload(server):
+    """Recarga el catálogo en el maestro antes de lanzar los nuevos trabajadores."""
+    from api.routes import recargar_catalogo
+
+    gc.unfreeze()
+    try:
+        catalogo = recargar_catalogo()
+        server.log.info("Catálogo recargado (versión %s)", catalogo.version_catalogo)
+    except Exception as e:
+        # Si la recarga falla, los nuevos trabajadores conservan el catálogo anterior
+        server.log.error("Error al recargar el catálogo: %s", e)
+    _congelar_memoria()
+
+
+def post_worker_init(worker):
+    """Inicia la vigilancia del catálogo en cada trabajador (los hilos no sobreviven al fork).
+
+    Los procesos de planificación de trayectorias se crean antes, mientras el
+    trabajador todavía tiene un solo hilo.
+    """
+    from api.routes import iniciar_procesos_trayectoria, iniciar_vigilancia_catalogo
+
+    iniciar_procesos_trayectoria()
+    iniciar_vigilancia_catalogo()
+
+
+def worker_exit(server, worker):
+    """Termina los procesos de planificación de trayectorias del trabajador."""
+    from api.routes import procesos_trayectoria
+
+    procesos_trayectoria.detener()
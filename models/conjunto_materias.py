@@ -0,0 +1,131 @@
+import threading
+
+
+class IndiceMaterias:
+    """Asigna a cada ID de materia una posición de bit.
+
+    Las posiciones se asignan en el orden en que aparecen las materias y no
+    cambian durante la vida del proceso, de modo que cualquier conjunto de
+    materias se representa con un entero y las verificaciones de seriación se
+    reducen a operaciones entre enteros.
+    """
+
+    def __init__(self):
+        self._bits = {}
+        self._ids = []
+        self._lock = threading.Lock()
+
+    def bit(self, id_materia):
+        """Devuelve la máscara (1 << posición) de una materia, asignándole posición si no tiene."""
+        posicion = self._bits.get(id_materia)
+        if posicion is None:
+            with self._lock:
+                posicion = self._bits.get(id_materia)
+                if posicion is None:
+                    posicion = len(self._ids)
+                    self._ids.append(id_materia)
+                    self._bits[id_materia] = posicion
+        return 1 << posicion
+
+    def bit_asignado(self, id_materia):
+        """Devuelve la máscara de una materia sin asignarle posición (0 si no tiene)."""
+        posicion = self._bits.get(id_materia)
+        return 0 if posicion is None else 1 << posicion
+
+    def mascara(self, ids_materias):
+        """Devuelve la máscara de un conjunto de IDs de materia."""
+        mascara = 0
+        for id_materia in ids_materias:
+            mascara |= self.bit(id_materia)
+        return mascara
+
+    def ids(self, mascara):
+        """Itera los IDs de materia de una máscara, en orden de posición."""
+        ids = self._ids
+        while mascara:
+            menor = mascara & -mascara
+            yield ids[menor.bit_length() - 1]
+            mascara ^= menor
+
+
+# Índice compartido por todo el proceso: las máscaras de distintos objetos son comparables
+INDICE_MATERIAS = IndiceMaterias()
+
+
+class ConjuntoMaterias:
+    """Conjunto de IDs de materia representado como un entero de bits.
+
+    Se usa como un set (in, add, len, iteración), pero copiarlo solo copia un
+    entero y verificar que contiene todas las materias de una máscara es
+    (mascara & ~conjunto.bits) == 0.
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, ids_materias=(), bits=0):
+        """Crea el conjunto.
+
+        Args:
+            ids_materias (iterable): IDs de materia iniciales
+            bits (int): Máscara inicial (ver INDICE_MATERIAS)
+        """
+        self.bits = bits | self.mascara_de(ids_materias)
+
+    @staticmethod
+    def mascara_de(materias):
+        """Devuelve la máscara de un ConjuntoMaterias o de cualquier iterable de IDs."""
+        if isinstance(materias, ConjuntoMaterias):
+            return materias.bits
+        return INDICE_MATERIAS.mascara(materias)
+
+    def contiene_todas(self, mascara):
+        """Indica si el conjunto contiene todas las materias de la máscara."""
+        return not mascara & ~self.bits
+
+    def add(self, id_materia):
+        self.bits |= INDICE_MATERIAS.bit(id_materia)
+
+    def discard(self, id_materia):
+        self.bits &= ~INDICE_MATERIAS.bit_asignado(id_materia)
+
+    def update(self, ids_materias):
+        self.bits |= self.mascara_de(ids_materias)
+
+    def copy(self):
+        return ConjuntoMaterias(bits=self.bits)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce__(self):
+        # Las posiciones de bit son propias de cada proceso: se serializan los IDs
+        return ConjuntoMaterias, (list(self),)
+
+    def __contains__(self, id_materia):
+        return bool(self.bits & INDICE_MATERIAS.bit_asignado(id_materia))
+
+    def __iter__(self):
+        return INDICE_MATERIAS.ids(self.bits)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __bool__(self):
+        return bool(self.bits)
+
+    def __or__(self, otro):
+        return ConjuntoMaterias(bits=self.bits | self.mascara_de(otro))
+
+    def __eq__(self, otro):
+        if isinstance(otro, ConjuntoMaterias):
+            return self.bits == otro.bits
+        if isinstance(otro, (set, frozenset)):
+            return set(self) == otro
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ConjuntoMaterias({sorted(self, key=str)})"
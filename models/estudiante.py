@@ -1,6 +1,16 @@
+import sys
+from models.conjunto_materias import ConjuntoMaterias
+
+
 class Estudiante:
     """Clase que representa a un estudiante en el sistema."""
     
+    # Sin __dict__ por instancia: hay decenas de miles de estudiantes en memoria.
+    # inscripciones_simuladas solo se asigna en las copias que usa la
+    # planificación de trayectoria
+    __slots__ = ('id', 'nombre', 'cuatrimestre', 'status', 'creditos_acumulados', 'max_creditos',
+                 'materias_aprobadas', 'preferencias', 'inscripciones_simuladas')
+    
     def __init__(self, id_estudiante, nombre, cuatrimestre, status, creditos_acumulados, max_creditos):
         """Inicializa un nuevo estudiante.
         
@@ -15,10 +25,10 @@ class Estudiante:
         self.id = id_estudiante
         self.nombre = nombre
         self.cuatrimestre = cuatrimestre
-        self.status = status
+        self.status = sys.intern(status) if isinstance(status, str) else status
         self.creditos_acumulados = creditos_acumulados
         self.max_creditos = max_creditos
-        self.materias_aprobadas = set()  # Conjunto de IDs de materias aprobadas
+        self.materias_aprobadas = ConjuntoMaterias()  # Conjunto de IDs de materias aprobadas (bits)
         self.preferencias = {}  # Diccionario de preferencias
     
     def agregar_materia_aprobada(self, id_materia):
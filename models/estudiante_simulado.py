@@ -0,0 +1,78 @@
+from models.conjunto_materias import ConjuntoMaterias
+
+
+class EstudianteSimulado:
+    """Estudiante de una simulación (planificación de trayectoria o escenarios).
+
+    En lugar de copiar el Estudiante, lo referencia como base de solo lectura y
+    guarda únicamente lo que la simulación cambia: el cuatrimestre, los campos
+    sobrescritos, las materias aprobadas (una copia de la máscara de bits, que
+    es un entero) y las inscripciones simuladas. Cualquier otro atributo
+    (nombre, preferencias, max_creditos, ...) se lee de la base.
+
+    Crear uno o bifurcarlo para explorar otra alternativa no copia el nombre,
+    las preferencias ni el historial del estudiante.
+    """
+
+    __slots__ = ('base', 'cuatrimestre', 'materias_aprobadas', 'inscripciones_simuladas', '_campos')
+
+    def __init__(self, base, cuatrimestre=None, **campos):
+        """Crea la simulación de un estudiante.
+
+        Args:
+            base (Estudiante or EstudianteSimulado): Estudiante simulado; si es otra
+                simulación, se parte de su estado actual
+            cuatrimestre (int, optional): Cuatrimestre simulado (por defecto el de la base)
+            **campos: Otros atributos sobrescritos (status, max_creditos, ...)
+        """
+        if isinstance(base, EstudianteSimulado):
+            campos = {**base._campos, **campos}
+            inscripciones = list(base.inscripciones_simuladas)
+        else:
+            inscripciones = []
+
+        object.__setattr__(self, 'base', base.base if isinstance(base, EstudianteSimulado) else base)
+        object.__setattr__(self, '_campos', campos)
+        self.cuatrimestre = base.cuatrimestre if cuatrimestre is None else cuatrimestre
+        self.materias_aprobadas = ConjuntoMaterias(bits=ConjuntoMaterias.mascara_de(base.materias_aprobadas))
+        self.inscripciones_simuladas = inscripciones
+
+    def __getattr__(self, nombre):
+        # Solo se llama para atributos que no están en __slots__
+        if nombre.startswith('_'):
+            raise AttributeError(nombre)
+        campos = self._campos
+        if nombre in campos:
+            return campos[nombre]
+        return getattr(self.base, nombre)
+
+    def __setattr__(self, nombre, valor):
+        if nombre in EstudianteSimulado.__slots__:
+            object.__setattr__(self, nombre, valor)
+        else:
+            self._campos[nombre] = valor
+
+    def bifurcar(self, cuatrimestre=None, **campos):
+        """Devuelve una simulación independiente que parte del estado actual de ésta."""
+        return EstudianteSimulado(self, cuatrimestre, **campos)
+
+    def materias_aprobadas_simuladas(self):
+        """Materias aprobadas en la simulación que el estudiante base no tiene aprobadas."""
+        base = ConjuntoMaterias.mascara_de(self.base.materias_aprobadas)
+        return ConjuntoMaterias(bits=self.materias_aprobadas.bits & ~base)
+
+    def es_regular(self):
+        """Verifica si el estudiante (con el status simulado, si se sobrescribió) es regular."""
+        return self.status.lower() == 'regular'
+
+    def to_dict(self):
+        """Convierte el estudiante simulado a un diccionario."""
+        datos = self.base.to_dict()
+        datos.update(self._campos)
+        datos['cuatrimestre'] = self.cuatrimestre
+        datos['materias_aprobadas'] = list(self.materias_aprobadas)
+        datos['inscripciones_simuladas'] = list(self.inscripciones_simuladas)
+        return datos
+
+    def __str__(self):
+        return f"{self.nombre} (ID: {self.id}, Cuatrimestre simulado: {self.cuatrimestre}, Status: {self.status})"
@@ -1,6 +1,50 @@
+import sys
+
+
+def _texto(valor):
+    """Devuelve la copia compartida (internada) de un texto repetido."""
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+
+def hora_entera(hora):
+    """Convierte una hora ('10:00' o 10) a entero, descartando los minutos.
+    
+    Un valor que no se puede convertir se conserva tal cual para que la
+    validación del catálogo lo reporte.
+    """
+    try:
+        return int(hora.split(':')[0]) if isinstance(hora, str) else int(hora)
+    except (ValueError, TypeError):
+        return hora
+
+
+def codificar_sesion(dia, hora_inicio, hora_fin, aula):
+    """Convierte una sesión a su forma compacta: (día, hora_inicio, hora_fin, aula).
+    
+    El día y las horas se guardan como enteros y el aula como texto internado.
+    """
+    try:
+        dia = int(dia)
+    except (ValueError, TypeError):
+        pass
+    return (dia, hora_entera(hora_inicio), hora_entera(hora_fin), _texto(aula))
+
+
+def formatear_hora(hora):
+    """Convierte una hora entera al formato 'HH:00' de los archivos de datos."""
+    return f"{hora:02d}:00" if isinstance(hora, int) else hora
+
+
 class Grupo:
     """Clase que representa un grupo para una materia."""
     
+    # Campos fijos: un campus generado con --escala 250 tiene decenas de miles de grupos,
+    # y DataLoader._copiar_grupo copia el grupo en cada edición de cupo u horario
+    __slots__ = ('id', 'id_materia', 'profesor', 'cupo_maximo', 'cupo_actual', '_horarios')
+    
+    # Se permite ocupar hasta el 110% del cupo máximo (cargas manuales adicionales)
+    FACTOR_CUPO = 1.1
+    
     def __init__(self, id_grupo, id_materia, profesor, cupo_maximo, cupo_actual):
         """Inicializa un nuevo grupo.
         
@@ -13,10 +57,19 @@ class Grupo:
         """
         self.id = id_grupo
         self.id_materia = id_materia
-        self.profesor = profesor
+        self.profesor = _texto(profesor)  # Un mismo profesor imparte varios grupos
         self.cupo_maximo = cupo_maximo
         self.cupo_actual = cupo_actual
-        self.horarios = []  # Lista de tuplas (día, hora_inicio, hora_fin, aula)
+        self._horarios = []  # Lista de tuplas (día, hora_inicio, hora_fin, aula)
+    
+    @property
+    def horarios(self):
+        """Sesiones del grupo: tuplas (día, hora_inicio, hora_fin, aula) con día y horas enteros."""
+        return self._horarios
+    
+    @horarios.setter
+    def horarios(self, horarios):
+        self._horarios = [codificar_sesion(*horario) for horario in horarios or []]
     
     def tiene_cupo(self):
         """Verifica si el grupo tiene cupo disponible.
@@ -26,11 +79,16 @@ class Grupo:
         """
         # Se considera que hay cupo si el actual está a menos del 110% del máximo
         # (para permitir algunas cargas manuales adicionales)
-        return self.cupo_actual < (self.cupo_maximo * 1.1)
+        return self.cupo_actual < (self.cupo_maximo * self.FACTOR_CUPO)
     
     def agregar_horario(self, dia, hora_inicio, hora_fin, aula):
         """Agrega un horario al grupo."""
-        self.horarios.append((dia, hora_inicio, hora_fin, aula))
+        self._horarios.append(codificar_sesion(dia, hora_inicio, hora_fin, aula))
+    
+    def horarios_formateados(self):
+        """Sesiones con las horas en formato 'HH:00', como en los archivos de datos."""
+        return [(dia, formatear_hora(hora_inicio), formatear_hora(hora_fin), aula)
+                for dia, hora_inicio, hora_fin, aula in self._horarios]
     
     def to_dict(self):
         """Convierte el grupo a un diccionario."""
@@ -40,7 +98,7 @@ class Grupo:
             'profesor': self.profesor,
             'cupo_maximo': self.cupo_maximo,
             'cupo_actual': self.cupo_actual,
-            'horarios': self.horarios
+            'horarios': self.horarios_formateados()
         }
     
     def __str__(self):
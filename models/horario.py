@@ -1,6 +1,16 @@
+from array import array
+
+
 class Horario:
-    """Clase que representa un horario académico."""
-    
+    """Clase que representa un horario académico.
+
+    La semana se guarda en un arreglo fijo de enteros de 5 días × 15 horas
+    (de 7am a 9pm). Cada celda contiene el índice de la clase que la ocupa (en
+    self._clases) o -1 si está libre, y una máscara de bits de las celdas
+    ocupadas permite verificar conflictos con un AND. La representación en
+    diccionarios (horario_semanal, to_dict) se construye solo cuando se pide.
+    """
+
     DIAS = {
         1: "Lunes",
         2: "Martes",
@@ -8,130 +18,173 @@ class Horario:
         4: "Jueves",
         5: "Viernes"
     }
-    
+
+    HORA_INICIO = 7
+    HORA_FIN = 22
+    HORAS_POR_DIA = HORA_FIN - HORA_INICIO
+    LIBRE = -1
+
+    # Arreglo vacío que se copia para cada horario nuevo
+    _CELDAS_VACIAS = array('h', [LIBRE]) * (len(DIAS) * HORAS_POR_DIA)
+
+    __slots__ = ('grupos', '_celdas', '_ocupado', '_clases', '_dict')
+
     def __init__(self, grupos=None):
         """Inicializa un nuevo horario.
-        
+
         Args:
             grupos (list, optional): Lista de IDs de grupos que conforman el horario.
         """
         self.grupos = grupos or []
-        self.horario_semanal = self._inicializar_horario_semanal()
-    
-    def _inicializar_horario_semanal(self):
-        """Inicializa la estructura del horario semanal."""
-        horario = {}
-        for dia in self.DIAS.keys():
-            horario[dia] = {}
-            for hora in range(7, 22):  # De 7am a 9pm
-                horario[dia][hora] = None
-        return horario
-    
+        self._celdas = array('h', self._CELDAS_VACIAS)
+        self._ocupado = 0
+        # Clases asignadas: (id_grupo, nombre de la materia, profesor, aula)
+        self._clases = []
+        self._dict = None
+
+    @classmethod
+    def _celda(cls, dia, hora):
+        """Índice de la celda de un día y hora, o None si queda fuera de la rejilla."""
+        if dia in cls.DIAS and cls.HORA_INICIO <= hora < cls.HORA_FIN:
+            return (dia - 1) * cls.HORAS_POR_DIA + hora - cls.HORA_INICIO
+        return None
+
+    @classmethod
+    def _celdas_sesion(cls, dia, hora_inicio, hora_fin):
+        """Celdas consecutivas de una sesión, recortada a la rejilla (rango vacío si queda fuera)."""
+        if dia not in cls.DIAS:
+            return range(0)
+        # Convertir horas a enteros si vienen como strings
+        if isinstance(hora_inicio, str):
+            hora_inicio = int(hora_inicio.split(':')[0])
+        if isinstance(hora_fin, str):
+            hora_fin = int(hora_fin.split(':')[0])
+        base = (dia - 1) * cls.HORAS_POR_DIA - cls.HORA_INICIO
+        return range(base + max(hora_inicio, cls.HORA_INICIO), base + min(hora_fin, cls.HORA_FIN))
+
     def agregar_grupo(self, id_grupo, grupo_obj, materia_obj):
         """Agrega un grupo al horario.
-        
+
         Args:
             id_grupo (int): ID del grupo a agregar.
             grupo_obj (Grupo): Objeto Grupo correspondiente.
             materia_obj (Materia): Objeto Materia correspondiente.
-            
+
         Returns:
             bool: True si se pudo agregar, False si hay conflicto.
         """
+        # Convertir cada sesión a celdas una sola vez
+        sesiones = []
+        mascara = 0
+        for dia, hora_inicio, hora_fin, aula in grupo_obj.horarios:
+            celdas = self._celdas_sesion(dia, hora_inicio, hora_fin)
+            if celdas:
+                mascara |= ((1 << len(celdas)) - 1) << celdas[0]
+            sesiones.append((celdas, aula))
+
         # Verificar conflictos con otros grupos ya asignados
-        for horario in grupo_obj.horarios:
-            dia, hora_inicio, hora_fin, _ = horario
-            
-            # Convertir horas a enteros si vienen como strings
-            if isinstance(hora_inicio, str):
-                hora_inicio = int(hora_inicio.split(':')[0])
-            if isinstance(hora_fin, str):
-                hora_fin = int(hora_fin.split(':')[0])
-            
-            # Verificar conflictos
-            for hora in range(hora_inicio, hora_fin):
-                if self.horario_semanal[dia][hora] is not None:
-                    return False
-        
+        if mascara & self._ocupado:
+            return False
+
         # Si no hay conflictos, agregar el grupo
         self.grupos.append(id_grupo)
-        
-        # Actualizar horario semanal
-        for horario in grupo_obj.horarios:
-            dia, hora_inicio, hora_fin, aula = horario
-            
-            # Convertir horas a enteros si vienen como strings
-            if isinstance(hora_inicio, str):
-                hora_inicio = int(hora_inicio.split(':')[0])
-            if isinstance(hora_fin, str):
-                hora_fin = int(hora_fin.split(':')[0])
-            
-            # Agregar información de la clase al horario
-            for hora in range(hora_inicio, hora_fin):
-                self.horario_semanal[dia][hora] = {
-                    'id_grupo': id_grupo,
-                    'materia': materia_obj.nombre,
-                    'profesor': grupo_obj.profesor,
-                    'aula': aula
-                }
-        
+        self._ocupado |= mascara
+        for celdas, aula in sesiones:
+            indice = len(self._clases)
+            self._clases.append((id_grupo, materia_obj.nombre, grupo_obj.profesor, aula))
+            for celda in celdas:
+                self._celdas[celda] = indice
+
+        self._dict = None
         return True
-    
+
+    def hay_conflicto(self, grupo_obj):
+        """Indica si un grupo se traslapa con las clases ya asignadas."""
+        for dia, hora_inicio, hora_fin, _ in grupo_obj.horarios:
+            celdas = self._celdas_sesion(dia, hora_inicio, hora_fin)
+            if celdas and self._ocupado & ((1 << len(celdas)) - 1) << celdas[0]:
+                return True
+        return False
+
+    def clase_en(self, dia, hora):
+        """Devuelve la clase (id_grupo, materia, profesor, aula) de un día y hora, o None."""
+        celda = self._celda(dia, hora)
+        if celda is None or self._celdas[celda] == self.LIBRE:
+            return None
+        return self._clases[self._celdas[celda]]
+
+    @property
+    def horario_semanal(self):
+        """Horario por día y hora ({dia: {hora: info o None}}), construido al pedirlo."""
+        horario = {}
+        for dia in self.DIAS:
+            horario[dia] = {}
+            for hora in range(self.HORA_INICIO, self.HORA_FIN):
+                clase = self.clase_en(dia, hora)
+                horario[dia][hora] = None if clase is None else {
+                    'id_grupo': clase[0],
+                    'materia': clase[1],
+                    'profesor': clase[2],
+                    'aula': clase[3]
+                }
+        return horario
+
     def obtener_materias(self, grupos_dict, materias_dict):
         """Obtiene la lista de materias en el horario.
-        
+
         Args:
             grupos_dict (dict): Diccionario de objetos Grupo por ID.
             materias_dict (dict): Diccionario de objetos Materia por ID.
-            
+
         Returns:
             list: Lista de diccionarios con información de las materias.
         """
         materias = []
-        materias_ids = set()
-        
+        por_id = {}
+
         for id_grupo in self.grupos:
             grupo = grupos_dict.get(id_grupo)
-            if grupo:
-                id_materia = grupo.id_materia
-                if id_materia not in materias_ids:
-                    materia = materias_dict.get(id_materia)
-                    if materia:
-                        materias_ids.add(id_materia)
-                        materias.append({
-                            'id': id_materia,
-                            'nombre': materia.nombre,
-                            'creditos': materia.creditos,
-                            'cuatrimestre': materia.cuatrimestre,
-                            'tipo': materia.tipo,
-                            'grupos': []
-                        })
-                
-                # Agregar grupo a la materia correspondiente
-                for materia in materias:
-                    if materia['id'] == id_materia:
-                        materia['grupos'].append({
-                            'id': id_grupo,
-                            'profesor': grupo.profesor,
-                            'horarios': grupo.horarios
-                        })
-        
+            if not grupo:
+                continue
+
+            id_materia = grupo.id_materia
+            if id_materia not in por_id:
+                materia = materias_dict.get(id_materia)
+                if not materia:
+                    continue
+                por_id[id_materia] = {
+                    'id': id_materia,
+                    'nombre': materia.nombre,
+                    'creditos': materia.creditos,
+                    'cuatrimestre': materia.cuatrimestre,
+                    'tipo': materia.tipo,
+                    'grupos': []
+                }
+                materias.append(por_id[id_materia])
+
+            # Agregar grupo a la materia correspondiente
+            por_id[id_materia]['grupos'].append({
+                'id': id_grupo,
+                'profesor': grupo.profesor,
+                'horarios': grupo.horarios_formateados()
+            })
+
         return materias
-    
+
     def calcular_estadisticas(self, grupos_dict, materias_dict):
         """Calcula estadísticas del horario.
-        
+
         Args:
             grupos_dict (dict): Diccionario de objetos Grupo por ID.
             materias_dict (dict): Diccionario de objetos Materia por ID.
-            
+
         Returns:
             dict: Diccionario con estadísticas del horario.
         """
         # Contar materias y créditos
         materias_unicas = set()
         total_creditos = 0
-        
+
         for id_grupo in self.grupos:
             grupo = grupos_dict.get(id_grupo)
             if grupo:
@@ -140,54 +193,54 @@ class Horario:
                 if materia and id_materia not in materias_unicas:
                     materias_unicas.add(id_materia)
                     total_creditos += materia.creditos
-        
-        # Calcular carga por día
-        carga_por_dia = {dia: 0 for dia in self.DIAS.keys()}
-        for dia, horas in self.horario_semanal.items():
+
+        # Materia de cada clase asignada
+        materia_de_clase = []
+        for id_grupo, _, _, _ in self._clases:
+            grupo = grupos_dict.get(id_grupo)
+            materia_de_clase.append(grupo.id_materia if grupo else None)
+
+        # Horas y materias distintas por día en una sola pasada por la rejilla
+        carga_por_dia = {}
+        horas_por_dia = {}
+        for dia in self.DIAS:
+            inicio = (dia - 1) * self.HORAS_POR_DIA
+            horas = 0
             materias_en_dia = set()
-            for hora, info in horas.items():
-                if info is not None:
-                    id_grupo = info['id_grupo']
-                    grupo = grupos_dict.get(id_grupo)
-                    if grupo:
-                        materias_en_dia.add(grupo.id_materia)
+            for indice in self._celdas[inicio:inicio + self.HORAS_POR_DIA]:
+                if indice != self.LIBRE:
+                    horas += 1
+                    if materia_de_clase[indice] is not None:
+                        materias_en_dia.add(materia_de_clase[indice])
             carga_por_dia[dia] = len(materias_en_dia)
-        
-        # Calcular horas por día
-        horas_por_dia = {dia: 0 for dia in self.DIAS.keys()}
-        for dia, horas in self.horario_semanal.items():
-            for hora, info in horas.items():
-                if info is not None:
-                    horas_por_dia[dia] += 1
-        
+            horas_por_dia[dia] = horas
+
         return {
             'total_materias': len(materias_unicas),
             'total_creditos': total_creditos,
             'carga_por_dia': carga_por_dia,
             'horas_por_dia': horas_por_dia
         }
-    
+
     def to_dict(self):
-        """Convierte el horario a un diccionario."""
+        """Convierte el horario a un diccionario (se construye una vez por cambio)."""
+        if self._dict is not None:
+            return self._dict
+
         horario_formateado = {}
-        
-        for dia, horas in self.horario_semanal.items():
-            dia_nombre = self.DIAS.get(dia, f"Día {dia}")
+        for dia, dia_nombre in self.DIAS.items():
             horario_formateado[dia_nombre] = {}
-            
-            for hora, info in horas.items():
-                hora_str = f"{hora}:00"
-                if info is not None:
-                    horario_formateado[dia_nombre][hora_str] = {
-                        'materia': info['materia'],
-                        'profesor': info['profesor'],
-                        'aula': info['aula'],
-                        'id_grupo': info['id_grupo']
-                    }
-                else:
-                    horario_formateado[dia_nombre][hora_str] = None
-        
-        return {
+            for hora in range(self.HORA_INICIO, self.HORA_FIN):
+                clase = self.clase_en(dia, hora)
+                horario_formateado[dia_nombre][f"{hora}:00"] = None if clase is None else {
+                    'materia': clase[1],
+                    'profesor': clase[2],
+                    'aula': clase[3],
+                    'id_grupo': clase[0]
+                }
+
+        self._dict = {
             'grupos': self.grupos,
             'horario_semanal': horario_formateado
-        }
\ No newline at end of file
+        }
+        return self._dict
@@ -1,6 +1,12 @@
+import sys
+
+
 class Inscripcion:
     """Clase que representa una inscripción de un estudiante a un grupo."""
     
+    # Sin __dict__ por instancia: hay cientos de miles de inscripciones en memoria
+    __slots__ = ('id', 'id_estudiante', 'id_grupo', 'cuatrimestre', 'fecha_inscripcion', 'activa')
+    
     def __init__(self, id_inscripcion, id_estudiante, id_grupo, cuatrimestre, 
                  fecha_inscripcion=None, activa=True):
         """Inicializa una nueva inscripción.
@@ -17,7 +23,8 @@ class Inscripcion:
         self.id_estudiante = id_estudiante
         self.id_grupo = id_grupo
         self.cuatrimestre = cuatrimestre
-        self.fecha_inscripcion = fecha_inscripcion
+        # Muchas inscripciones comparten fecha: una sola copia de cada una
+        self.fecha_inscripcion = sys.intern(fecha_inscripcion) if isinstance(fecha_inscripcion, str) else fecha_inscripcion
         self.activa = activa
     
     def to_dict(self):
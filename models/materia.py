@@ -1,6 +1,12 @@
+import sys
+
+
 class Materia:
     """Clase que representa una materia en el plan de estudios."""
     
+    # Campos fijos: actualizar_materia copia la materia (copy.copy) en cada edición del catálogo
+    __slots__ = ('id', 'nombre', 'cuatrimestre', 'creditos', 'horas_totales', 'tipo')
+    
     def __init__(self, id_materia, nombre, cuatrimestre, creditos, horas_totales, tipo):
         """Inicializa una nueva materia.
         
@@ -17,7 +23,8 @@ class Materia:
         self.cuatrimestre = cuatrimestre
         self.creditos = creditos
         self.horas_totales = horas_totales
-        self.tipo = tipo
+        # El tipo se repite en todas las materias: una sola copia de cada valor
+        self.tipo = sys.intern(tipo) if isinstance(tipo, str) else tipo
     
     def to_dict(self):
         """Convierte la materia a un diccionario."""
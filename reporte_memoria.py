@@ -0,0 +1,191 @@
+"""Reporte de memoria de los modelos del dominio sobre un campus generado.
+
+Genera un campus sintético (ver generar_datos.py), lo carga con el DataLoader y
+compara la memoria que ocupan las materias, grupos, estudiantes e inscripciones
+con la que ocuparían los mismos registros en la representación anterior:
+objetos con __dict__ por instancia, textos tal como los entrega el lector de
+archivos y horas como texto ('10:00').
+
+Uso:
+    python reporte_memoria.py --escala 50 --semilla 1
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+
+from generar_datos import generar_todos_los_datos
+from services.data_loader import DataLoader
+
+
+class _MateriaAnterior:
+    def __init__(self, id_materia, nombre, cuatrimestre, creditos, horas_totales, tipo):
+        self.id = id_materia
+        self.nombre = nombre
+        self.cuatrimestre = cuatrimestre
+        self.creditos = creditos
+        self.horas_totales = horas_totales
+        self.tipo = tipo
+
+
+class _GrupoAnterior:
+    def __init__(self, id_grupo, id_materia, profesor, cupo_maximo, cupo_actual):
+        self.id = id_grupo
+        self.id_materia = id_materia
+        self.profesor = profesor
+        self.cupo_maximo = cupo_maximo
+        self.cupo_actual = cupo_actual
+        self.horarios = []
+
+
+class _EstudianteAnterior:
+    def __init__(self, id_estudiante, nombre, cuatrimestre, status, creditos_acumulados, max_creditos):
+        self.id = id_estudiante
+        self.nombre = nombre
+        self.cuatrimestre = cuatrimestre
+        self.status = status
+        self.creditos_acumulados = creditos_acumulados
+        self.max_creditos = max_creditos
+        self.materias_aprobadas = set()
+        self.preferencias = {}
+
+
+class _InscripcionAnterior:
+    def __init__(self, id_inscripcion, id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion, activa):
+        self.id = id_inscripcion
+        self.id_estudiante = id_estudiante
+        self.id_grupo = id_grupo
+        self.cuatrimestre = cuatrimestre
+        self.fecha_inscripcion = fecha_inscripcion
+        self.activa = activa
+
+
+def tamano_profundo(objetos):
+    """Bytes ocupados por los objetos y todo lo que alcanzan, contando cada objeto una vez.
+
+    Los objetos compartidos (textos internados, enteros pequeños) se cuentan una
+    sola vez, igual que en la memoria real del proceso.
+    """
+    vistos = set()
+    total = 0
+    pendientes = list(objetos)
+    while pendientes:
+        objeto = pendientes.pop()
+        if id(objeto) in vistos or isinstance(objeto, type):
+            continue
+        vistos.add(id(objeto))
+        total += sys.getsizeof(objeto)
+
+        if isinstance(objeto, dict):
+            pendientes.extend(objeto.keys())
+            pendientes.extend(objeto.values())
+        elif isinstance(objeto, (list, tuple, set, frozenset)):
+            pendientes.extend(objeto)
+        else:
+            if hasattr(objeto, '__dict__'):
+                pendientes.append(objeto.__dict__)
+            for clase in type(objeto).__mro__:
+                for atributo in getattr(clase, '__slots__', ()):
+                    if hasattr(objeto, atributo):
+                        pendientes.append(getattr(objeto, atributo))
+    return total
+
+
+def construir_anteriores(data_loader):
+    """Construye los modelos en la representación anterior a partir de los mismos archivos.
+
+    Returns:
+        dict: Nombre del modelo -> lista de objetos
+    """
+    leer = data_loader._leer_filas
+
+    materias = [_MateriaAnterior(row['id_materia'], row['nombre'], row['cuatrimestre'], row['creditos'],
+                                 row['horas_totales'], row['tipo'])
+                for row in leer("materias.csv")]
+
+    grupos = {}
+    for row in leer("grupos.csv"):
+        grupos[row['id_grupo']] = _GrupoAnterior(row['id_grupo'], row['id_materia'], row['profesor'],
+                                                 row['cupo_maximo'], row['cupo_actual'])
+    for row in leer("horarios.csv"):
+        if row['id_grupo'] in grupos:
+            grupos[row['id_grupo']].horarios.append((row['dia'], row['hora_inicio'], row['hora_fin'], row['aula']))
+
+    estudiantes = {}
+    for row in leer("estudiantes.csv"):
+        estudiantes[row['id_estudiante']] = _EstudianteAnterior(
+            row['id_estudiante'], row['nombre'], row['cuatrimestre_actual'], row['status'],
+            row['creditos_acumulados'], row['max_creditos'])
+    for row in leer("historial_academico.csv"):
+        if row['aprobada'] and row['id_estudiante'] in estudiantes:
+            estudiantes[row['id_estudiante']].materias_aprobadas.add(row['id_materia'])
+    for id_estudiante, preferencias in data_loader.preferencias.items():
+        if id_estudiante in estudiantes:
+            estudiantes[id_estudiante].preferencias = preferencias
+
+    inscripciones = [_InscripcionAnterior(row['id_inscripcion'], row['id_estudiante'], row['id_grupo'],
+                                          row['cuatrimestre'], row.get('fecha_inscripcion'), row.get('activa', True))
+                     for row in leer("inscripciones.csv")]
+
+    return {
+        'Materia': materias,
+        'Grupo': list(grupos.values()),
+        'Estudiante': list(estudiantes.values()),
+        'Inscripcion': inscripciones
+    }
+
+
+def generar_reporte(carpeta, escala=50, semilla=1):
+    """Genera el campus, carga los modelos e imprime el reporte de memoria.
+
+    Returns:
+        dict: Nombre del modelo -> (objetos, bytes antes, bytes después)
+    """
+    print(f"Generando campus (escala {escala}, {round(200 * escala)} estudiantes) en {carpeta}...")
+    inicio = time.time()
+    generar_todos_los_datos(carpeta, escala=escala, semilla=semilla)
+    print(f"Campus generado en {time.time() - inicio:.1f} segundos")
+
+    data_loader = DataLoader(carpeta)
+    data_loader.cargar_todo()
+
+    actuales = {
+        'Materia': list(data_loader.materias.values()),
+        'Grupo': list(data_loader.grupos.values()),
+        'Estudiante': list(data_loader.estudiantes.values()),
+        'Inscripcion': [inscripcion for lista in data_loader.inscripciones.values() for inscripcion in lista]
+    }
+    anteriores = construir_anteriores(data_loader)
+
+    resultados = {}
+    print()
+    print(f"{'Modelo':<12} {'Objetos':>10} {'Antes (MB)':>12} {'Después (MB)':>13} {'Reducción':>10}")
+    for modelo, objetos in actuales.items():
+        antes = tamano_profundo(anteriores[modelo])
+        despues = tamano_profundo(objetos)
+        resultados[modelo] = (len(objetos), antes, despues)
+        reduccion = 1 - despues / antes if antes else 0.0
+        print(f"{modelo:<12} {len(objetos):>10} {antes / 2**20:>12.2f} {despues / 2**20:>13.2f} {reduccion:>10.1%}")
+
+    total_antes = sum(antes for _, antes, _ in resultados.values())
+    total_despues = sum(despues for _, _, despues in resultados.values())
+    reduccion = 1 - total_despues / total_antes if total_antes else 0.0
+    print(f"{'Total':<12} {'':>10} {total_antes / 2**20:>12.2f} {total_despues / 2**20:>13.2f} {reduccion:>10.1%}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reporte de memoria de los modelos en un campus generado")
+    parser.add_argument('--escala', type=float, default=50, help="Factor de escala (200 estudiantes por unidad)")
+    parser.add_argument('--semilla', type=int, default=1, help="Semilla para datos reproducibles")
+    parser.add_argument('--carpeta', default=None, help="Carpeta para el campus (temporal si se omite)")
+    args = parser.parse_args()
+
+    carpeta = args.carpeta or tempfile.mkdtemp(prefix="campus_")
+    try:
+        generar_reporte(carpeta, args.escala, args.semilla)
+    finally:
+        if args.carpeta is None:
+            shutil.rmtree(carpeta, ignore_errors=True)
@@ -0,0 +1,306 @@
+import os
+import sqlite3
+import threading
+from models.grupo import Grupo
+from models.inscripcion import Inscripcion
+
+
+class AlmacenInscripciones:
+    """Almacén persistente de inscripciones y cupos sobre SQLite.
+
+    La base se abre en modo WAL para que las lecturas no bloqueen a las escrituras.
+    La reserva de un lugar ocurre en una sola transacción que incrementa el cupo
+    solo si todavía hay lugar, por lo que es segura aunque varias peticiones (o
+    varios procesos trabajadores) intenten ocupar el último lugar a la vez.
+    """
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS inscripciones (
+            id_inscripcion INTEGER PRIMARY KEY,
+            id_estudiante INTEGER NOT NULL,
+            id_grupo INTEGER NOT NULL,
+            cuatrimestre INTEGER,
+            fecha_inscripcion TEXT,
+            activa INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS idx_inscripciones_estudiante
+            ON inscripciones (id_estudiante);
+        CREATE INDEX IF NOT EXISTS idx_inscripciones_grupo
+            ON inscripciones (id_grupo, activa);
+        CREATE TABLE IF NOT EXISTS cupos (
+            id_grupo INTEGER PRIMARY KEY,
+            cupo_maximo INTEGER NOT NULL,
+            cupo_actual INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, ruta):
+        """Abre (o crea) el almacén.
+
+        Args:
+            ruta (str): Ruta del archivo SQLite
+        """
+        self.ruta = ruta
+        self._local = threading.local()
+        self._conexion().executescript(self.ESQUEMA)
+
+    def _conexion(self):
+        """Devuelve la conexión del hilo actual (las conexiones no se comparten entre hilos ni procesos)."""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None or self._local.pid != os.getpid():
+            # isolation_level=None: las transacciones se controlan explícitamente con BEGIN
+            conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+            self._local.pid = os.getpid()
+        return conexion
+
+    def cerrar(self):
+        """Cierra la conexión del hilo actual."""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+    @staticmethod
+    def _a_inscripcion(fila):
+        """Convierte una fila de la tabla de inscripciones en un objeto Inscripcion."""
+        id_inscripcion, id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion, activa = fila
+        return Inscripcion(
+            id_inscripcion=id_inscripcion,
+            id_estudiante=id_estudiante,
+            id_grupo=id_grupo,
+            cuatrimestre=cuatrimestre,
+            fecha_inscripcion=fecha_inscripcion,
+            activa=bool(activa)
+        )
+
+    def esta_vacio(self):
+        """Indica si el almacén todavía no tiene inscripciones."""
+        return self._conexion().execute("SELECT 1 FROM inscripciones LIMIT 1").fetchone() is None
+
+    def agregar(self, inscripciones):
+        """Agrega inscripciones existentes en una sola transacción (solo inserciones).
+
+        Args:
+            inscripciones (iterable): Objetos Inscripcion a guardar
+        """
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            conexion.executemany(
+                "INSERT OR REPLACE INTO inscripciones VALUES (?, ?, ?, ?, ?, ?)",
+                ((int(i.id), int(i.id_estudiante), int(i.id_grupo), int(i.cuatrimestre),
+                  i.fecha_inscripcion, int(bool(i.activa))) for i in inscripciones)
+            )
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+    def sincronizar_cupos(self, grupos):
+        """Registra los grupos que aún no están en el almacén y actualiza su cupo máximo.
+
+        El cupo actual de los grupos ya registrados no se modifica: el almacén es la
+        fuente de verdad de los lugares ocupados.
+
+        Args:
+            grupos (dict): Diccionario de objetos Grupo por ID
+        """
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            conexion.executemany(
+                "INSERT INTO cupos VALUES (?, ?, ?) "
+                "ON CONFLICT(id_grupo) DO UPDATE SET cupo_maximo = excluded.cupo_maximo",
+                ((int(g.id), int(g.cupo_maximo), int(g.cupo_actual)) for g in grupos.values())
+            )
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+    def reservar_lugar(self, id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion=None):
+        """Inscribe a un estudiante ocupando un lugar del grupo, solo si hay cupo.
+
+        Args:
+            id_estudiante (int): ID del estudiante
+            id_grupo (int): ID del grupo
+            cuatrimestre (int): Cuatrimestre de la inscripción
+            fecha_inscripcion (str, optional): Fecha en formato 'YYYY-MM-DD'
+
+        Returns:
+            tuple: (Inscripcion o None si no hay cupo, cupo_actual del grupo)
+        """
+        conexion = self._conexion()
+        # BEGIN IMMEDIATE toma el candado de escritura antes de leer el cupo
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            duplicada = conexion.execute(
+                "SELECT 1 FROM inscripciones WHERE id_estudiante = ? AND id_grupo = ? AND activa = 1",
+                (id_estudiante, id_grupo)
+            ).fetchone()
+            if duplicada:
+                conexion.execute("ROLLBACK")
+                raise ValueError(f"El estudiante {id_estudiante} ya está inscrito en el grupo {id_grupo}")
+
+            cursor = conexion.execute(
+                "UPDATE cupos SET cupo_actual = cupo_actual + 1 "
+                "WHERE id_grupo = ? AND cupo_actual < cupo_maximo * ?",
+                (id_grupo, Grupo.FACTOR_CUPO)
+            )
+            if cursor.rowcount == 0:
+                fila = conexion.execute("SELECT cupo_actual FROM cupos WHERE id_grupo = ?", (id_grupo,)).fetchone()
+                conexion.execute("ROLLBACK")
+                return None, fila[0] if fila else None
+
+            cursor = conexion.execute(
+                "INSERT INTO inscripciones (id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion, activa) "
+                "VALUES (?, ?, ?, ?, 1)",
+                (id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion)
+            )
+            id_inscripcion = cursor.lastrowid
+            cupo_actual = conexion.execute(
+                "SELECT cupo_actual FROM cupos WHERE id_grupo = ?", (id_grupo,)
+            ).fetchone()[0]
+            conexion.execute("COMMIT")
+        except ValueError:
+            raise
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+        inscripcion = Inscripcion(
+            id_inscripcion=id_inscripcion,
+            id_estudiante=id_estudiante,
+            id_grupo=id_grupo,
+            cuatrimestre=cuatrimestre,
+            fecha_inscripcion=fecha_inscripcion,
+            activa=True
+        )
+        return inscripcion, cupo_actual
+
+    def liberar_lugar(self, id_inscripcion):
+        """Da de baja una inscripción activa y libera su lugar en el grupo.
+
+        Returns:
+            bool: True si la inscripción estaba activa y se dio de baja
+        """
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = conexion.execute(
+                "SELECT id_grupo FROM inscripciones WHERE id_inscripcion = ? AND activa = 1",
+                (id_inscripcion,)
+            ).fetchone()
+            if fila is None:
+                conexion.execute("ROLLBACK")
+                return False
+
+            conexion.execute("UPDATE inscripciones SET activa = 0 WHERE id_inscripcion = ?", (id_inscripcion,))
+            conexion.execute("UPDATE cupos SET cupo_actual = cupo_actual - 1 WHERE id_grupo = ?", (fila[0],))
+            conexion.execute("COMMIT")
+            return True
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+    def reactivar_lugar(self, id_inscripcion):
+        """Vuelve a activar una inscripción dada de baja ocupando un lugar, solo si hay cupo.
+
+        Returns:
+            tuple: (True si la inscripción quedó activa o ya lo estaba, False si el
+            grupo no tiene cupo; cupo_actual del grupo)
+        """
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = conexion.execute(
+                "SELECT id_estudiante, id_grupo, activa FROM inscripciones WHERE id_inscripcion = ?",
+                (id_inscripcion,)
+            ).fetchone()
+            if fila is None:
+                conexion.execute("ROLLBACK")
+                raise KeyError(f"La inscripción {id_inscripcion} no existe")
+            id_estudiante, id_grupo, activa = fila
+
+            cupo = conexion.execute("SELECT cupo_actual FROM cupos WHERE id_grupo = ?", (id_grupo,)).fetchone()
+            if activa:
+                conexion.execute("ROLLBACK")
+                return True, cupo[0] if cupo else None
+
+            duplicada = conexion.execute(
+                "SELECT 1 FROM inscripciones WHERE id_estudiante = ? AND id_grupo = ? AND activa = 1",
+                (id_estudiante, id_grupo)
+            ).fetchone()
+            if duplicada:
+                conexion.execute("ROLLBACK")
+                raise ValueError(f"El estudiante {id_estudiante} ya está inscrito en el grupo {id_grupo}")
+
+            cursor = conexion.execute(
+                "UPDATE cupos SET cupo_actual = cupo_actual + 1 "
+                "WHERE id_grupo = ? AND cupo_actual < cupo_maximo * ?",
+                (id_grupo, Grupo.FACTOR_CUPO)
+            )
+            if cursor.rowcount == 0:
+                conexion.execute("ROLLBACK")
+                return False, cupo[0] if cupo else None
+
+            conexion.execute("UPDATE inscripciones SET activa = 1 WHERE id_inscripcion = ?", (id_inscripcion,))
+            conexion.execute("COMMIT")
+            return True, cupo[0] + 1
+        except (KeyError, ValueError):
+            raise
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+    def eliminar(self, id_inscripcion):
+        """Elimina una inscripción, liberando su lugar si estaba activa.
+
+        Returns:
+            bool: True si la inscripción existía
+        """
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = conexion.execute(
+                "SELECT id_grupo, activa FROM inscripciones WHERE id_inscripcion = ?", (id_inscripcion,)
+            ).fetchone()
+            if fila is None:
+                conexion.execute("ROLLBACK")
+                return False
+
+            conexion.execute("DELETE FROM inscripciones WHERE id_inscripcion = ?", (id_inscripcion,))
+            if fila[1]:
+                conexion.execute("UPDATE cupos SET cupo_actual = cupo_actual - 1 WHERE id_grupo = ?", (fila[0],))
+            conexion.execute("COMMIT")
+            return True
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+    def obtener_inscripciones(self):
+        """Devuelve un iterador con todas las inscripciones del almacén."""
+        cursor = self._conexion().execute("SELECT * FROM inscripciones ORDER BY id_inscripcion")
+        return (self._a_inscripcion(fila) for fila in cursor)
+
+    def obtener_inscripciones_estudiante(self, id_estudiante):
+        """Devuelve las inscripciones de un estudiante (consulta indexada)."""
+        cursor = self._conexion().execute(
+            "SELECT * FROM inscripciones WHERE id_estudiante = ? ORDER BY id_inscripcion", (id_estudiante,)
+        )
+        return [self._a_inscripcion(fila) for fila in cursor]
+
+    def obtener_inscripciones_grupo(self, id_grupo, solo_activas=True):
+        """Devuelve las inscripciones de un grupo (consulta indexada)."""
+        consulta = "SELECT * FROM inscripciones WHERE id_grupo = ?"
+        if solo_activas:
+            consulta += " AND activa = 1"
+        cursor = self._conexion().execute(consulta + " ORDER BY id_inscripcion", (id_grupo,))
+        return [self._a_inscripcion(fila) for fila in cursor]
+
+    def obtener_cupos(self):
+        """Devuelve un diccionario id_grupo -> cupo_actual."""
+        return dict(self._conexion().execute("SELECT id_grupo, cupo_actual FROM cupos"))
@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+
+
+class BitacoraInscripciones:
+    """Bitácora de solo anexado con los cambios de inscripciones.
+
+    Cada alta, cambio de estado o eliminación se escribe como una línea JSON al
+    final del archivo, de modo que el costo de registrar un cambio no depende del
+    número de inscripciones. Al iniciar, los cambios de la bitácora se aplican
+    sobre inscripciones.csv y el cupo_actual de grupos.csv, que no se reescriben;
+    al compactar, la bitácora se reemplaza por el cambio neto respecto de ellos
+    (una entrada por inscripción modificada).
+    """
+
+    def __init__(self, ruta, umbral_compactacion=1000, sincronizar=False):
+        """Inicializa la bitácora.
+
+        Args:
+            ruta (str): Ruta del archivo de la bitácora
+            umbral_compactacion (int): Número de entradas a partir del cual conviene compactar
+            sincronizar (bool): Forzar la escritura a disco (fsync) después de cada entrada
+        """
+        self.ruta = ruta
+        self.umbral_compactacion = umbral_compactacion
+        self.sincronizar = sincronizar
+        self.entradas = 0
+        self._entradas_compactadas = 0
+        self._lock = threading.Lock()
+
+    def anotar(self, operacion, **datos):
+        """Agrega una entrada al final de la bitácora.
+
+        Args:
+            operacion (str): 'alta', 'estado' o 'eliminacion'
+            **datos: Campos de la entrada
+        """
+        datos['op'] = operacion
+        linea = json.dumps(datos, default=str, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.ruta, "a", encoding="utf-8") as archivo:
+                archivo.write(linea)
+                if self.sincronizar:
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+            self.entradas += 1
+
+    def leer(self):
+        """Devuelve las entradas de la bitácora en orden.
+
+        Una última línea incompleta (escritura interrumpida por una caída) se
+        descarta y se recorta del archivo para que las entradas nuevas no se
+        mezclen con ella.
+        """
+        entradas = []
+        if not os.path.exists(self.ruta):
+            self.entradas = 0
+            return entradas
+
+        self._recortar_linea_incompleta()
+        with open(self.ruta, encoding="utf-8") as archivo:
+            for numero, linea in enumerate(archivo, 1):
+                if not linea.strip():
+                    continue
+                try:
+                    entradas.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    print(f"Entrada inválida en {self.ruta}:{numero}; se descarta")
+
+        self.entradas = len(entradas)
+        return entradas
+
+    def _recortar_linea_incompleta(self):
+        """Elimina del final del archivo una línea sin salto de línea."""
+        with self._lock:
+            with open(self.ruta, "rb+") as archivo:
+                contenido = archivo.read()
+                if contenido and not contenido.endswith(b"\n"):
+                    archivo.truncate(contenido.rfind(b"\n") + 1)
+                    print(f"Se descartó una entrada incompleta al final de {self.ruta}")
+
+    def debe_compactar(self):
+        """Indica si la bitácora alcanzó el umbral de compactación.
+
+        El umbral crece con el tamaño de la última compactación: si el cambio neto
+        ya ocupa muchas entradas, no se vuelve a compactar en cada anotación.
+        """
+        return (self.umbral_compactacion > 0
+                and self.entradas >= max(self.umbral_compactacion, 2 * self._entradas_compactadas))
+
+    def compactar(self, obtener_entradas):
+        """Reemplaza la bitácora por una equivalente con el cambio neto.
+
+        Mientras se compacta no se aceptan entradas nuevas: los cambios hechos en
+        memoria antes de anotarse quedan incluidos en las entradas netas y se
+        vuelven a anotar después, lo que no tiene efecto al aplicarlos. Las
+        entradas se escriben en un temporal que reemplaza a la bitácora con
+        os.replace, de modo que una caída deja la bitácora anterior o la nueva.
+
+        Args:
+            obtener_entradas (callable): Devuelve las entradas (diccionarios con 'op')
+                equivalentes a todas las de la bitácora
+        """
+        with self._lock:
+            entradas = obtener_entradas()
+            ruta_temporal = self.ruta + ".tmp"
+            with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+                for datos in entradas:
+                    archivo.write(json.dumps(datos, default=str, ensure_ascii=False) + "\n")
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(ruta_temporal, self.ruta)
+            self.entradas = len(entradas)
+            self._entradas_compactadas = len(entradas)
@@ -0,0 +1,160 @@
+import threading
+import time
+from datetime import datetime
+from services.data_loader import DataLoader
+
+
+class GestorCatalogo:
+    """Mantiene el catálogo activo y permite reemplazarlo en caliente.
+
+    Cada versión del catálogo es una instancia independiente de DataLoader. Las
+    peticiones toman la referencia activa al comenzar y trabajan sobre ella hasta
+    terminar, por lo que una recarga nunca altera una optimización en curso: el
+    catálogo nuevo se carga y valida aparte y después se publica con una sola
+    asignación.
+    """
+
+    def __init__(self, data_dir="data", max_historial=10, ruta_bd=None):
+        """Inicializa el gestor.
+
+        Args:
+            data_dir: Directorio donde se encuentran los archivos CSV
+            max_historial: Número de recargas que se conservan en el historial
+            ruta_bd: Ruta del almacén SQLite de inscripciones (None = solo CSV)
+        """
+        self.data_dir = data_dir
+        self.ruta_bd = ruta_bd
+        self.max_historial = max_historial
+        self.historial = []
+        self._actual = None
+        self._lock_recarga = threading.Lock()
+        self._vigilante = None
+        self._detener_vigilancia = threading.Event()
+
+    @property
+    def actual(self):
+        """DataLoader activo. Debe leerse una sola vez por petición."""
+        if self._actual is None:
+            self.recargar()
+        return self._actual
+
+    def validar(self, data_loader):
+        """Valida la consistencia de un catálogo recién cargado.
+
+        Args:
+            data_loader (DataLoader): Catálogo a validar
+
+        Returns:
+            list: Lista de problemas encontrados (vacía si el catálogo es válido)
+        """
+        errores = []
+
+        if not data_loader.materias:
+            errores.append("No se cargó ninguna materia")
+        if not data_loader.grupos:
+            errores.append("No se cargó ningún grupo")
+        if not data_loader.estudiantes:
+            errores.append("No se cargó ningún estudiante")
+
+        for id_grupo, grupo in data_loader.grupos.items():
+            if grupo.id_materia not in data_loader.materias:
+                errores.append(f"El grupo {id_grupo} hace referencia a la materia inexistente {grupo.id_materia}")
+            if grupo.cupo_maximo <= 0:
+                errores.append(f"El grupo {id_grupo} tiene un cupo máximo inválido ({grupo.cupo_maximo})")
+            for dia, hora_inicio, hora_fin, _ in grupo.horarios:
+                try:
+                    inicio = int(hora_inicio.split(':')[0]) if isinstance(hora_inicio, str) else int(hora_inicio)
+                    fin = int(hora_fin.split(':')[0]) if isinstance(hora_fin, str) else int(hora_fin)
+                except (ValueError, TypeError, AttributeError):
+                    errores.append(f"El grupo {id_grupo} tiene un horario con horas inválidas")
+                    continue
+                if not 1 <= dia <= 7 or inicio >= fin:
+                    errores.append(f"El grupo {id_grupo} tiene un horario inválido ({dia}, {hora_inicio}-{hora_fin})")
+
+        for id_grupo in data_loader.horarios:
+            if id_grupo not in data_loader.grupos:
+                errores.append(f"Hay horarios para el grupo inexistente {id_grupo}")
+
+        for id_materia, prerequisitos in data_loader.seriacion.items():
+            for id_prerequisito in [id_materia] + list(prerequisitos):
+                if id_prerequisito not in data_loader.materias:
+                    errores.append(f"La seriación hace referencia a la materia inexistente {id_prerequisito}")
+
+        return errores
+
+    def recargar(self, forzar=False):
+        """Carga una nueva versión del catálogo y la publica si es válida.
+
+        Args:
+            forzar (bool): Recargar aunque la versión de los archivos no haya cambiado
+
+        Returns:
+            dict: Resultado de la recarga ('recargado', 'version', 'errores')
+        """
+        # Solo una recarga a la vez; las peticiones siguen usando el catálogo activo
+        with self._lock_recarga:
+            anterior = self._actual
+
+            if anterior is not None and not forzar:
+                version_archivos = DataLoader(self.data_dir).calcular_version_catalogo()
+                if version_archivos == anterior.huella_archivos:
+                    return {'recargado': False, 'version': anterior.version_catalogo, 'errores': []}
+
+            inicio = time.time()
+            nuevo = DataLoader(self.data_dir, self.ruta_bd)
+            try:
+                nuevo.cargar_todo()
+                errores = self.validar(nuevo)
+            except Exception as e:
+                errores = [f"Error al cargar el catálogo: {e}"]
+
+            if errores and anterior is not None:
+                # Se conserva la versión anterior: registrar el intento fallido
+                self._registrar(nuevo.version_catalogo, False, errores, time.time() - inicio)
+                print(f"Recarga de catálogo rechazada: {len(errores)} problemas encontrados")
+                return {'recargado': False, 'version': anterior.version_catalogo, 'errores': errores}
+
+            # Preconstruir los índices del optimizador antes de publicar
+            nuevo.obtener_optimizador()
+
+            # Publicación atómica: una sola asignación de referencia
+            self._actual = nuevo
+            self._registrar(nuevo.version_catalogo, True, errores, time.time() - inicio)
+            return {'recargado': True, 'version': nuevo.version_catalogo, 'errores': errores}
+
+    def _registrar(self, version, publicado, errores, duracion):
+        """Agrega una entrada al historial de recargas."""
+        self.historial.append({
+            'version': version,
+            'publicado': publicado,
+            'errores': errores,
+            'duracion': round(duracion, 3),
+            'fecha': datetime.now().isoformat(timespec='seconds')
+        })
+        del self.historial[:-self.max_historial]
+
+    def iniciar_vigilancia(self, intervalo):
+        """Inicia un hilo que recarga el catálogo cuando cambian los archivos.
+
+        Args:
+            intervalo (float): Segundos entre revisiones de los archivos
+        """
+        if self._vigilante is not None and self._vigilante.is_alive():
+            return
+
+        self._detener_vigilancia.clear()
+
+        def vigilar():
+            while not self._detener_vigilancia.wait(intervalo):
+                try:
+                    self.recargar()
+                except Exception as e:
+                    print(f"Error en la vigilancia del catálogo: {e}")
+
+        self._vigilante = threading.Thread(target=vigilar, name="vigilante-catalogo", daemon=True)
+        self._vigilante.start()
+
+    def detener_vigilancia(self):
+        """Detiene el hilo de vigilancia, si está activo."""
+        self._detener_vigilancia.set()
+        self._vigilante = None
@@ -1,19 +1,28 @@
 import pandas as pd
 import os
+import hashlib
+import copy
+import threading
 from models.materia import Materia
-from models.grupo import Grupo
+from models.grupo import Grupo, codificar_sesion, hora_entera
 from models.estudiante import Estudiante
-import random
+from models.conjunto_materias import INDICE_MATERIAS
 from models.inscripcion import Inscripcion
+from services.mascaras import mascara_horarios
+from services import formato_binario
+from services.almacen_inscripciones import AlmacenInscripciones
+from services.bitacora_inscripciones import BitacoraInscripciones
+from services.simulacion_inscripciones import SimuladorInscripciones, priorizar_materias
 
 class DataLoader:
     """Servicio para cargar datos desde archivos CSV."""
     
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", ruta_bd=None):
         """Inicializa el cargador de datos.
         
         Args:
             data_dir: Directorio donde se encuentran los archivos CSV
+            ruta_bd: Ruta del almacén SQLite de inscripciones (None = solo CSV)
         """
         self.data_dir = data_dir
         self.materias = {}
@@ -24,6 +33,100 @@ class DataLoader:
         self.historial_academico = {}
         self.preferencias = {}
         self.horarios = {}
+        self.inscripciones = {}
+        
+        # Índices derivados (se mantienen al aplicar cambios incrementales)
+        self.materia_a_grupos = {}
+        self.mascaras_grupos = {}
+        self._inscripciones_por_id = {}
+        self.inscripciones_activas_por_grupo = {}
+        self._siguiente_id_inscripcion = 1
+        
+        # Estado (activa o no) de cada inscripción de inscripciones.csv, base de la bitácora
+        self._estado_base_inscripciones = {}
+        
+        # Almacén persistente de inscripciones y cupos (opcional)
+        self.almacen = AlmacenInscripciones(ruta_bd) if ruta_bd else None
+        self._lock_inscripciones = threading.Lock()
+        
+        # Sin almacén, los cambios de inscripciones se anotan en una bitácora de solo anexado
+        self.bitacora = None
+        if self.almacen is None:
+            self.bitacora = BitacoraInscripciones(os.path.join(data_dir, "inscripciones.log"))
+        
+        # Versión del catálogo: huella de los archivos más revisiones en memoria.
+        # Los cambios de inscripciones y cupos no la modifican: tienen su propio contador
+        self.huella_archivos = None
+        self.revision = 0
+        self.version_catalogo = None
+        self.version_inscripciones = 0
+        self._lock_catalogo = threading.Lock()
+        self._optimizador = None
+    
+    # Archivos que conforman el catálogo (su fecha y tamaño definen la versión)
+    ARCHIVOS_CATALOGO = (
+        "materias.csv", "seriacion.csv", "dependencias_proyectos.csv",
+        "grupos.csv", "horarios.csv", "estudiantes.csv",
+        "historial_academico.csv", "preferencias_estudiante.csv",
+        "inscripciones.csv"
+    )
+    
+    def calcular_version_catalogo(self):
+        """Calcula una huella de la versión del catálogo.
+        
+        La huella se deriva del nombre, la fecha de modificación y el tamaño de
+        cada archivo CSV, por lo que cambia en cuanto se modifica cualquiera de ellos.
+        
+        Returns:
+            str: Huella hexadecimal corta de la versión del catálogo
+        """
+        huella = hashlib.sha1()
+        for nombre_csv in self.ARCHIVOS_CATALOGO:
+            for nombre in (nombre_csv, os.path.splitext(nombre_csv)[0] + formato_binario.EXTENSION):
+                ruta = os.path.join(self.data_dir, nombre)
+                try:
+                    estado = os.stat(ruta)
+                    huella.update(f"{nombre}:{estado.st_mtime_ns}:{estado.st_size};".encode())
+                except OSError:
+                    huella.update(f"{nombre}:-;".encode())
+        return huella.hexdigest()[:16]
+    
+    def _ruta_datos(self, nombre):
+        """Devuelve la ruta desde la que se lee una tabla, o None si no existe.
+        
+        Si existe la versión binaria (.bin) y es al menos tan reciente como el CSV,
+        se prefiere; así un CSV reescrito después (por ejemplo al guardar las
+        inscripciones simuladas) vuelve a tener prioridad.
+        """
+        ruta_csv = os.path.join(self.data_dir, nombre)
+        ruta_bin = os.path.splitext(ruta_csv)[0] + formato_binario.EXTENSION
+        if os.path.exists(ruta_bin):
+            if not os.path.exists(ruta_csv) or os.path.getmtime(ruta_bin) >= os.path.getmtime(ruta_csv):
+                return ruta_bin
+        if os.path.exists(ruta_csv):
+            return ruta_csv
+        return None
+    
+    def _leer_filas(self, nombre, tamano_bloque=100000):
+        """Itera las filas de una tabla (CSV o binaria) como diccionarios.
+        
+        El CSV se lee por bloques, de modo que la memoria usada no crece con el
+        tamaño del archivo.
+        
+        Args:
+            nombre (str): Nombre del archivo CSV de la tabla
+            tamano_bloque (int): Filas por bloque al leer el CSV
+        """
+        ruta = self._ruta_datos(nombre)
+        if ruta is None:
+            raise FileNotFoundError(os.path.join(self.data_dir, nombre))
+        
+        if ruta.endswith(formato_binario.EXTENSION):
+            yield from formato_binario.leer_filas(ruta)
+            return
+        
+        for bloque in pd.read_csv(ruta, chunksize=tamano_bloque):
+            yield from bloque.to_dict('records')
     
     def cargar_todo(self):
         """Carga todos los datos necesarios desde los CSV."""
@@ -32,27 +135,102 @@ class DataLoader:
         self.cargar_dependencias_proyectos()
         self.cargar_grupos()
         self.cargar_horarios()
+        self.construir_indices()
         self.cargar_estudiantes()
         self.cargar_historial_academico()
         self.cargar_preferencias()
         self.cargar_inscripciones()
+        self.huella_archivos = self.calcular_version_catalogo()
+        self.revision = 0
+        self.version_catalogo = self.huella_archivos
+    
+    def construir_indices(self):
+        """Construye los índices derivados de grupos y horarios."""
+        self.materia_a_grupos = {}
+        self.mascaras_grupos = {}
+        for id_grupo, grupo in self.grupos.items():
+            if grupo.id_materia is not None:
+                self.materia_a_grupos.setdefault(grupo.id_materia, []).append(grupo.id)
+            self.mascaras_grupos[grupo.id] = mascara_horarios(grupo.horarios)
+    
+    @staticmethod
+    def _indexar_grupo(grupo, materia_a_grupos, mascaras_grupos):
+        """Agrega un grupo a copias de los índices derivados (sin modificar sus listas)."""
+        if grupo.id_materia is not None:
+            materia_a_grupos[grupo.id_materia] = materia_a_grupos.get(grupo.id_materia, []) + [grupo.id]
+        mascaras_grupos[grupo.id] = mascara_horarios(grupo.horarios)
+    
+    @staticmethod
+    def _desindexar_grupo(grupo, materia_a_grupos, mascaras_grupos):
+        """Quita un grupo de copias de los índices derivados (sin modificar sus listas)."""
+        grupos_materia = materia_a_grupos.get(grupo.id_materia)
+        if grupos_materia and grupo.id in grupos_materia:
+            restantes = [id_grupo for id_grupo in grupos_materia if id_grupo != grupo.id]
+            if restantes:
+                materia_a_grupos[grupo.id_materia] = restantes
+            else:
+                del materia_a_grupos[grupo.id_materia]
+        mascaras_grupos.pop(grupo.id, None)
+    
+    @staticmethod
+    def _copiar_grupo(grupo):
+        """Copia un grupo (con su lista de horarios) para modificarlo sin alterar el publicado."""
+        copia = Grupo(grupo.id, grupo.id_materia, grupo.profesor, grupo.cupo_maximo, grupo.cupo_actual)
+        copia._horarios = list(grupo.horarios)
+        return copia
+    
+    def _publicar(self, **estructuras):
+        """Reemplaza estructuras del catálogo por sus copias modificadas y avanza la versión.
+        
+        Las estructuras publicadas nunca se modifican (copia en escritura): las
+        optimizaciones en curso siguen recorriendo las anteriores sin ver cambios a
+        medias. El optimizador comparte las mismas referencias.
+        
+        Args:
+            **estructuras: Atributos a reemplazar (materias, grupos, seriacion,
+                horarios, materia_a_grupos, mascaras_grupos)
+        """
+        for nombre, valor in estructuras.items():
+            setattr(self, nombre, valor)
+            if self._optimizador is not None and hasattr(self._optimizador, nombre):
+                setattr(self._optimizador, nombre, valor)
+        self._incrementar_version()
+    
+    def _incrementar_version(self):
+        """Registra un cambio del catálogo en memoria para invalidar caches dependientes de la versión."""
+        self.revision += 1
+        self.version_catalogo = f"{self.huella_archivos}.{self.revision}"
+        if self._optimizador is not None:
+            self._optimizador.invalidar_indices()
+    
+    def _incrementar_version_inscripciones(self):
+        """Registra un cambio de inscripciones o cupos (no afecta la versión del catálogo)."""
+        self.version_inscripciones += 1
 
     
     def cargar_inscripciones(self):
-        """Carga las inscripciones desde inscripciones.csv o las simula si no existe el archivo."""
-        ruta = os.path.join(self.data_dir, "inscripciones.csv")
+        """Carga las inscripciones desde inscripciones.csv o las simula si no existe el archivo.
         
+        Si hay un almacén configurado y ya contiene inscripciones, éste es la fuente
+        de verdad de las inscripciones y de los cupos; si está vacío, se inicializa
+        con las inscripciones del CSV (o las simuladas).
+        """
         # Inicializar el diccionario de inscripciones
         self.inscripciones = {}
+        self._inscripciones_por_id = {}
+        self.inscripciones_activas_por_grupo = {}
+        self._siguiente_id_inscripcion = 1
+        self._estado_base_inscripciones = {}
         
-        if not os.path.exists(ruta):
+        if self.almacen is not None and not self.almacen.esta_vacio():
+            return self.cargar_inscripciones_almacen()
+        
+        if self._ruta_datos("inscripciones.csv") is None:
             # Si no existe el archivo, crear datos simulados
             return self.simular_inscripciones()
             
         try:
-            df = pd.read_csv(ruta)
-            
-            for _, row in df.iterrows():
+            for row in self._leer_filas("inscripciones.csv"):
                 inscripcion = Inscripcion(
                     id_inscripcion=row['id_inscripcion'],
                     id_estudiante=row['id_estudiante'],
@@ -62,16 +240,49 @@ class DataLoader:
                     activa=row.get('activa', True)
                 )
                 
-                if inscripcion.id_estudiante not in self.inscripciones:
-                    self.inscripciones[inscripcion.id_estudiante] = []
-                
-                self.inscripciones[inscripcion.id_estudiante].append(inscripcion)
+                self._registrar_inscripcion(inscripcion)
+                self._estado_base_inscripciones[inscripcion.id] = bool(inscripcion.activa)
+            
+            if self.bitacora is not None:
+                self.aplicar_bitacora()
+            if self.almacen is not None:
+                self.guardar_en_almacen()
         
         except Exception as e:
             print(f"Error al cargar inscripciones: {e}")
             # Si hay error al cargar, simular inscripciones
             self.simular_inscripciones()
 
+    def cargar_inscripciones_almacen(self):
+        """Carga las inscripciones y los cupos ocupados desde el almacén."""
+        for inscripcion in self.almacen.obtener_inscripciones():
+            self._registrar_inscripcion(inscripcion)
+        
+        for id_grupo, cupo_actual in self.almacen.obtener_cupos().items():
+            if id_grupo in self.grupos:
+                self.grupos[id_grupo].cupo_actual = cupo_actual
+        
+        # Registrar los grupos nuevos del catálogo y actualizar los cupos máximos
+        self.almacen.sincronizar_cupos(self.grupos)
+        return self.inscripciones
+    
+    def guardar_en_almacen(self):
+        """Copia al almacén las inscripciones en memoria y el cupo de cada grupo."""
+        self.almacen.sincronizar_cupos(self.grupos)
+        self.almacen.agregar(self._inscripciones_por_id.values())
+        print(f"Almacén de inscripciones inicializado en {self.almacen.ruta}")
+    
+    def _registrar_inscripcion(self, inscripcion):
+        """Agrega una inscripción a las estructuras en memoria."""
+        if inscripcion.id_estudiante not in self.inscripciones:
+            self.inscripciones[inscripcion.id_estudiante] = []
+        
+        self.inscripciones[inscripcion.id_estudiante].append(inscripcion)
+        self._inscripciones_por_id[inscripcion.id] = inscripcion
+        if inscripcion.activa:
+            self.inscripciones_activas_por_grupo.setdefault(inscripcion.id_grupo, set()).add(inscripcion.id)
+        self._siguiente_id_inscripcion = max(self._siguiente_id_inscripcion, int(inscripcion.id) + 1)
+
     def verificar_compatibilidad_horaria(self, nuevo_grupo, inscripciones_actuales):
         """
         Verifica si un nuevo grupo es compatible con las inscripciones actuales.
@@ -116,28 +327,151 @@ class DataLoader:
         return True  # No hay conflicto
 
     def guardar_inscripciones_simuladas(self):
-        """Guarda las inscripciones simuladas en un archivo CSV."""
-        ruta = os.path.join(self.data_dir, "inscripciones.csv")
+        """Guarda las inscripciones simuladas en el almacén o, si no hay, en un archivo CSV."""
+        if self.almacen is not None:
+            return self.guardar_en_almacen()
         
-        inscripciones_lista = []
-        for id_estudiante, inscripciones in self.inscripciones.items():
-            for inscripcion in inscripciones:
-                inscripciones_lista.append({
-                    'id_inscripcion': inscripcion.id,
-                    'id_estudiante': inscripcion.id_estudiante,
-                    'id_grupo': inscripcion.id_grupo,
-                    'cuatrimestre': inscripcion.cuatrimestre,
-                    'fecha_inscripcion': inscripcion.fecha_inscripcion,
-                    'activa': inscripcion.activa
-                })
+        try:
+            self.escribir_instantanea_inscripciones()
+            self._estado_base_inscripciones = {
+                id_inscripcion: bool(inscripcion.activa)
+                for id_inscripcion, inscripcion in self._inscripciones_por_id.items()
+            }
+            # La bitácora anterior se refería a otra base de inscripciones
+            if self.bitacora is not None:
+                self.bitacora.compactar(list)
+            print(f"Inscripciones simuladas guardadas en {os.path.join(self.data_dir, 'inscripciones.csv')}")
+        except Exception as e:
+            print(f"Error al guardar inscripciones simuladas: {e}")
+    
+    def _anotar(self, operacion, **datos):
+        """Registra un cambio de inscripciones en la bitácora y compacta si hace falta."""
+        if self.bitacora is None:
+            return
         
-        if inscripciones_lista:
+        self.bitacora.anotar(operacion, **datos)
+        if self.bitacora.debe_compactar():
             try:
-                df = pd.DataFrame(inscripciones_lista)
-                df.to_csv(ruta, index=False)
-                print(f"Inscripciones simuladas guardadas en {ruta}")
+                self.compactar_inscripciones()
             except Exception as e:
-                print(f"Error al guardar inscripciones simuladas: {e}")
+                # La bitácora conserva los cambios; se reintentará en la siguiente anotación
+                print(f"Error al compactar la bitácora de inscripciones: {e}")
+    
+    def aplicar_bitacora(self):
+        """Aplica sobre las inscripciones cargadas los cambios registrados en la bitácora.
+        
+        La base (inscripciones.csv y el cupo_actual de grupos.csv) nunca incluye
+        cambios de la bitácora, así que cada entrada ajusta el cupo una sola vez.
+        Las entradas fijan un estado, por lo que aplicar dos veces la misma (ver
+        BitacoraInscripciones.compactar) no tiene efecto.
+        
+        Returns:
+            int: Número de entradas leídas
+        """
+        entradas = self.bitacora.leer()
+        for entrada in entradas:
+            operacion = entrada.get('op')
+            id_inscripcion = entrada.get('id')
+            
+            if operacion == 'alta':
+                if id_inscripcion in self._inscripciones_por_id:
+                    continue
+                self._aplicar_alta(Inscripcion(
+                    id_inscripcion=id_inscripcion,
+                    id_estudiante=entrada['id_estudiante'],
+                    id_grupo=entrada['id_grupo'],
+                    cuatrimestre=entrada['cuatrimestre'],
+                    fecha_inscripcion=entrada.get('fecha_inscripcion'),
+                    activa=entrada.get('activa', True)
+                ))
+            elif operacion == 'estado':
+                inscripcion = self._inscripciones_por_id.get(id_inscripcion)
+                if inscripcion is not None:
+                    self._aplicar_estado(inscripcion, entrada['activa'])
+            elif operacion == 'eliminacion':
+                self._aplicar_eliminacion(id_inscripcion)
+        
+        if entradas:
+            print(f"Se aplicaron {len(entradas)} cambios de la bitácora de inscripciones")
+        return len(entradas)
+    
+    def compactar_inscripciones(self):
+        """Reemplaza la bitácora por los cambios netos respecto de inscripciones.csv.
+        
+        Ni inscripciones.csv ni grupos.csv se reescriben: la compactación es un solo
+        reemplazo atómico de la bitácora y no cambia la huella del catálogo.
+        """
+        if self.bitacora is None:
+            return
+        self.bitacora.compactar(self.entradas_netas_inscripciones)
+    
+    def entradas_netas_inscripciones(self):
+        """Devuelve el cambio neto de las inscripciones respecto de la base como entradas de bitácora.
+        
+        Returns:
+            list: Una entrada 'alta' por inscripción nueva, 'estado' por inscripción de
+            la base activada o desactivada y 'eliminacion' por inscripción de la base eliminada
+        """
+        base = self._estado_base_inscripciones
+        entradas = []
+        for inscripcion in list(self._inscripciones_por_id.values()):
+            activa_base = base.get(inscripcion.id)
+            if activa_base is None:
+                entradas.append({
+                    'op': 'alta',
+                    'id': int(inscripcion.id),
+                    'id_estudiante': int(inscripcion.id_estudiante),
+                    'id_grupo': int(inscripcion.id_grupo),
+                    'cuatrimestre': int(inscripcion.cuatrimestre),
+                    'fecha_inscripcion': inscripcion.fecha_inscripcion,
+                    'activa': bool(inscripcion.activa)
+                })
+            elif activa_base != bool(inscripcion.activa):
+                entradas.append({'op': 'estado', 'id': int(inscripcion.id), 'activa': bool(inscripcion.activa)})
+        
+        for id_inscripcion in list(base):
+            if id_inscripcion not in self._inscripciones_por_id:
+                entradas.append({'op': 'eliminacion', 'id': int(id_inscripcion)})
+        return entradas
+    
+    def escribir_instantanea_inscripciones(self):
+        """Escribe inscripciones.csv y el cupo actual de grupos.csv de forma atómica.
+        
+        Solo se usa para guardar las inscripciones simuladas como base; los cambios
+        posteriores quedan en la bitácora. Cada archivo se escribe primero en un
+        temporal y después se reemplaza con os.replace, de modo que una caída nunca
+        deja un CSV a medio escribir.
+        """
+        inscripciones_lista = []
+        for inscripcion in list(self._inscripciones_por_id.values()):
+            inscripciones_lista.append({
+                'id_inscripcion': inscripcion.id,
+                'id_estudiante': inscripcion.id_estudiante,
+                'id_grupo': inscripcion.id_grupo,
+                'cuatrimestre': inscripcion.cuatrimestre,
+                'fecha_inscripcion': inscripcion.fecha_inscripcion,
+                'activa': inscripcion.activa
+            })
+        
+        columnas = ['id_inscripcion', 'id_estudiante', 'id_grupo', 'cuatrimestre', 'fecha_inscripcion', 'activa']
+        self._reemplazar_csv(pd.DataFrame(inscripciones_lista, columns=columnas), "inscripciones.csv")
+        
+        # Los lugares ocupados por las inscripciones simuladas se conservan en grupos.csv
+        if self._ruta_datos("grupos.csv") is not None:
+            df = pd.DataFrame(list(self._leer_filas("grupos.csv")))
+            cupos = {id_grupo: grupo.cupo_actual for id_grupo, grupo in self.grupos.items()}
+            df['cupo_actual'] = [cupos.get(id_grupo, cupo) for id_grupo, cupo in zip(df['id_grupo'], df['cupo_actual'])]
+            self._reemplazar_csv(df, "grupos.csv")
+    
+    def _reemplazar_csv(self, df, nombre):
+        """Escribe un DataFrame en un temporal y reemplaza el archivo de forma atómica."""
+        ruta = os.path.join(self.data_dir, nombre)
+        ruta_temporal = ruta + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8", newline="") as archivo:
+            df.to_csv(archivo, index=False)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(ruta_temporal, ruta)
 
     def obtener_grupos_inscritos(self, id_estudiante):
         """
@@ -164,73 +498,28 @@ class DataLoader:
         """
         return self.inscripciones.get(id_estudiante, [])
 
-    def simular_inscripciones(self):
+    def simular_inscripciones(self, procesos=1, semilla=None):
         """
         Genera inscripciones simuladas basadas en estudiantes y materias disponibles.
         Esta función se utiliza cuando no existe un archivo de inscripciones real.
+        
+        Args:
+            procesos (int): Procesos para generar las propuestas por lotes de estudiantes
+            semilla (int, optional): Semilla para obtener una simulación reproducible
         """
         print("Simulando inscripciones para estudiantes...")
         
-        # ID único para inscripciones
-        id_inscripcion = 1
+        simulador = SimuladorInscripciones(
+            self.materias, self.grupos, self.seriacion, self.dependencias_proyectos,
+            self.materia_a_grupos, self.mascaras_grupos
+        )
+        inscripciones = simulador.simular(list(self.estudiantes.values()), procesos=procesos, semilla=semilla,
+                                          id_inicial=self._siguiente_id_inscripcion)
         
-        # Para cada estudiante, simular inscripciones basadas en materias disponibles
-        for id_estudiante, estudiante in self.estudiantes.items():
-            # Solo consideramos estudiantes en cuatrimestres activos (1-9)
-            if not 1 <= estudiante.cuatrimestre <= 9:
-                continue
-                
-            # Obtener materias que el estudiante puede cursar
-            materias_disponibles = self.obtener_materias_disponibles(estudiante)
-            
-            # Determinar cuántas materias inscribir
-            # Regulares: 6-7 materias, Irregulares: 3-5 materias
-            if estudiante.status == "Regular":
-                num_materias = min(len(materias_disponibles), random.randint(6, 7))
-            else:
-                num_materias = min(len(materias_disponibles), random.randint(3, 5))
-            
-            # Seleccionar materias priorizando las de cuatrimestres anteriores
-            materias_seleccionadas = self.priorizar_materias_para_inscripcion(
-                materias_disponibles, estudiante.cuatrimestre, num_materias)
-            
-            inscripciones_estudiante = []
-            
-            # Para cada materia seleccionada, buscar un grupo disponible
-            for id_materia in materias_seleccionadas:
-                # Buscar grupos disponibles para esta materia
-                grupos_disponibles = []
-                for id_grupo, grupo in self.grupos.items():
-                    if (grupo.id_materia == id_materia and 
-                        grupo.tiene_cupo() and 
-                        self.verificar_compatibilidad_horaria(grupo, inscripciones_estudiante)):
-                        grupos_disponibles.append(id_grupo)
-                
-                # Si hay grupos disponibles, elegir uno al azar
-                if grupos_disponibles:
-                    id_grupo = random.choice(grupos_disponibles)
-                    
-                    # Crear inscripción
-                    inscripcion = Inscripcion(
-                        id_inscripcion=id_inscripcion,
-                        id_estudiante=id_estudiante,
-                        id_grupo=id_grupo,
-                        cuatrimestre=estudiante.cuatrimestre,
-                        fecha_inscripcion="2025-02-01",  # Fecha simulada
-                        activa=True
-                    )
-                    
-                    inscripciones_estudiante.append(inscripcion)
-                    id_inscripcion += 1
-                    
-                    # Actualizar el cupo del grupo
-                    self.grupos[id_grupo].cupo_actual += 1
-            
-            # Guardar inscripciones del estudiante
-            if inscripciones_estudiante:
-                self.inscripciones[id_estudiante] = inscripciones_estudiante
+        for inscripcion in inscripciones:
+            self._registrar_inscripcion(inscripcion)
         
-        print(f"Se generaron {id_inscripcion - 1} inscripciones simuladas")
+        print(f"Se generaron {len(inscripciones)} inscripciones simuladas")
         
         # Opcionalmente, guardar las inscripciones simuladas en CSV
         self.guardar_inscripciones_simuladas()
@@ -239,40 +528,11 @@ class DataLoader:
 
     def priorizar_materias_para_inscripcion(self, materias_disponibles, cuatrimestre_actual, max_materias):
         """Prioriza materias para inscripción, dando prioridad a las de cuatrimestres anteriores."""
-        # Agrupar por cuatrimestre
-        materias_por_cuatrimestre = {}
-        for id_materia in materias_disponibles:
-            materia = self.materias.get(id_materia)
-            if not materia:
-                continue
-                
-            if materia.cuatrimestre not in materias_por_cuatrimestre:
-                materias_por_cuatrimestre[materia.cuatrimestre] = []
-                
-            materias_por_cuatrimestre[materia.cuatrimestre].append(id_materia)
-        
-        # Ordenar cuatrimestres (primero los anteriores)
-        cuatrimestres_ordenados = sorted(materias_por_cuatrimestre.keys())
-        
-        # Seleccionar materias priorizando las de cuatrimestres anteriores
-        materias_seleccionadas = []
-        for cuatrimestre in cuatrimestres_ordenados:
-            materias_cuatrimestre = materias_por_cuatrimestre[cuatrimestre]
-            random.shuffle(materias_cuatrimestre)  # Para variedad
-            
-            for id_materia in materias_cuatrimestre:
-                materias_seleccionadas.append(id_materia)
-                if len(materias_seleccionadas) >= max_materias:
-                    return materias_seleccionadas
-        
-        return materias_seleccionadas
+        return priorizar_materias(self.materias, materias_disponibles, max_materias)
     
     def cargar_materias(self):
         """Carga las materias desde materias.csv."""
-        ruta = os.path.join(self.data_dir, "materias.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("materias.csv"):
             materia = Materia(
                 id_materia=row['id_materia'],
                 nombre=row['nombre'],
@@ -282,13 +542,12 @@ class DataLoader:
                 tipo=row['tipo']
             )
             self.materias[materia.id] = materia
+            # Bits de materia en el orden del catálogo (ver ConjuntoMaterias)
+            INDICE_MATERIAS.bit(materia.id)
     
     def cargar_seriacion(self):
         """Carga las relaciones de seriación desde seriacion.csv."""
-        ruta = os.path.join(self.data_dir, "seriacion.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("seriacion.csv"):
             id_materia = row['id_materia']
             id_prerequisito = row['id_prerequisito']
             
@@ -299,10 +558,7 @@ class DataLoader:
     
     def cargar_dependencias_proyectos(self):
         """Carga las dependencias de proyectos desde dependencias_proyectos.csv."""
-        ruta = os.path.join(self.data_dir, "dependencias_proyectos.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("dependencias_proyectos.csv"):
             id_proyecto = row['id_proyecto']
             id_materia_dependiente = row['id_materia_dependiente']
             
@@ -313,10 +569,7 @@ class DataLoader:
     
     def cargar_grupos(self):
         """Carga los grupos desde grupos.csv."""
-        ruta = os.path.join(self.data_dir, "grupos.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("grupos.csv"):
             grupo = Grupo(
                 id_grupo=row['id_grupo'],
                 id_materia=row['id_materia'],
@@ -328,12 +581,9 @@ class DataLoader:
     
     def cargar_horarios(self):
         """Carga los horarios desde horarios.csv."""
-        ruta = os.path.join(self.data_dir, "horarios.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("horarios.csv"):
             id_grupo = row['id_grupo']
-            horario = (row['dia'], row['hora_inicio'], row['hora_fin'], row['aula'])
+            horario = codificar_sesion(row['dia'], row['hora_inicio'], row['hora_fin'], row['aula'])
             
             if id_grupo not in self.horarios:
                 self.horarios[id_grupo] = []
@@ -344,13 +594,11 @@ class DataLoader:
         for id_grupo, horarios in self.horarios.items():
             if id_grupo in self.grupos:
                 self.grupos[id_grupo].horarios = horarios
+                self.horarios[id_grupo] = self.grupos[id_grupo].horarios
     
     def cargar_estudiantes(self):
         """Carga los estudiantes desde estudiantes.csv."""
-        ruta = os.path.join(self.data_dir, "estudiantes.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("estudiantes.csv"):
             estudiante = Estudiante(
                 id_estudiante=row['id_estudiante'],
                 nombre=row['nombre'],
@@ -363,10 +611,7 @@ class DataLoader:
     
     def cargar_historial_academico(self):
         """Carga el historial académico desde historial_academico.csv."""
-        ruta = os.path.join(self.data_dir, "historial_academico.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("historial_academico.csv"):
             id_estudiante = row['id_estudiante']
             id_materia = row['id_materia']
             aprobada = row['aprobada']
@@ -387,14 +632,12 @@ class DataLoader:
     
     def cargar_preferencias(self):
         """Carga las preferencias desde preferencias_estudiante.csv."""
-        ruta = os.path.join(self.data_dir, "preferencias_estudiante.csv")
-        df = pd.read_csv(ruta)
-        
-        for _, row in df.iterrows():
+        for row in self._leer_filas("preferencias_estudiante.csv"):
             id_estudiante = row['id_estudiante']
             
             # Parsear días preferidos (convertir de string a lista de enteros)
-            dias_preferidos_str = str(row['dias_preferidos'])
+            # Las celdas vacías del CSV llegan como NaN
+            dias_preferidos_str = str(row['dias_preferidos']) if pd.notna(row['dias_preferidos']) else ''
             dias_preferidos = []
             if dias_preferidos_str:
                 try:
@@ -403,7 +646,7 @@ class DataLoader:
                     dias_preferidos = []
             
             # Parsear profesores preferidos
-            profesores_preferidos_str = str(row['profesores_preferidos'])
+            profesores_preferidos_str = str(row['profesores_preferidos']) if pd.notna(row['profesores_preferidos']) else ''
             profesores_preferidos = []
             if profesores_preferidos_str:
                 profesores_preferidos = [p.strip() for p in profesores_preferidos_str.split(',') if p.strip()]
@@ -422,15 +665,415 @@ class DataLoader:
         """Obtiene un estudiante por su ID."""
         return self.estudiantes.get(id_estudiante)
     
+    def obtener_optimizador(self):
+        """Devuelve el optimizador asociado a esta versión del catálogo.
+        
+        Se construye una sola vez (con sus índices) y se reutiliza en todas las
+        peticiones; al recargar el catálogo se crea uno nuevo junto con él.
+        """
+        if self._optimizador is None:
+            from services.optimizador import Optimizador
+            
+            self._optimizador = Optimizador(
+                materias=self.materias,
+                grupos=self.grupos,
+                seriacion=self.seriacion,
+                dependencias_proyectos=self.dependencias_proyectos,
+                materia_a_grupos=self.materia_a_grupos,
+                mascaras_grupos=self.mascaras_grupos
+            )
+        return self._optimizador
+    
     def obtener_materias_disponibles(self, estudiante):
         """Obtiene las materias que un estudiante puede cursar."""
-        from services.optimizador import Optimizador
+        return self.obtener_optimizador().get_materias_disponibles(estudiante)
+    
+    # ------------------------------------------------------------------
+    # Actualizaciones incrementales
+    #
+    # Los cambios del catálogo (materias, grupos y horarios) se hacen sobre
+    # copias de los diccionarios afectados y de sus índices derivados
+    # (materia_a_grupos, máscaras de horario), que después se publican juntas y
+    # avanzan la versión del catálogo para invalidar las caches que dependen de
+    # ella. Los cambios de inscripciones y cupos modifican los grupos en su
+    # lugar y solo avanzan version_inscripciones.
+    # ------------------------------------------------------------------
+    
+    def agregar_materia(self, materia):
+        """Agrega una materia al catálogo.
+        
+        Args:
+            materia (Materia): Materia a agregar
+        """
+        with self._lock_catalogo:
+            if materia.id in self.materias:
+                raise ValueError(f"La materia {materia.id} ya existe")
+            materias = dict(self.materias)
+            materias[materia.id] = materia
+            self._publicar(materias=materias)
+    
+    def actualizar_materia(self, id_materia, **campos):
+        """Actualiza atributos de una materia (nombre, cuatrimestre, creditos, horas_totales, tipo)."""
+        with self._lock_catalogo:
+            materia = self.materias.get(id_materia)
+            if materia is None:
+                raise KeyError(f"La materia {id_materia} no existe")
+            
+            for campo in campos:
+                if campo == 'id' or not hasattr(materia, campo):
+                    raise ValueError(f"Campo de materia no válido: {campo}")
+            
+            copia = copy.copy(materia)
+            for campo, valor in campos.items():
+                setattr(copia, campo, valor)
+            materias = dict(self.materias)
+            materias[id_materia] = copia
+            self._publicar(materias=materias)
+    
+    def eliminar_materia(self, id_materia):
+        """Elimina una materia que ya no tiene grupos, junto con su seriación."""
+        with self._lock_catalogo:
+            if id_materia not in self.materias:
+                raise KeyError(f"La materia {id_materia} no existe")
+            if self.materia_a_grupos.get(id_materia):
+                raise ValueError(f"La materia {id_materia} todavía tiene grupos")
+            
+            materias = dict(self.materias)
+            del materias[id_materia]
+            seriacion = {
+                id_seriada: [id_prerequisito for id_prerequisito in prerequisitos if id_prerequisito != id_materia]
+                for id_seriada, prerequisitos in self.seriacion.items() if id_seriada != id_materia
+            }
+            self._publicar(materias=materias, seriacion=seriacion)
+    
+    def agregar_grupo(self, grupo):
+        """Agrega un grupo (con sus horarios, si los tiene) al catálogo.
+        
+        Args:
+            grupo (Grupo): Grupo a agregar
+        """
+        with self._lock_catalogo:
+            if grupo.id in self.grupos:
+                raise ValueError(f"El grupo {grupo.id} ya existe")
+            if grupo.id_materia not in self.materias:
+                raise KeyError(f"La materia {grupo.id_materia} no existe")
+            
+            grupos = dict(self.grupos)
+            grupos[grupo.id] = grupo
+            horarios = dict(self.horarios)
+            if grupo.horarios:
+                horarios[grupo.id] = grupo.horarios
+            materia_a_grupos, mascaras_grupos = dict(self.materia_a_grupos), dict(self.mascaras_grupos)
+            self._indexar_grupo(grupo, materia_a_grupos, mascaras_grupos)
+            self._publicar(grupos=grupos, horarios=horarios, materia_a_grupos=materia_a_grupos,
+                           mascaras_grupos=mascaras_grupos)
+            # Sin su fila de cupos en el almacén, toda reserva en el grupo se rechazaría
+            if self.almacen is not None:
+                self.almacen.sincronizar_cupos({grupo.id: grupo})
+    
+    def actualizar_grupo(self, id_grupo, **campos):
+        """Actualiza atributos de un grupo (id_materia, profesor, cupo_maximo, cupo_actual).
+        
+        Cambiar solo cupo_actual es un cambio de inscripciones: se hace en el grupo
+        publicado y no avanza la versión del catálogo.
+        """
+        with self._lock_catalogo:
+            grupo = self.grupos.get(id_grupo)
+            if grupo is None:
+                raise KeyError(f"El grupo {id_grupo} no existe")
+            if 'id_materia' in campos and campos['id_materia'] not in self.materias:
+                raise KeyError(f"La materia {campos['id_materia']} no existe")
+            
+            for campo in campos:
+                if campo in ('id', 'horarios', '_horarios') or not hasattr(grupo, campo):
+                    raise ValueError(f"Campo de grupo no válido: {campo}")
+            
+            if set(campos) == {'cupo_actual'}:
+                grupo.cupo_actual = campos['cupo_actual']
+                self._incrementar_version_inscripciones()
+                return
+            
+            # Las inscripciones no cambian el cupo mientras se copia el grupo
+            with self._lock_inscripciones:
+                copia = self._copiar_grupo(grupo)
+                for campo, valor in campos.items():
+                    setattr(copia, campo, valor)
+                self._reemplazar_grupo(grupo, copia)
+            # El almacén verifica las reservas con su propio cupo máximo
+            if self.almacen is not None and 'cupo_maximo' in campos:
+                self.almacen.sincronizar_cupos({copia.id: copia})
+    
+    def eliminar_grupo(self, id_grupo):
+        """Elimina un grupo sin inscripciones activas, junto con sus horarios."""
+        with self._lock_catalogo:
+            grupo = self.grupos.get(id_grupo)
+            if grupo is None:
+                raise KeyError(f"El grupo {id_grupo} no existe")
+            if self.inscripciones_activas_por_grupo.get(id_grupo):
+                raise ValueError(f"El grupo {id_grupo} tiene inscripciones activas")
+            
+            grupos = dict(self.grupos)
+            del grupos[id_grupo]
+            horarios = dict(self.horarios)
+            horarios.pop(id_grupo, None)
+            materia_a_grupos, mascaras_grupos = dict(self.materia_a_grupos), dict(self.mascaras_grupos)
+            self._desindexar_grupo(grupo, materia_a_grupos, mascaras_grupos)
+            self._publicar(grupos=grupos, horarios=horarios, materia_a_grupos=materia_a_grupos,
+                           mascaras_grupos=mascaras_grupos)
+    
+    def agregar_horario(self, id_grupo, dia, hora_inicio, hora_fin, aula):
+        """Agrega una sesión al horario de un grupo."""
+        with self._lock_catalogo:
+            grupo = self.grupos.get(id_grupo)
+            if grupo is None:
+                raise KeyError(f"El grupo {id_grupo} no existe")
+            
+            with self._lock_inscripciones:
+                copia = self._copiar_grupo(grupo)
+                copia.agregar_horario(dia, hora_inicio, hora_fin, aula)
+                self._reemplazar_grupo(grupo, copia)
+    
+    def actualizar_horarios(self, id_grupo, horarios):
+        """Reemplaza el horario completo de un grupo.
+        
+        Args:
+            id_grupo (int): ID del grupo
+            horarios (list): Lista de tuplas (día, hora_inicio, hora_fin, aula)
+        """
+        with self._lock_catalogo:
+            grupo = self.grupos.get(id_grupo)
+            if grupo is None:
+                raise KeyError(f"El grupo {id_grupo} no existe")
+            
+            with self._lock_inscripciones:
+                copia = self._copiar_grupo(grupo)
+                copia.horarios = [tuple(horario) for horario in horarios]
+                self._reemplazar_grupo(grupo, copia)
+    
+    def eliminar_horario(self, id_grupo, dia, hora_inicio):
+        """Elimina la sesión de un grupo que comienza en el día y la hora indicados."""
+        with self._lock_catalogo:
+            grupo = self.grupos.get(id_grupo)
+            if grupo is None:
+                raise KeyError(f"El grupo {id_grupo} no existe")
+            
+            restantes = [horario for horario in grupo.horarios
+                         if not (horario[0] == dia and horario[1] == hora_entera(hora_inicio))]
+            if len(restantes) == len(grupo.horarios):
+                raise KeyError(f"El grupo {id_grupo} no tiene sesión el día {dia} a las {hora_inicio}")
+            
+            with self._lock_inscripciones:
+                copia = self._copiar_grupo(grupo)
+                copia.horarios = restantes
+                self._reemplazar_grupo(grupo, copia)
+    
+    def _reemplazar_grupo(self, grupo, copia):
+        """Publica la copia modificada de un grupo junto con sus horarios e índices."""
+        grupos = dict(self.grupos)
+        grupos[copia.id] = copia
+        horarios = dict(self.horarios)
+        if copia.horarios:
+            horarios[copia.id] = copia.horarios
+        else:
+            horarios.pop(copia.id, None)
+        materia_a_grupos, mascaras_grupos = dict(self.materia_a_grupos), dict(self.mascaras_grupos)
+        self._desindexar_grupo(grupo, materia_a_grupos, mascaras_grupos)
+        self._indexar_grupo(copia, materia_a_grupos, mascaras_grupos)
+        self._publicar(grupos=grupos, horarios=horarios, materia_a_grupos=materia_a_grupos,
+                       mascaras_grupos=mascaras_grupos)
+    
+    def agregar_inscripcion(self, id_estudiante, id_grupo, cuatrimestre=None, fecha_inscripcion=None):
+        """Inscribe a un estudiante en un grupo y ocupa un lugar del cupo.
+        
+        Es reservar_lugar con un grupo lleno como error: se verifican el cupo y la
+        inscripción duplicada y, con almacén, la inscripción se guarda en él.
+        
+        Returns:
+            Inscripcion: La inscripción creada
+            
+        Raises:
+            ValueError: Si el grupo no tiene cupo o el estudiante ya está inscrito en él
+        """
+        inscripcion = self.reservar_lugar(id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion)
+        if inscripcion is None:
+            raise ValueError(f"El grupo {id_grupo} no tiene cupo")
+        return inscripcion
+    
+    def actualizar_inscripcion(self, id_inscripcion, activa):
+        """Activa o desactiva una inscripción, ajustando el cupo del grupo.
+        
+        Desactivar es liberar_lugar. Reactivar ocupa un lugar, así que se verifica
+        el cupo y la inscripción duplicada igual que en reservar_lugar (con almacén,
+        en una transacción de SQLite).
+        
+        Raises:
+            KeyError: Si la inscripción no existe
+            ValueError: Si el grupo no tiene cupo o el estudiante ya está inscrito en él
+        """
+        if id_inscripcion not in self._inscripciones_por_id:
+            raise KeyError(f"La inscripción {id_inscripcion} no existe")
+        if not activa:
+            self.liberar_lugar(id_inscripcion)
+            return
+        
+        if self.almacen is not None:
+            reactivada, cupo_actual = self.almacen.reactivar_lugar(id_inscripcion)
         
-        optimizador = Optimizador(
-            materias=self.materias,
-            grupos=self.grupos,
-            seriacion=self.seriacion,
-            dependencias_proyectos=self.dependencias_proyectos
+        with self._lock_inscripciones:
+            inscripcion = self._inscripciones_por_id.get(id_inscripcion)
+            if inscripcion is None:
+                raise KeyError(f"La inscripción {id_inscripcion} no existe")
+            grupo = self.grupos.get(inscripcion.id_grupo)
+            
+            if self.almacen is None:
+                if inscripcion.activa:
+                    return
+                self._verificar_no_inscrito(inscripcion.id_estudiante, inscripcion.id_grupo)
+                reactivada = grupo is None or grupo.tiene_cupo()
+            
+            if reactivada and self._aplicar_estado(inscripcion, True):
+                self._anotar('estado', id=int(id_inscripcion), activa=True)
+                self._incrementar_version_inscripciones()
+            # El almacén refleja también las reservas hechas por otros procesos
+            if self.almacen is not None and grupo is not None and cupo_actual is not None:
+                grupo.cupo_actual = cupo_actual
+        
+        if not reactivada:
+            raise ValueError(f"El grupo {inscripcion.id_grupo} no tiene cupo")
+    
+    def eliminar_inscripcion(self, id_inscripcion):
+        """Elimina una inscripción, liberando su lugar si estaba activa."""
+        if self.almacen is not None:
+            self.almacen.eliminar(id_inscripcion)
+        
+        with self._lock_inscripciones:
+            if self._aplicar_eliminacion(id_inscripcion) is None:
+                raise KeyError(f"La inscripción {id_inscripcion} no existe")
+            self._anotar('eliminacion', id=int(id_inscripcion))
+            self._incrementar_version_inscripciones()
+    
+    def _verificar_no_inscrito(self, id_estudiante, id_grupo):
+        """Lanza ValueError si el estudiante ya tiene una inscripción activa en el grupo (con el candado)."""
+        for inscripcion in self.inscripciones.get(id_estudiante, []):
+            if inscripcion.id_grupo == id_grupo and inscripcion.activa:
+                raise ValueError(f"El estudiante {id_estudiante} ya está inscrito en el grupo {id_grupo}")
+    
+    def _inscribir(self, id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion):
+        """Crea una inscripción en memoria y la anota en la bitácora (sin almacén, con el candado)."""
+        inscripcion = Inscripcion(
+            id_inscripcion=self._siguiente_id_inscripcion,
+            id_estudiante=id_estudiante,
+            id_grupo=id_grupo,
+            cuatrimestre=cuatrimestre,
+            fecha_inscripcion=fecha_inscripcion,
+            activa=True
         )
+        self._aplicar_alta(inscripcion)
+        self._anotar('alta', id=int(inscripcion.id), id_estudiante=int(id_estudiante), id_grupo=int(id_grupo),
+                     cuatrimestre=int(inscripcion.cuatrimestre), fecha_inscripcion=fecha_inscripcion, activa=True)
+        self._incrementar_version_inscripciones()
+        return inscripcion
+    
+    def _aplicar_alta(self, inscripcion):
+        """Registra una inscripción nueva y ocupa su lugar si está activa."""
+        self._registrar_inscripcion(inscripcion)
+        grupo = self.grupos.get(inscripcion.id_grupo)
+        if grupo and inscripcion.activa:
+            grupo.cupo_actual += 1
+    
+    def _aplicar_estado(self, inscripcion, activa):
+        """Cambia el estado de una inscripción; devuelve True si hubo cambio."""
+        if bool(inscripcion.activa) == bool(activa):
+            return False
+        
+        grupo = self.grupos.get(inscripcion.id_grupo)
+        if grupo:
+            grupo.cupo_actual += 1 if activa else -1
+        
+        activas_grupo = self.inscripciones_activas_por_grupo.setdefault(inscripcion.id_grupo, set())
+        if activa:
+            activas_grupo.add(inscripcion.id)
+        else:
+            activas_grupo.discard(inscripcion.id)
+        inscripcion.activa = bool(activa)
+        return True
+    
+    def _aplicar_eliminacion(self, id_inscripcion):
+        """Quita una inscripción de memoria; devuelve la inscripción eliminada o None."""
+        inscripcion = self._inscripciones_por_id.pop(id_inscripcion, None)
+        if inscripcion is None:
+            return None
+        
+        if inscripcion.activa:
+            grupo = self.grupos.get(inscripcion.id_grupo)
+            if grupo:
+                grupo.cupo_actual -= 1
+            self.inscripciones_activas_por_grupo.get(inscripcion.id_grupo, set()).discard(id_inscripcion)
+        
+        inscripciones_estudiante = self.inscripciones.get(inscripcion.id_estudiante, [])
+        if inscripcion in inscripciones_estudiante:
+            inscripciones_estudiante.remove(inscripcion)
+        return inscripcion
+    
+    def reservar_lugar(self, id_estudiante, id_grupo, cuatrimestre=None, fecha_inscripcion=None):
+        """Inscribe a un estudiante en un grupo solo si todavía tiene cupo.
+        
+        La verificación del cupo y la inscripción ocurren de forma atómica: con
+        almacén, en una transacción de SQLite (segura entre procesos); sin él, bajo
+        un candado en memoria (seguro entre hilos del mismo proceso).
+        
+        Args:
+            id_estudiante (int): ID del estudiante
+            id_grupo (int): ID del grupo
+            cuatrimestre (int, optional): Cuatrimestre de la inscripción (por defecto, el del estudiante)
+            fecha_inscripcion (str, optional): Fecha en formato 'YYYY-MM-DD'
+            
+        Returns:
+            Inscripcion: La inscripción creada, o None si el grupo no tiene cupo
+        """
+        grupo = self.grupos.get(id_grupo)
+        if grupo is None:
+            raise KeyError(f"El grupo {id_grupo} no existe")
+        estudiante = self.estudiantes.get(id_estudiante)
+        if estudiante is None:
+            raise KeyError(f"El estudiante {id_estudiante} no existe")
+        if cuatrimestre is None:
+            cuatrimestre = estudiante.cuatrimestre
+        
+        if self.almacen is None:
+            with self._lock_inscripciones:
+                self._verificar_no_inscrito(id_estudiante, id_grupo)
+                if not grupo.tiene_cupo():
+                    return None
+                return self._inscribir(id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion)
+        
+        inscripcion, cupo_actual = self.almacen.reservar_lugar(
+            id_estudiante, id_grupo, cuatrimestre, fecha_inscripcion)
+        
+        with self._lock_inscripciones:
+            # El almacén refleja también las reservas hechas por otros procesos
+            if cupo_actual is not None:
+                grupo.cupo_actual = cupo_actual
+            if inscripcion is not None:
+                self._registrar_inscripcion(inscripcion)
+                self._incrementar_version_inscripciones()
+        return inscripcion
+    
+    def liberar_lugar(self, id_inscripcion):
+        """Da de baja una inscripción activa y libera su lugar en el grupo.
+        
+        Returns:
+            bool: True si la inscripción estaba activa y se dio de baja
+        """
+        if self.almacen is not None and not self.almacen.liberar_lugar(id_inscripcion):
+            return False
         
-        return optimizador.get_materias_disponibles(estudiante)
\ No newline at end of file
+        with self._lock_inscripciones:
+            inscripcion = self._inscripciones_por_id.get(id_inscripcion)
+            if inscripcion is None or not inscripcion.activa:
+                # Con almacén, la inscripción pudo crearse en otro proceso
+                return self.almacen is not None
+            self._aplicar_estado(inscripcion, False)
+            self._anotar('estado', id=int(id_inscripcion), activa=False)
+            self._incrementar_version_inscripciones()
+            return True
@@ -0,0 +1,259 @@
+import random
+from services.mascaras import mascara_horarios
+from services.poblacion import SIN_GRUPO
+
+
+class EspacioBusqueda:
+    """Espacio factible de grupos para optimizar el horario de un estudiante.
+
+    Antes de ejecutar el algoritmo genético se propagan las restricciones que no
+    dependen del resto del horario:
+
+    - Se descartan los grupos sin cupo y las materias que se quedan sin grupos.
+    - Se calcula qué grupos pueden coexistir (sus máscaras de horario no se
+      traslapan y son de materias distintas).
+    - Se identifican las parejas de materias excluyentes: ningún grupo de una es
+      compatible con algún grupo de la otra, o una de ellas debe cursarse sola
+      (estadías).
+
+    Los individuos se construyen materia por materia eligiendo solo grupos
+    compatibles con lo ya elegido, por lo que cada intento produce un horario
+    válido en lugar de descartarse.
+
+    Se construye uno por ejecución del optimizador; no se comparte entre peticiones.
+    """
+
+    def __init__(self, grupos, candidatos, mascaras_grupos=None, creditos_materias=None,
+                 materias_solas=(), max_creditos=None):
+        """Construye el espacio factible a partir de los grupos candidatos.
+
+        Args:
+            grupos (dict): Diccionario de objetos Grupo por ID
+            candidatos (iterable): IDs de los grupos que el estudiante podría cursar
+            mascaras_grupos (dict, optional): Índice id_grupo -> máscara de horario
+            creditos_materias (dict, optional): Créditos por ID de materia
+            materias_solas (iterable): Materias que deben ser la única del horario
+            max_creditos (float, optional): Límite de créditos del estudiante
+        """
+        mascaras_grupos = mascaras_grupos or {}
+        self.creditos_materias = creditos_materias or {}
+        self.max_creditos = max_creditos
+
+        self.grupos_por_materia = {}
+        self.materia_de_grupo = {}
+        self.mascaras = {}
+        self.grupos_sin_cupo = []
+
+        for id_grupo in dict.fromkeys(candidatos):
+            grupo = grupos.get(id_grupo)
+            if not grupo or grupo.id_materia is None:
+                continue
+            # La materia se registra también para los grupos sin cupo
+            self.materia_de_grupo[id_grupo] = grupo.id_materia
+            if not grupo.tiene_cupo():
+                self.grupos_sin_cupo.append(id_grupo)
+                continue
+
+            mascara = mascaras_grupos.get(id_grupo)
+            if mascara is None:
+                mascara = mascara_horarios(grupo.horarios)
+
+            self.mascaras[id_grupo] = mascara
+            self.grupos_por_materia.setdefault(grupo.id_materia, []).append(id_grupo)
+
+        self.materias = sorted(self.grupos_por_materia)
+        # Columna de cada materia en la matriz de genes de la población
+        self.columnas = {id_materia: columna for columna, id_materia in enumerate(self.materias)}
+        self.materias_solas = {m for m in materias_solas if m in self.grupos_por_materia}
+        self.compatibles = self._calcular_compatibles()
+        self.materias_excluyentes = self._calcular_materias_excluyentes()
+
+    def _calcular_compatibles(self):
+        """Calcula, para cada grupo, los grupos de otras materias que pueden coexistir con él."""
+        compatibles = {id_grupo: set() for id_grupo in self.mascaras}
+        ids = list(self.mascaras)
+        for i, id_a in enumerate(ids):
+            mascara_a = self.mascaras[id_a]
+            materia_a = self.materia_de_grupo[id_a]
+            for id_b in ids[i + 1:]:
+                if self.materia_de_grupo[id_b] != materia_a and not mascara_a & self.mascaras[id_b]:
+                    compatibles[id_a].add(id_b)
+                    compatibles[id_b].add(id_a)
+        return compatibles
+
+    def _calcular_materias_excluyentes(self):
+        """Calcula, para cada materia, las materias que no pueden cursarse junto con ella."""
+        excluyentes = {id_materia: set() for id_materia in self.materias}
+        for i, materia_a in enumerate(self.materias):
+            for materia_b in self.materias[i + 1:]:
+                if materia_a in self.materias_solas or materia_b in self.materias_solas:
+                    excluyente = True
+                else:
+                    grupos_b = self.grupos_por_materia[materia_b]
+                    excluyente = not any(
+                        self.compatibles[id_a].intersection(grupos_b)
+                        for id_a in self.grupos_por_materia[materia_a]
+                    )
+                if excluyente:
+                    excluyentes[materia_a].add(materia_b)
+                    excluyentes[materia_b].add(materia_a)
+        return excluyentes
+
+    def esta_vacio(self):
+        """Indica si no queda ningún grupo factible."""
+        return not self.materias
+
+    def tamano_estimado(self):
+        """Número de horarios posibles sin considerar conflictos: producto de (grupos + 1) por materia.
+
+        Cada materia aporta sus grupos más la opción de no cursarla.
+        """
+        tamano = 1
+        for id_materia in self.materias:
+            tamano *= len(self.grupos_por_materia[id_materia]) + 1
+        return tamano
+
+    def grupos_factibles(self):
+        """Devuelve la lista de grupos que sobrevivieron a la poda."""
+        return [id_grupo for id_materia in self.materias for id_grupo in self.grupos_por_materia[id_materia]]
+
+    def generar_individuo(self, num_materias, aleatorio=random, pesos=None):
+        """Construye un horario válido con hasta num_materias materias.
+
+        Las materias se recorren en orden aleatorio; para cada una se elige al azar
+        un grupo compatible con lo ya elegido. Las materias excluyentes con alguna
+        ya elegida, las que no caben en los créditos y las que no tienen grupo
+        compatible se saltan en lugar de invalidar el horario.
+
+        Args:
+            num_materias (int): Número de materias buscado
+            aleatorio: Generador de números aleatorios (módulo random o random.Random)
+            pesos (dict, optional): id_grupo -> peso entre 0 y 1; si se indica, cada
+                grupo se elige con probabilidad proporcional al cubo de su peso (más
+                un mínimo, para no descartar del todo a los de peso 0)
+
+        Returns:
+            list: IDs de los grupos elegidos
+        """
+        materias = self.materias.copy()
+        aleatorio.shuffle(materias)
+
+        horario = []
+        ocupado = 0
+        creditos = 0
+        excluidas = set()
+
+        for id_materia in materias:
+            if len(horario) >= num_materias:
+                break
+            if id_materia in excluidas:
+                continue
+
+            creditos_materia = self.creditos_materias.get(id_materia, 0)
+            if self.max_creditos is not None and creditos + creditos_materia > self.max_creditos:
+                continue
+
+            opciones = [id_grupo for id_grupo in self.grupos_por_materia[id_materia]
+                        if not self.mascaras[id_grupo] & ocupado]
+            if not opciones:
+                continue
+
+            if pesos:
+                id_grupo = aleatorio.choices(opciones, [0.02 + pesos.get(g, 0.0) ** 3 for g in opciones])[0]
+            else:
+                id_grupo = aleatorio.choice(opciones)
+            horario.append(id_grupo)
+            ocupado |= self.mascaras[id_grupo]
+            creditos += creditos_materia
+            excluidas |= self.materias_excluyentes[id_materia]
+
+        return horario
+
+    def reparar(self, fila, max_materias=7, aleatorio=random):
+        """Convierte en su lugar una fila de genes arbitraria en un horario válido dentro del espacio.
+
+        La fila es la de la matriz de genes de la población: una columna por
+        materia (en el orden de self.materias) con su grupo o SIN_GRUPO, así que
+        nunca hay dos grupos de la misma materia. Las materias se revisan en orden
+        aleatorio (para no favorecer a ninguno de los padres de un cruce). Se
+        conserva cada grupo que no choca con lo ya conservado; un grupo en
+        conflicto se sustituye por otro compatible de la misma materia y, si no lo
+        hay, la materia se descarta. También se descartan las materias excluyentes
+        con las ya conservadas y las que exceden el máximo de materias o de
+        créditos. Solo se escriben las posiciones que cambian.
+
+        Args:
+            fila (numpy.ndarray): Fila de genes, posiblemente inválida
+            max_materias (int): Máximo de materias del horario
+            aleatorio: Generador de números aleatorios (módulo random o random.Random)
+
+        Returns:
+            int: Número de materias que quedaron en la fila
+        """
+        genes = fila.tolist()
+        columnas = [columna for columna, id_grupo in enumerate(genes) if id_grupo != SIN_GRUPO]
+        aleatorio.shuffle(columnas)
+
+        # Referencias locales: este método se llama para cada hijo del cruce
+        materias = self.materias
+        grupos_por_materia = self.grupos_por_materia
+        mascaras = self.mascaras
+        max_creditos = self.max_creditos if self.max_creditos is not None else float('inf')
+
+        conservadas = 0
+        excluidas = set()
+        ocupado = 0
+        creditos = 0
+
+        for columna in columnas:
+            id_materia = materias[columna]
+            creditos_materia = self.creditos_materias.get(id_materia, 0)
+            if (conservadas >= max_materias or id_materia in excluidas
+                    or creditos + creditos_materia > max_creditos):
+                fila[columna] = SIN_GRUPO
+                continue
+
+            id_grupo = genes[columna]
+            mascara = mascaras.get(id_grupo)
+            if mascara is None or mascara & ocupado:
+                opciones = [g for g in grupos_por_materia[id_materia] if not mascaras[g] & ocupado]
+                if not opciones:
+                    fila[columna] = SIN_GRUPO
+                    continue
+                id_grupo = aleatorio.choice(opciones)
+                mascara = mascaras[id_grupo]
+                fila[columna] = id_grupo
+
+            conservadas += 1
+            excluidas |= self.materias_excluyentes[id_materia]
+            ocupado |= mascara
+            creditos += creditos_materia
+
+        return conservadas
+
+    def generar_poblacion(self, tamano_poblacion, min_materias=2, max_materias=7, aleatorio=random,
+                          pesos=None):
+        """Genera una población inicial de horarios válidos.
+
+        Args:
+            tamano_poblacion (int): Número de individuos
+            min_materias (int): Mínimo de materias buscado por individuo
+            max_materias (int): Máximo de materias por individuo
+            aleatorio: Generador de números aleatorios (módulo random o random.Random)
+            pesos (dict, optional): Peso de cada grupo al elegirlo (ver generar_individuo)
+
+        Returns:
+            list: Horarios (listas de IDs de grupo); vacía si el espacio está vacío
+        """
+        if self.esta_vacio():
+            return []
+
+        max_materias = min(max_materias, len(self.materias))
+        min_materias = min(min_materias, max_materias)
+
+        poblacion = []
+        for _ in range(tamano_poblacion):
+            horario = self.generar_individuo(aleatorio.randint(min_materias, max_materias), aleatorio, pesos)
+            if horario:
+                poblacion.append(horario)
+        return poblacion
@@ -0,0 +1,308 @@
+import math
+from services.preferencias import PESO_PREFERENCIAS
+
+# Días hábiles evaluados y franjas de una hora (de 8 a 20) del análisis de bloques
+DIAS_HABILES = (1, 2, 3, 4, 5)
+HORA_INICIO_JORNADA = 8
+FRANJAS_POR_DIA = 12
+
+
+def _hora(valor):
+    """Convierte una hora ('10:00' o 10) a entero, descartando los minutos."""
+    return int(valor.split(':')[0]) if isinstance(valor, str) else valor
+
+
+def _desviacion_estandar(valores):
+    """Desviación estándar poblacional, sumando en el mismo orden que np.std.
+
+    Para unos cuantos valores enteros da exactamente el mismo resultado que
+    np.std sin el costo de crear un arreglo.
+    """
+    media = sum(valores) / len(valores)
+    return math.sqrt(sum((valor - media) * (valor - media) for valor in valores) / len(valores))
+
+
+class DatosGrupo:
+    """Aportes precalculados de un grupo a los agregados de un horario."""
+
+    __slots__ = ('id_materia', 'creditos', 'tipo', 'es_estadia', 'cuatrimestre', 'horas_por_dia', 'franjas_por_dia')
+
+    def __init__(self, grupo, materia):
+        self.id_materia = grupo.id_materia
+        self.creditos = materia.creditos
+        self.tipo = materia.tipo
+        self.es_estadia = materia.tipo == "Estadía"
+        self.cuatrimestre = materia.cuatrimestre
+
+        # Horas por día hábil y franjas ocupadas por día, en el orden de las sesiones
+        self.horas_por_dia = []
+        self.franjas_por_dia = []
+        for dia, hora_inicio, hora_fin, _ in getattr(grupo, 'horarios', None) or []:
+            inicio = _hora(hora_inicio)
+            fin = _hora(hora_fin)
+            if 1 <= dia <= 5:
+                self.horas_por_dia.append((dia, fin - inicio))
+            if dia in DIAS_HABILES:
+                franjas = [h for h in range(inicio - HORA_INICIO_JORNADA, fin - HORA_INICIO_JORNADA)
+                           if 0 <= h < FRANJAS_POR_DIA]
+                if franjas:
+                    self.franjas_por_dia.append((dia, franjas))
+
+
+class EstadoHorario:
+    """Horario con los agregados que usa el fitness, actualizables por grupo.
+
+    Mantiene las horas por día, la ocupación de franjas por día, los créditos,
+    las materias, los tipos de materia, las estadías y la prioridad de materias
+    atrasadas. Agregar o quitar un grupo solo toca las franjas de ese grupo, y el
+    análisis de bloques consecutivos se recalcula solo para los días afectados,
+    por lo que un hijo que difiere de su padre en uno o dos grupos se evalúa sin
+    recorrer el horario completo.
+
+    Si se dan afinidades (ver services.preferencias), el fitness mezcla la
+    afinidad media de los grupos del horario con el resto de los criterios.
+
+    fitness() devuelve exactamente el mismo valor que calcular_fitness sobre la
+    misma lista de grupos (Optimizador.calcular_fitness se apoya en esta clase).
+    """
+
+    def __init__(self, grupos, materias, estudiante, horario=(), cache=None, afinidades=None):
+        """Construye el estado de un horario.
+
+        Args:
+            grupos (dict): Diccionario de objetos Grupo por ID
+            materias (dict): Diccionario de objetos Materia por ID
+            estudiante (Estudiante): Estudiante evaluado
+            horario (iterable): IDs de los grupos del horario
+            cache (dict, optional): Cache id_grupo -> DatosGrupo compartida entre
+                estados de una misma ejecución
+            afinidades (dict, optional): Afinidad id_grupo -> [0, 1] del estudiante,
+                calculada una vez por ejecución; vacía o None si no hay preferencias
+        """
+        self.grupos = grupos
+        self.materias = materias
+        self.estudiante = estudiante
+        self.es_regular = estudiante.es_regular()
+        self.cache = cache if cache is not None else {}
+        self.afinidades = afinidades or {}
+
+        self.horario = []
+        self.conteo_grupos = {}
+        self.conteo_materias = {}
+        self.conteo_tipos = {}
+        self.num_estadias = 0
+        self.prioridad = 0
+        self.carga_por_dia = {dia: 0 for dia in DIAS_HABILES}
+        self.ocupacion = {dia: [0] * FRANJAS_POR_DIA for dia in DIAS_HABILES}
+        self.bloques = {dia: (0, 0) for dia in DIAS_HABILES}
+        self._dias_pendientes = set()
+        self._fitness = None
+
+        for id_grupo in horario:
+            self.agregar(id_grupo)
+
+    def _datos(self, id_grupo):
+        """Devuelve (y guarda en la cache) los aportes precalculados de un grupo."""
+        datos = self.cache.get(id_grupo)
+        if datos is None:
+            grupo = self.grupos[id_grupo]
+            datos = DatosGrupo(grupo, self.materias[grupo.id_materia])
+            self.cache[id_grupo] = datos
+        return datos
+
+    def copiar(self):
+        """Devuelve una copia independiente del estado (comparte la cache)."""
+        copia = EstadoHorario.__new__(EstadoHorario)
+        copia.grupos = self.grupos
+        copia.materias = self.materias
+        copia.estudiante = self.estudiante
+        copia.es_regular = self.es_regular
+        copia.cache = self.cache
+        copia.afinidades = self.afinidades
+        copia.horario = self.horario.copy()
+        copia.conteo_grupos = self.conteo_grupos.copy()
+        copia.conteo_materias = self.conteo_materias.copy()
+        copia.conteo_tipos = self.conteo_tipos.copy()
+        copia.num_estadias = self.num_estadias
+        copia.prioridad = self.prioridad
+        copia.carga_por_dia = self.carga_por_dia.copy()
+        copia.ocupacion = {dia: franjas.copy() for dia, franjas in self.ocupacion.items()}
+        copia.bloques = self.bloques.copy()
+        copia._dias_pendientes = self._dias_pendientes.copy()
+        copia._fitness = self._fitness
+        return copia
+
+    def _aplicar(self, id_grupo, signo):
+        """Suma (signo=1) o resta (signo=-1) los aportes de un grupo a los agregados."""
+        datos = self._datos(id_grupo)
+
+        self.conteo_grupos[id_grupo] = self.conteo_grupos.get(id_grupo, 0) + signo
+        if not self.conteo_grupos[id_grupo]:
+            del self.conteo_grupos[id_grupo]
+        self.conteo_materias[datos.id_materia] = self.conteo_materias.get(datos.id_materia, 0) + signo
+        if not self.conteo_materias[datos.id_materia]:
+            del self.conteo_materias[datos.id_materia]
+        self.conteo_tipos[datos.tipo] = self.conteo_tipos.get(datos.tipo, 0) + signo
+        if not self.conteo_tipos[datos.tipo]:
+            del self.conteo_tipos[datos.tipo]
+
+        if datos.es_estadia:
+            self.num_estadias += signo
+        if datos.cuatrimestre < self.estudiante.cuatrimestre:
+            self.prioridad += signo * (self.estudiante.cuatrimestre - datos.cuatrimestre)
+
+        for dia, horas in datos.horas_por_dia:
+            self.carga_por_dia[dia] += signo * horas
+        for dia, franjas in datos.franjas_por_dia:
+            ocupacion = self.ocupacion[dia]
+            for franja in franjas:
+                ocupacion[franja] += signo
+            self._dias_pendientes.add(dia)
+
+        self._fitness = None
+
+    def agregar(self, id_grupo):
+        """Agrega un grupo al horario."""
+        self._aplicar(id_grupo, 1)
+        self.horario.append(id_grupo)
+
+    def quitar(self, id_grupo):
+        """Quita un grupo del horario."""
+        self._aplicar(id_grupo, -1)
+        self.horario.remove(id_grupo)
+
+    def reemplazar(self, id_grupo_actual, id_grupo_nuevo):
+        """Sustituye un grupo por otro conservando su posición en el horario."""
+        posicion = self.horario.index(id_grupo_actual)
+        self._aplicar(id_grupo_actual, -1)
+        self._aplicar(id_grupo_nuevo, 1)
+        self.horario[posicion] = id_grupo_nuevo
+
+    def transformar_en(self, horario):
+        """Actualiza el estado para representar otro horario aplicando solo las diferencias.
+
+        Args:
+            horario (list): IDs de los grupos del horario destino
+        """
+        destino = {}
+        for id_grupo in horario:
+            destino[id_grupo] = destino.get(id_grupo, 0) + 1
+
+        for id_grupo, cantidad in list(self.conteo_grupos.items()):
+            for _ in range(cantidad - destino.get(id_grupo, 0)):
+                self._aplicar(id_grupo, -1)
+        for id_grupo, cantidad in destino.items():
+            for _ in range(cantidad - self.conteo_grupos.get(id_grupo, 0)):
+                self._aplicar(id_grupo, 1)
+
+        self.horario = list(horario)
+
+    def _actualizar_bloques(self):
+        """Recalcula horas consecutivas y huecos solo de los días modificados."""
+        for dia in self._dias_pendientes:
+            consecutivas = 0
+            huecos = 0
+            bloque_actual = 0
+            for ocupada in self.ocupacion[dia]:
+                if ocupada:
+                    bloque_actual += 1
+                elif bloque_actual > 0:  # Fin de un bloque
+                    if bloque_actual >= 2:
+                        consecutivas += bloque_actual
+                    else:
+                        huecos += 1
+                    bloque_actual = 0
+
+            # Procesar último bloque si existe
+            if bloque_actual > 0:
+                if bloque_actual >= 2:
+                    consecutivas += bloque_actual
+                else:
+                    huecos += 1
+            self.bloques[dia] = (consecutivas, huecos)
+        self._dias_pendientes.clear()
+
+    def fitness(self):
+        """Calcula el fitness del horario a partir de los agregados (con cache)."""
+        if self._fitness is None:
+            self._fitness = self._calcular_fitness()
+        return self._fitness
+
+    def _calcular_fitness(self):
+        """Combina los agregados con los mismos pesos que Optimizador.calcular_fitness."""
+        if not self.horario:
+            return 0.0
+
+        # 1. Reglas de estadía: debe ser la única materia
+        if self.num_estadias:
+            return 0.0 if len(self.horario) > 1 else 1.0
+
+        # 2. Número de materias según tipo de estudiante
+        num_materias = len(self.conteo_materias)
+        if self.es_regular:
+            if num_materias < 7:
+                penalizacion_materias = 1 - (7 - num_materias) * 0.1
+            elif num_materias > 7:
+                return 0.0
+            else:
+                penalizacion_materias = 1.0
+        else:
+            if num_materias > 7:
+                return 0.0
+            penalizacion_materias = num_materias / 7
+
+        # 3. Créditos (sumados en el orden del horario, igual que calcular_fitness)
+        total_creditos = 0
+        for id_grupo in self.horario:
+            total_creditos += self.cache[id_grupo].creditos
+        if total_creditos > self.estudiante.max_creditos:
+            return 0.0
+
+        # 4. Balance de carga por día
+        carga = list(self.carga_por_dia.values())
+        desviacion_estandar = _desviacion_estandar(carga)
+        dias_sobrecargados = sum(1 for horas in carga if horas > 8)
+        dias_poco_eficientes = sum(1 for horas in carga if 0 < horas <= 2)
+        penalizacion_distribucion = 0.05 * (dias_sobrecargados + dias_poco_eficientes)
+
+        # 5. Prioridad de materias atrasadas (solo irregulares)
+        prioridad_materias = 0 if self.es_regular else self.prioridad
+
+        # 6. Eficiencia de horas consecutivas
+        self._actualizar_bloques()
+        horas_consecutivas = sum(consecutivas for consecutivas, _ in self.bloques.values())
+        horas_con_huecos = sum(huecos for _, huecos in self.bloques.values())
+        bonificacion_eficiencia = 0.1 * (horas_consecutivas / (horas_consecutivas + horas_con_huecos + 1))
+
+        # 7. Diversidad de tipos de materia
+        diversidad_tipos = min(1.0, len(self.conteo_tipos) / 3)
+
+        if self.es_regular:
+            fitness = (
+                0.40 * penalizacion_materias +
+                0.20 * (1 / (1 + desviacion_estandar)) +
+                0.15 * (total_creditos / self.estudiante.max_creditos) +
+                0.15 * bonificacion_eficiencia +
+                0.10 * diversidad_tipos -
+                penalizacion_distribucion
+            )
+        else:
+            fitness = (
+                0.30 * penalizacion_materias +
+                0.15 * (1 / (1 + desviacion_estandar)) +
+                0.30 * prioridad_materias +
+                0.15 * bonificacion_eficiencia +
+                0.10 * diversidad_tipos -
+                penalizacion_distribucion
+            )
+
+        fitness = max(0.0, min(1.0, fitness))
+
+        # 8. Preferencias del estudiante: afinidad media de sus grupos
+        if self.afinidades:
+            afinidad = 0.0
+            for id_grupo in self.horario:
+                afinidad += self.afinidades.get(id_grupo, 0.0)
+            fitness = (1 - PESO_PREFERENCIAS) * fitness + PESO_PREFERENCIAS * (afinidad / len(self.horario))
+
+        return fitness
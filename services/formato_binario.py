@@ -0,0 +1,97 @@
+"""Formato binario de tablas por bloques.
+
+Un archivo .bin es una secuencia de registros pickle: el primero es un
+encabezado con las columnas y cada uno de los siguientes es un bloque (lista de
+tuplas) de filas. Se escribe y se lee bloque por bloque, por lo que la memoria
+usada no depende del tamaño de la tabla, y evita el análisis de texto del CSV.
+
+Solo debe leerse desde el directorio de datos propio de la aplicación: pickle no
+es seguro frente a archivos de origen desconocido.
+"""
+
+import pickle
+
+EXTENSION = ".bin"
+FORMATO = "unicarga-tabla"
+VERSION = 1
+
+
+class EscritorBinario:
+    """Escribe una tabla en formato binario por bloques."""
+
+    def __init__(self, ruta, columnas, tamano_bloque=10000):
+        """Abre el archivo y escribe el encabezado.
+
+        Args:
+            ruta (str): Ruta del archivo .bin
+            columnas (list): Nombres de las columnas
+            tamano_bloque (int): Filas por bloque
+        """
+        self.ruta = ruta
+        self.columnas = list(columnas)
+        self.tamano_bloque = tamano_bloque
+        self.filas_escritas = 0
+        self._bloque = []
+        self._archivo = open(ruta, "wb")
+        pickle.dump({'formato': FORMATO, 'version': VERSION, 'columnas': self.columnas},
+                    self._archivo, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def escribir(self, fila):
+        """Agrega una fila (tupla con los valores en el orden de las columnas)."""
+        self._bloque.append(tuple(fila))
+        if len(self._bloque) >= self.tamano_bloque:
+            self._vaciar_bloque()
+
+    def escribir_filas(self, filas):
+        """Agrega varias filas."""
+        for fila in filas:
+            self.escribir(fila)
+
+    def _vaciar_bloque(self):
+        """Escribe el bloque pendiente."""
+        if self._bloque:
+            pickle.dump(self._bloque, self._archivo, protocol=pickle.HIGHEST_PROTOCOL)
+            self.filas_escritas += len(self._bloque)
+            self._bloque = []
+
+    def cerrar(self):
+        """Escribe el último bloque y cierra el archivo."""
+        self._vaciar_bloque()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+def leer_bloques(ruta):
+    """Itera los bloques de un archivo binario.
+
+    Returns:
+        tuple: (columnas, iterador de listas de tuplas)
+    """
+    archivo = open(ruta, "rb")
+    encabezado = pickle.load(archivo)
+    if not isinstance(encabezado, dict) or encabezado.get('formato') != FORMATO:
+        archivo.close()
+        raise ValueError(f"{ruta} no es un archivo de tabla válido")
+
+    def bloques():
+        with archivo:
+            while True:
+                try:
+                    yield pickle.load(archivo)
+                except EOFError:
+                    return
+
+    return encabezado['columnas'], bloques()
+
+
+def leer_filas(ruta):
+    """Itera las filas de un archivo binario como diccionarios columna -> valor."""
+    columnas, bloques = leer_bloques(ruta)
+    for bloque in bloques:
+        for fila in bloque:
+            yield dict(zip(columnas, fila))
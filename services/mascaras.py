@@ -0,0 +1,47 @@
+"""Representación de horarios como máscaras de bits.
+
+Cada hora de la semana ocupa un bit: bit = (día - 1) * 24 + hora. Dos conjuntos
+de horarios se traslapan si y solo si sus máscaras comparten algún bit, de modo
+que una verificación de conflicto se reduce a un AND entre enteros.
+"""
+
+HORAS_POR_DIA = 24
+DIAS_SEMANA = 7
+
+
+def hora_a_entero(hora):
+    """Convierte una hora ('10:00' o 10) a entero, descartando los minutos."""
+    if isinstance(hora, str):
+        return int(hora.split(':')[0])
+    return int(hora)
+
+
+def mascara_sesion(dia, hora_inicio, hora_fin):
+    """Calcula la máscara de una sesión (día, hora_inicio, hora_fin)."""
+    dia = int(dia)
+    if not 1 <= dia <= DIAS_SEMANA:
+        return 0
+
+    inicio = max(0, hora_a_entero(hora_inicio))
+    fin = min(HORAS_POR_DIA, hora_a_entero(hora_fin))
+    if inicio >= fin:
+        return 0
+
+    # Bloque de (fin - inicio) bits consecutivos a partir de la hora de inicio
+    return ((1 << (fin - inicio)) - 1) << ((dia - 1) * HORAS_POR_DIA + inicio)
+
+
+def mascara_horarios(horarios):
+    """Calcula la máscara de una lista de horarios (día, hora_inicio, hora_fin, aula)."""
+    mascara = 0
+    for dia, hora_inicio, hora_fin, _ in horarios or []:
+        try:
+            mascara |= mascara_sesion(dia, hora_inicio, hora_fin)
+        except (ValueError, TypeError):
+            continue
+    return mascara
+
+
+def hay_conflicto(mascara1, mascara2):
+    """Indica si dos máscaras de horario se traslapan."""
+    return (mascara1 & mascara2) != 0
@@ -4,14 +4,37 @@ from typing import List, Dict, Set, Tuple
 from models.materia import Materia
 from models.grupo import Grupo
 from models.estudiante import Estudiante
+from models.estudiante_simulado import EstudianteSimulado
 from models.horario import Horario
-import copy
+from models.conjunto_materias import ConjuntoMaterias
+from services.espacio_busqueda import EspacioBusqueda
+from services.estado_horario import EstadoHorario
+from services.poblacion import Poblacion, SIN_GRUPO
+from services.seleccion import seleccionar
+from services.preferencias import PESO_PREFERENCIAS, calcular_afinidades, patron_horario
+from services.requisitos import IndiceRequisitos
+from services.planificador_trayectoria import GrafoPlanEstudios
 
 class Optimizador:
     """Clase que implementa el algoritmo genético para optimizar la carga académica."""
     
-    def __init__(self, materias, grupos, seriacion, dependencias_proyectos):
-        """Inicializa el optimizador con los datos necesarios."""
+    # Máximo de materias por cuatrimestre (más materias tienen fitness 0)
+    MAX_MATERIAS = 7
+    
+    # Tamaño de espacio (producto de grupos + 1 por materia) hasta el cual se usa
+    # la búsqueda exacta en lugar del algoritmo genético
+    UMBRAL_BUSQUEDA_EXACTA = 20000
+    
+    def __init__(self, materias, grupos, seriacion, dependencias_proyectos, materia_a_grupos=None,
+                 mascaras_grupos=None):
+        """Inicializa el optimizador con los datos necesarios.
+        
+        Si se proporciona materia_a_grupos (por ejemplo, el índice mantenido por el
+        DataLoader) se comparte en lugar de construir uno propio, de modo que los
+        cambios incrementales del catálogo se reflejan sin reconstruir el optimizador.
+        Lo mismo aplica a mascaras_grupos (máscaras de horario por grupo); si no se
+        proporciona, las máscaras se calculan al construir cada espacio de búsqueda.
+        """
         self.materias = materias or {}
         self.grupos = grupos or {}
         self.seriacion = seriacion or {}
@@ -96,70 +119,104 @@ class Optimizador:
             58: 600  # ESTADÍA II
         } 
         # Mapeo de materias a grupos disponibles
-        self.materia_a_grupos = {}
-        
-        # Verificar que hay grupos válidos
-        if self.grupos:
+        if materia_a_grupos is not None:
+            self.materia_a_grupos = materia_a_grupos
+        else:
+            self.materia_a_grupos = {}
+            
+            # Verificar que hay grupos válidos
             for id_grupo, grupo in self.grupos.items():
                 # Verificar que el grupo tiene un id_materia válido
                 if hasattr(grupo, 'id_materia') and grupo.id_materia is not None:
                     if grupo.id_materia not in self.materia_a_grupos:
                         self.materia_a_grupos[grupo.id_materia] = []
                     self.materia_a_grupos[grupo.id_materia].append(id_grupo)
+        
+        self.mascaras_grupos = mascaras_grupos if mascaras_grupos is not None else {}
+        
+        # Máscaras de requisitos por materia y grafo del plan de estudios
+        # (se calculan al primer uso)
+        self._indice_requisitos = None
+        self._grafo_plan = None
+    
+    def indice_requisitos(self):
+        """Devuelve las máscaras de requisitos del catálogo (ver services.requisitos).
+        
+        Se calculan la primera vez que se piden y se descartan con invalidar_indices
+        cuando cambia el catálogo.
+        """
+        indice = self._indice_requisitos
+        if indice is None:
+            indice = IndiceRequisitos(self.materias, self.seriacion, self.dependencias_proyectos)
+            self._indice_requisitos = indice
+        return indice
+    
+    def grafo_plan(self):
+        """Devuelve el grafo del plan de estudios para planificar trayectorias.
+        
+        Se construye la primera vez que se pide, a partir de las máscaras de
+        requisitos, y se descarta con invalidar_indices.
+        """
+        grafo = self._grafo_plan
+        if grafo is None:
+            grafo = GrafoPlanEstudios(self.materias, self.dependencias_proyectos,
+                                      self.indice_requisitos(), self.MAX_MATERIAS)
+            self._grafo_plan = grafo
+        return grafo
+    
+    def __getstate__(self):
+        # Los índices son máscaras de bits de INDICE_MATERIAS, cuyas posiciones son
+        # propias de cada proceso: otro proceso los vuelve a calcular
+        estado = self.__dict__.copy()
+        estado['_indice_requisitos'] = None
+        estado['_grafo_plan'] = None
+        return estado
+    
+    def invalidar_indices(self):
+        """Descarta los índices derivados del catálogo tras un cambio incremental."""
+        self._indice_requisitos = None
+        self._grafo_plan = None
     
     def get_materias_disponibles(self, estudiante: Estudiante) -> List[int]:
-        """Obtiene las materias que el estudiante puede cursar basado en su historial y seriación."""
-        disponibles = []
+        """Obtiene las materias que el estudiante puede cursar basado en su historial y seriación.
         
-        # Obtener IDs de materias de estadía
-        estadias = [id_materia for id_materia, materia in self.materias.items() 
-                if materia.tipo == "Estadía"]
+        Las materias aprobadas se manejan como máscara de bits: cada verificación de
+        seriación es una operación entre enteros (ver services.requisitos).
+        """
+        disponibles = []
+        indice = self.indice_requisitos()
+        aprobadas = indice.mascara(estudiante.materias_aprobadas)
         
         # Verificar si el estudiante ya está cursando alguna estadía
         # (si estamos en modo simulación para planificación futura)
         inscripciones_simuladas = getattr(estudiante, 'inscripciones_simuladas', [])
-        cursando_estadia = any(id_materia in estadias for id_materia in inscripciones_simuladas)
+        cursando_estadia = any(id_materia in indice.estadias for id_materia in inscripciones_simuladas)
         
         # Si el estudiante es regular, simplemente devolvemos todas las materias de su cuatrimestre actual
         # que no haya aprobado ya y que no tengan prerrequisitos pendientes
         if estudiante.es_regular():
-            # Obtener todas las materias del cuatrimestre actual
-            for id_materia, materia in self.materias.items():
-                # Solo materias del cuatrimestre actual
-                if materia.cuatrimestre == estudiante.cuatrimestre:
-                    # Verificar que no haya aprobado la materia
-                    if id_materia in estudiante.materias_aprobadas:
-                        continue
-                    
-                    # Verificar seriación (prerrequisitos)
-                    if id_materia in self.seriacion:
-                        prerequisitos_cumplidos = True
-                        for prerequisito in self.seriacion[id_materia]:
-                            if prerequisito not in estudiante.materias_aprobadas:
-                                prerequisitos_cumplidos = False
-                                break
-                        
-                        if not prerequisitos_cumplidos:
-                            continue
-                    
-                    # Verificar que haya grupos disponibles para esta materia
-                    if id_materia in self.materia_a_grupos and self.materia_a_grupos[id_materia]:
-                        disponibles.append(id_materia)
+            for id_materia in indice.por_cuatrimestre.get(estudiante.cuatrimestre, []):
+                # Verificar que no haya aprobado la materia y la seriación (prerrequisitos)
+                if indice.bit[id_materia] & aprobadas or indice.seriacion[id_materia] & ~aprobadas:
+                    continue
+                
+                # Verificar que haya grupos disponibles para esta materia
+                if self.materia_a_grupos.get(id_materia):
+                    disponibles.append(id_materia)
                         
             return disponibles
         
         # Para estudiantes irregulares, aplicamos la lógica original más flexible
         for id_materia, materia in self.materias.items():
             # Verificar que no haya aprobado la materia
-            if id_materia in estudiante.materias_aprobadas:
+            if indice.bit[id_materia] & aprobadas:
                 continue
             
+            es_estadia = id_materia in indice.estadias
+            
             # Si el estudiante está cursando estadía, no puede tomar otras materias
-            if cursando_estadia and id_materia not in estadias:
-                continue
-                
-            # Si la materia es estadía pero otra estadía ya está siendo cursada, no disponible
-            if materia.tipo == "Estadía" and cursando_estadia:
+            # ni otra estadía
+            if cursando_estadia:
                 continue
             
             # Alumnos irregulares pueden tomar materias de cuatrimestres anteriores o actuales
@@ -167,76 +224,28 @@ class Optimizador:
                 continue
             
             # Reglas específicas para estadías
-            if materia.tipo == "Estadía":
-                # Estadía 1 (cuatrimestre 6)
+            if es_estadia:
+                # Estadía 1 (cuatrimestre 6): solo a partir del 6º cuatrimestre, con el
+                # Proyecto Integrador 2 y sus materias dependientes aprobadas
                 if materia.cuatrimestre == 6:
-                    # Solo disponible a partir del 6º cuatrimestre
-                    if estudiante.cuatrimestre < 6:
-                        continue
-                    
-                    # Verificar que haya aprobado Proyecto Integrador 2 (ID 35)
-                    proyecto_integrador_2_id = 35
-                    if proyecto_integrador_2_id not in estudiante.materias_aprobadas:
-                        continue
-                    
-                    # Verificar que haya aprobado las materias dependientes del Proyecto Integrador 2
-                    dependencias_proyecto = self.dependencias_proyectos.get(proyecto_integrador_2_id, [])
-                    dependencias_cumplidas = True
-                    for dep_id in dependencias_proyecto:
-                        if dep_id not in estudiante.materias_aprobadas:
-                            dependencias_cumplidas = False
-                            break
-                    
-                    if not dependencias_cumplidas:
+                    if estudiante.cuatrimestre < 6 or indice.estadia1_disponible & ~aprobadas:
                         continue
                 
                 # Estadía 2 (cuatrimestre 10)
-                elif materia.tipo == "Estadía" and materia.cuatrimestre == 10:
-                    # Si ya completó todas las materias excepto las estadías, permitir cursarla
-                    todas_materias_excepto_estadias = [
-                        id_mat for id_mat, mat in self.materias.items() 
-                        if mat.tipo != "Estadía" and id_mat != id_materia
-                    ]
-                    
-                    # Verificar si completó todas las materias regulares
-                    todas_completadas = all(id_mat in estudiante.materias_aprobadas for id_mat in todas_materias_excepto_estadias)
-                    
-                    # Verificar que haya aprobado Proyecto Integrador 3
-                    proyecto_integrador_3_id = 57
-                    pi3_aprobado = proyecto_integrador_3_id in estudiante.materias_aprobadas
-                    
-                    # Si todas están completas o está en el cuatrimestre adecuado, permitir
-                    if (todas_completadas and pi3_aprobado) or estudiante.cuatrimestre >= 10:
-                        # No aplicar restricción de cuatrimestre
-                        pass
-                    else:
-                        # Si no cumple condiciones especiales, no disponible
+                elif materia.cuatrimestre == 10:
+                    # Todas las materias regulares y el Proyecto Integrador 3 aprobados,
+                    # o estar en el cuatrimestre adecuado
+                    todas_completadas = not indice.no_estadias & ~aprobadas
+                    pi3_aprobado = bool(indice.proyecto_integrador_3 & aprobadas)
+                    if not ((todas_completadas and pi3_aprobado) or estudiante.cuatrimestre >= 10):
                         continue
             
-            # Verificar seriación
-            if id_materia in self.seriacion:
-                prerequisitos_cumplidos = True
-                for prerequisito in self.seriacion[id_materia]:
-                    if prerequisito not in estudiante.materias_aprobadas:
-                        prerequisitos_cumplidos = False
-                        break
-                
-                if not prerequisitos_cumplidos:
-                    continue
-            
-            # Verificar dependencias de proyectos
-            if materia.tipo == "Proyecto Integrador":
-                dependencias_cumplidas = True
-                for dep_materia in self.dependencias_proyectos.get(id_materia, []):
-                    if dep_materia not in estudiante.materias_aprobadas:
-                        dependencias_cumplidas = False
-                        break
-                
-                if not dependencias_cumplidas:
-                    continue
+            # Verificar seriación y dependencias de proyectos
+            if indice.requisitos[id_materia] & ~aprobadas:
+                continue
             
             # Verificar que haya grupos disponibles para esta materia
-            if id_materia in self.materia_a_grupos and self.materia_a_grupos[id_materia]:
+            if self.materia_a_grupos.get(id_materia):
                 disponibles.append(id_materia)
         
         return disponibles
@@ -271,426 +280,248 @@ class Optimizador:
             
         return False
     
-    def generar_poblacion_inicial_con_grupos(self, estudiante, tamano_poblacion, grupos_disponibles):
-        """Genera una población inicial basada en grupos específicos."""
-        poblacion = []
+    def construir_espacio_busqueda(self, estudiante, grupos_disponibles=None):
+        """Construye el espacio factible de grupos para un estudiante.
         
-        # Verificar que haya grupos disponibles
-        if not grupos_disponibles:
-            print("Advertencia: No hay grupos disponibles para generar población inicial")
-            return poblacion
+        Args:
+            estudiante (Estudiante): Estudiante a optimizar
+            grupos_disponibles (list, optional): Grupos candidatos; si no se indican
+                se usan todos los grupos de las materias disponibles del estudiante
+            
+        Returns:
+            EspacioBusqueda: Grupos con cupo, compatibilidades y materias excluyentes
+        """
+        if grupos_disponibles is None:
+            grupos_disponibles = [
+                id_grupo
+                for id_materia in self.get_materias_disponibles(estudiante)
+                for id_grupo in self.materia_a_grupos.get(id_materia, [])
+            ]
         
-        # Agrupamos los grupos por materia
-        grupos_por_materia = {}
-        for id_grupo in grupos_disponibles:
-            grupo = self.grupos.get(id_grupo)
-            if not grupo:  # Protección contra grupos inválidos
-                continue
-                
-            id_materia = grupo.id_materia
-            if id_materia not in grupos_por_materia:
-                grupos_por_materia[id_materia] = []
-            grupos_por_materia[id_materia].append(id_grupo)
+        estadias = [id_materia for id_materia, materia in self.materias.items()
+                    if materia.tipo == "Estadía"]
         
-        # Lista de materias disponibles
-        materias_disponibles = list(grupos_por_materia.keys())
+        return EspacioBusqueda(
+            self.grupos,
+            grupos_disponibles,
+            mascaras_grupos=self.mascaras_grupos,
+            creditos_materias={id_materia: materia.creditos for id_materia, materia in self.materias.items()},
+            materias_solas=estadias,
+            max_creditos=getattr(estudiante, 'max_creditos', None)
+        )
+    
+    def generar_poblacion_inicial(self, estudiante, tamano_poblacion, espacio=None):
+        """Genera una población inicial a partir de las materias disponibles del estudiante."""
+        if espacio is None:
+            espacio = self.construir_espacio_busqueda(estudiante)
         
-        # Si no hay materias disponibles, no podemos generar población
-        if not materias_disponibles:
-            print("Advertencia: No hay materias disponibles para generar población inicial")
-            return poblacion
+        if espacio.esta_vacio():
+            print("Advertencia: No hay grupos factibles para generar población inicial")
+            return []
         
-        # Intentos máximos para generar población válida
-        max_intentos = tamano_poblacion * 5  # Aumentamos el número de intentos
-        intentos = 0
+        poblacion = espacio.generar_poblacion(tamano_poblacion)
         
-        while len(poblacion) < tamano_poblacion and intentos < max_intentos:
-            intentos += 1
-            
-            # Seleccionar aleatoriamente un subconjunto de materias disponibles
-            # Nos aseguramos de que al menos intentamos tomar 2 materias si es posible
-            max_materias = min(8, len(materias_disponibles))
-            min_materias = min(2, max_materias)  # Al menos 2 materias o todas si hay menos de 2
-            
-            if max_materias < 1:  # Si no hay materias, no podemos hacer nada
-                break
-                
-            num_materias = random.randint(min_materias, max_materias)
-            materias_seleccionadas = random.sample(materias_disponibles, num_materias)
-            
-            # Para cada materia, seleccionar un grupo disponible
-            horario = []
-            materias_validas = True
-            
-            for id_materia in materias_seleccionadas:
-                if id_materia not in grupos_por_materia:
-                    materias_validas = False
-                    break
-                    
-                grupos_de_materia = grupos_por_materia[id_materia].copy()
-                if not grupos_de_materia:  # Protección contra lista vacía
-                    materias_validas = False
-                    break
-                    
-                random.shuffle(grupos_de_materia)
-                
-                grupo_valido = False
-                for id_grupo in grupos_de_materia:
-                    if id_grupo not in self.grupos:  # Protección contra grupos inválidos
-                        continue
-                        
-                    grupo = self.grupos[id_grupo]
-                    
-                    # Verificar cupo (con flexibilidad)
-                    if hasattr(grupo, 'tiene_cupo') and not grupo.tiene_cupo():
-                        continue
-                    
-                    # Verificar conflictos de horario con materias ya seleccionadas
-                    conflicto = False
-                    for id_grupo_seleccionado in horario:
-                        if id_grupo_seleccionado not in self.grupos:  # Protección
-                            continue
-                            
-                        if self.hay_conflicto_horario(
-                            grupo.horarios if hasattr(grupo, 'horarios') else [], 
-                            self.grupos[id_grupo_seleccionado].horarios if hasattr(self.grupos[id_grupo_seleccionado], 'horarios') else []
-                        ):
-                            conflicto = True
-                            break
-                    
-                    if not conflicto:
-                        horario.append(id_grupo)
-                        grupo_valido = True
-                        break
-                
-                if not grupo_valido:
-                    materias_validas = False
-                    break
-            
-            if materias_validas and horario:
-                poblacion.append(horario)
-        
-        # Si no pudimos generar ninguna solución válida
         if not poblacion:
             print("Advertencia: No se pudo generar ninguna solución válida en la población inicial")
             # Crear al menos un horario vacío para que el algoritmo pueda continuar
             poblacion.append([])
         
-        # Si no pudimos generar suficientes horarios, rellenar con copias
-        # pero solo si hay al menos un horario válido
-        while len(poblacion) < tamano_poblacion and len(poblacion) > 0:
-            poblacion.append(random.choice(poblacion).copy())
-        
         return poblacion
     
-    def calcular_fitness(self, estudiante: Estudiante, horario: List[int]) -> float:
-        """Calcula el valor de fitness para un horario específico."""
-        if not horario:
-            return 0.0
-        
-        # Identificar si hay materias de estadía en el horario
-        estadias_en_horario = []
-        for id_grupo in horario:
-            grupo = self.grupos.get(id_grupo)
-            if grupo and grupo.id_materia in self.materias:
-                materia = self.materias[grupo.id_materia]
-                if materia.tipo == "Estadía":
-                    estadias_en_horario.append(materia.id)
-        
-        # 1. Verificar reglas de estadía
-        if estadias_en_horario:
-            # Si hay una estadía, debe ser la única materia
-            if len(horario) > 1:
-                return 0.0  # Horario inválido si hay más materias además de estadía
-            # Si hay más de una estadía, es inválido
-            if len(estadias_en_horario) > 1:
-                return 0.0  # No se puede cursar más de una estadía a la vez
-            
-            # Si llegamos aquí, hay exactamente una estadía y es la única materia (correcto)
-            return 1.0  # Máximo fitness para un horario con estadía
-        
-        # 2. Verificar número de materias según tipo de estudiante
-        materias_inscritas = set(self.grupos[id_grupo].id_materia for id_grupo in horario)
-        if estudiante.es_regular():
-            # Regulares deben tener exactamente 7 materias, menos es subóptimo
-            if len(materias_inscritas) < 7:
-                penalizacion_materias = 1 - (7 - len(materias_inscritas)) * 0.1
-            elif len(materias_inscritas) > 7:
-                return 0.0  # Inválido tener más de 7 materias
-            else:
-                penalizacion_materias = 1.0  # Óptimo: exactamente 7 materias
-        else:
-            # Irregulares: flexible, pero con límite máximo
-            max_materias_irregular = 7
-            if len(materias_inscritas) > max_materias_irregular:
-                return 0.0  # Inválido exceder el máximo
-            else:
-                # Premiar más materias, hasta el máximo permitido
-                penalizacion_materias = len(materias_inscritas) / max_materias_irregular
+    def generar_poblacion_inicial_con_grupos(self, estudiante, tamano_poblacion, grupos_disponibles, espacio=None):
+        """Genera una población inicial basada en grupos específicos.
         
-        # 3. Verificar que no exceda el máximo de créditos (prioridad alta)
-        total_creditos = 0
-        for id_grupo in horario:
-            id_materia = self.grupos[id_grupo].id_materia
-            total_creditos += self.materias[id_materia].creditos
-        
-        if total_creditos > estudiante.max_creditos:
-            return 0.0  # Horario inválido
+        Los individuos se construyen solo con grupos del espacio factible (con cupo
+        y sin conflictos de horario), por lo que cada intento produce un horario válido.
+        """
+        # Verificar que haya grupos disponibles
+        if not grupos_disponibles:
+            print("Advertencia: No hay grupos disponibles para generar población inicial")
+            return []
         
-        # 4. Evaluar balance de carga por día (prioridad alta)
-        carga_por_dia = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}  # Lunes a Viernes
-
-        for id_grupo in horario:
-            grupo = self.grupos.get(id_grupo)
-            if not grupo or not hasattr(grupo, 'horarios'):
-                continue
-                
-            for dia, hora_inicio, hora_fin, _ in grupo.horarios:
-                if 1 <= dia <= 5:  # Solo consideramos días hábiles
-                    # Convertir a enteros si son strings
-                    if isinstance(hora_inicio, str):
-                        hora_inicio = int(hora_inicio.split(':')[0])
-                    if isinstance(hora_fin, str):
-                        hora_fin = int(hora_fin.split(':')[0])
-                    
-                    # Calcular duración real en horas
-                    duracion = hora_fin - hora_inicio
-                    
-                    # Acumular horas por día
-                    carga_por_dia[dia] += duracion
-                
-        desviacion_estandar = np.std(list(carga_por_dia.values()))
+        if espacio is None:
+            espacio = self.construir_espacio_busqueda(estudiante, grupos_disponibles)
         
-        # Verificar si hay días con más de 8 horas (sobrecarga) o con solo 1-2 horas (ineficiente)
-        dias_sobrecargados = sum(1 for carga in carga_por_dia.values() if carga > 8)
-        dias_poco_eficientes = sum(1 for carga in carga_por_dia.values() if 0 < carga <= 2)
+        return self.generar_poblacion_inicial(estudiante, tamano_poblacion, espacio)
+    
+    def calcular_fitness(self, estudiante: Estudiante, horario: List[int]) -> float:
+        """Calcula el valor de fitness para un horario específico.
         
-        # Calcular penalización por distribución ineficiente
-        penalizacion_distribucion = 0.05 * (dias_sobrecargados + dias_poco_eficientes)
+        Criterios (ver EstadoHorario para el detalle de los pesos):
         
-        # 5. Priorizar materias de cuatrimestres anteriores para irregulares (prioridad alta)
-        prioridad_materias = 0
-        if not estudiante.es_regular():
-            for id_grupo in horario:
-                id_materia = self.grupos[id_grupo].id_materia
-                cuatrimestre_materia = self.materias[id_materia].cuatrimestre
-                
-                # Mayor prioridad a materias de cuatrimestres más antiguos
-                if cuatrimestre_materia < estudiante.cuatrimestre:
-                    prioridad_materias += (estudiante.cuatrimestre - cuatrimestre_materia)
-        
-        # 6. Verificar eficiencia del uso de horas consecutivas
-        # (Premiar horarios que agrupan materias en bloques consecutivos sin "huecos")
-        horas_consecutivas = 0
-        horas_con_huecos = 0
-        for dia in range(1, 6):
-            # Crear mapa de horas ocupadas para este día
-            horas_ocupadas = [False] * 12  # De 8AM a 8PM
-            for id_grupo in horario:
-                grupo = self.grupos.get(id_grupo)
-                if not grupo or not hasattr(grupo, 'horarios'):
-                    continue
-                    
-                for d, inicio, fin, _ in grupo.horarios:
-                    if d == dia:
-                        h_inicio = int(inicio.split(':')[0]) if isinstance(inicio, str) else inicio
-                        h_fin = int(fin.split(':')[0]) if isinstance(fin, str) else fin
-                        for h in range(h_inicio - 8, h_fin - 8):  # Convertir a índice 0-11
-                            if 0 <= h < 12:
-                                horas_ocupadas[h] = True
-            
-            # Contar bloques consecutivos y huecos
-            bloque_actual = 0
-            for hora in horas_ocupadas:
-                if hora:
-                    bloque_actual += 1
-                elif bloque_actual > 0:  # Fin de un bloque
-                    if bloque_actual >= 2:
-                        horas_consecutivas += bloque_actual
-                    else:
-                        horas_con_huecos += 1
-                    bloque_actual = 0
-            
-            # Procesar último bloque si existe
-            if bloque_actual > 0:
-                if bloque_actual >= 2:
-                    horas_consecutivas += bloque_actual
-                else:
-                    horas_con_huecos += 1
+        1. Estadía: debe ser la única materia del horario (fitness 1.0).
+        2. Número de materias (máximo 7; los regulares deben cursar 7).
+        3. Créditos dentro del máximo del estudiante.
+        4. Balance de carga por día y días sobrecargados o poco eficientes.
+        5. Prioridad de materias atrasadas (irregulares).
+        6. Horas en bloques consecutivos sin huecos.
+        7. Diversidad de tipos de materia.
+        8. Afinidad con las preferencias del estudiante (hora, días y profesores).
         
-        # Bonificación por eficiencia de horario
-        bonificacion_eficiencia = 0.1 * (horas_consecutivas / (horas_consecutivas + horas_con_huecos + 1))
+        Para evaluar muchos horarios que difieren en pocos grupos conviene usar
+        EstadoHorario directamente y actualizarlo por diferencias.
+        """
+        if not horario:
+            return 0.0
+        afinidades = calcular_afinidades(self.grupos, horario, getattr(estudiante, 'preferencias', None))
+        return EstadoHorario(self.grupos, self.materias, estudiante, horario, afinidades=afinidades).fitness()
+    
+    def optimizar_exacto(self, estudiante, espacio):
+        """Encuentra el horario de mayor fitness recorriendo todo el espacio de búsqueda.
         
-        # 7. Balance entre materias del mismo tipo (evitar sobrecarga de un solo tipo)
-        tipos_materia = {}
-        for id_grupo in horario:
-            grupo = self.grupos.get(id_grupo)
-            if not grupo:
-                continue
-                
-            id_materia = grupo.id_materia
-            materia = self.materias.get(id_materia)
-            if not materia:
-                continue
-                
-            tipo = materia.tipo
-            tipos_materia[tipo] = tipos_materia.get(tipo, 0) + 1
+        Ramificación y acotamiento sobre las materias del espacio: para cada una se
+        prueba cada grupo sin conflicto con lo ya elegido (verificación por máscara)
+        y, al final, la opción de no cursarla. Una rama se descarta cuando excede el
+        máximo de materias o de créditos, o cuando la cota superior de su fitness no
+        supera al mejor horario encontrado. Solo conviene en espacios pequeños
+        (ver UMBRAL_BUSQUEDA_EXACTA).
         
-        # Bonificación por diversidad de tipos
-        diversidad_tipos = min(1.0, len(tipos_materia) / 3)  # Normalizado a max 1.0
+        Args:
+            estudiante (Estudiante): Estudiante a optimizar
+            espacio (EspacioBusqueda): Espacio factible del estudiante
+            
+        Returns:
+            list: IDs de los grupos del mejor horario (vacía si ninguno tiene fitness > 0)
+        """
+        # Primero las materias con menos grupos: los conflictos aparecen antes
+        materias = sorted(espacio.materias, key=lambda m: (len(espacio.grupos_por_materia[m]), m))
+        if not materias:
+            return []
         
-        # Construir fitness final (combinando todos los factores)
-        if estudiante.es_regular():
-            # Para regulares: enfoque en completar su cuatrimestre actual
-            fitness = (
-                0.40 * penalizacion_materias +           # Número correcto de materias (muy alto)
-                0.20 * (1 / (1 + desviacion_estandar)) + # Balance de carga (medio)
-                0.15 * (total_creditos / estudiante.max_creditos) + # Uso eficiente de créditos
-                0.15 * bonificacion_eficiencia +         # Eficiencia de horario
-                0.10 * diversidad_tipos -                # Diversidad de tipos de materia
-                penalizacion_distribucion                # Penalización por distribución ineficiente
-            )
-        else:
-            # Para irregulares: priorizar materias atrasadas y optimización
-            fitness = (
-                0.30 * penalizacion_materias +           # Número de materias
-                0.15 * (1 / (1 + desviacion_estandar)) + # Balance de carga
-                0.30 * prioridad_materias +              # Materias atrasadas (alta prioridad)
-                0.15 * bonificacion_eficiencia +         # Eficiencia de horario
-                0.10 * diversidad_tipos -                # Diversidad de tipos de materia
-                penalizacion_distribucion                # Penalización por distribución ineficiente
+        es_regular = estudiante.es_regular()
+        max_creditos = estudiante.max_creditos
+        cache_grupos = {}
+        afinidades = calcular_afinidades(self.grupos, espacio.grupos_factibles(),
+                                         getattr(estudiante, 'preferencias', None))
+        max_afinidad = max(afinidades.values(), default=0.0)
+        creditos = [self.materias[m].creditos for m in materias]
+        tipos = [self.materias[m].tipo for m in materias]
+        # Aporte de cada materia a la prioridad de materias atrasadas (solo irregulares)
+        atraso = [max(0, estudiante.cuatrimestre - self.materias[m].cuatrimestre) for m in materias]
+        
+        # Sumas de lo que todavía pueden aportar las materias i, i+1, ...
+        num_materias = len(materias)
+        creditos_restantes = [0] * (num_materias + 1)
+        atraso_restante = [0] * (num_materias + 1)
+        tipos_restantes = [frozenset()] * (num_materias + 1)
+        for i in range(num_materias - 1, -1, -1):
+            creditos_restantes[i] = creditos_restantes[i + 1] + creditos[i]
+            atraso_restante[i] = atraso_restante[i + 1] + atraso[i]
+            tipos_restantes[i] = tipos_restantes[i + 1] | {tipos[i]}
+        
+        def cota_superior(i, elegidas, creditos_actuales, tipos_actuales, atraso_actual):
+            """Fitness máximo alcanzable completando el horario con las materias i, i+1, ..."""
+            if espacio.materias_solas:
+                return 1.0  # Un horario con solo una estadía vale 1.0
+            
+            max_elegidas = min(self.MAX_MATERIAS, elegidas + num_materias - i)
+            diversidad = min(1.0, len(tipos_actuales | tipos_restantes[i]) / 3)
+            # Balance de carga <= 1, eficiencia de horario <= 0.1, penalizaciones >= 0
+            if es_regular:
+                uso_creditos = min(1.0, (creditos_actuales + creditos_restantes[i]) / max_creditos) if max_creditos else 1.0
+                cota = (0.40 * (1 - (self.MAX_MATERIAS - max_elegidas) * 0.1) + 0.20 +
+                        0.15 * uso_creditos + 0.15 * 0.1 + 0.10 * diversidad)
+            else:
+                cota = (0.30 * max_elegidas / self.MAX_MATERIAS + 0.15 +
+                        0.30 * (atraso_actual + atraso_restante[i]) + 0.15 * 0.1 + 0.10 * diversidad)
+            cota = min(1.0, cota)
+            if afinidades:
+                # La afinidad media no supera la mayor afinidad de un grupo
+                cota = (1 - PESO_PREFERENCIAS) * cota + PESO_PREFERENCIAS * max_afinidad
+            return cota
+        
+        mejor = {'horario': [], 'fitness': 0.0}
+        horario = []
+        
+        def ramificar(i, ocupado, creditos_actuales, tipos_actuales, atraso_actual, excluidas):
+            if cota_superior(i, len(horario), creditos_actuales, tipos_actuales, atraso_actual) <= mejor['fitness']:
+                return
+            
+            if i == num_materias:
+                fitness = EstadoHorario(self.grupos, self.materias, estudiante, horario,
+                                        cache_grupos, afinidades).fitness()
+                if fitness > mejor['fitness']:
+                    mejor['horario'] = horario.copy()
+                    mejor['fitness'] = fitness
+                return
+            
+            id_materia = materias[i]
+            puede_cursarse = (
+                id_materia not in excluidas and
+                len(horario) < self.MAX_MATERIAS and
+                creditos_actuales + creditos[i] <= max_creditos
             )
+            if puede_cursarse:
+                nuevas_excluidas = excluidas | espacio.materias_excluyentes[id_materia]
+                for id_grupo in espacio.grupos_por_materia[id_materia]:
+                    mascara = espacio.mascaras[id_grupo]
+                    if mascara & ocupado:
+                        continue
+                    horario.append(id_grupo)
+                    ramificar(i + 1, ocupado | mascara, creditos_actuales + creditos[i],
+                              tipos_actuales | {tipos[i]}, atraso_actual + atraso[i], nuevas_excluidas)
+                    horario.pop()
+            
+            # No cursar esta materia
+            ramificar(i + 1, ocupado, creditos_actuales, tipos_actuales, atraso_actual, excluidas)
         
-        return max(0.0, min(1.0, fitness))  # Normalizar entre 0 y 1
+        ramificar(0, 0, 0, frozenset(), 0, frozenset())
+        return mejor['horario']
     
-    def seleccionar_padres(self, poblacion, fitness, num_padres):
-        """Selecciona padres para reproducción usando selección por torneo.
+    def seleccionar_padres(self, poblacion, fitness, num_padres, metodo="torneo"):
+        """Selecciona padres para reproducción (por defecto, selección por torneo).
+        
+        Todos los padres de la generación se eligen en una sola operación
+        vectorizada (ver services.seleccion).
         
         Args:
-            poblacion (list): Lista de individuos (horarios).
-            fitness (list): Lista de valores de fitness correspondientes a cada individuo.
+            poblacion (sequence): Individuos (horarios) o índices de fila de la población.
+            fitness (array-like): Valores de fitness correspondientes a cada individuo.
             num_padres (int): Número de padres a seleccionar.
+            metodo (str): 'torneo', 'ranking' o 'sus'.
             
         Returns:
             list: Lista de padres seleccionados.
         """
-        padres = []
-        
         # Verificar que la población no esté vacía
-        if not poblacion or len(poblacion) == 0:
-            return padres  # Retornar lista vacía si no hay población
-        
-        for _ in range(num_padres):
-            # Asegurarse de que hay al menos un individuo para el torneo
-            if len(poblacion) == 0:
-                break
-                
-            # Determinar tamaño del torneo (entre 1 y 3, dependiendo del tamaño de la población)
-            tamano_torneo = min(3, len(poblacion))
-            if tamano_torneo == 0:
-                break
-                
-            # Seleccionar individuos aleatoriamente para el torneo
-            try:
-                indices_torneo = random.sample(range(len(poblacion)), tamano_torneo)
-                
-                # Encontrar el mejor
-                mejor_idx = indices_torneo[0]
-                for idx in indices_torneo[1:]:
-                    if fitness[idx] > fitness[mejor_idx]:
-                        mejor_idx = idx
-                
-                padres.append(poblacion[mejor_idx])
-            except (ValueError, IndexError) as e:
-                # Si hay algún error en el muestreo o con índices, registrarlo y continuar
-                print(f"Error en selección de padres: {e}")
-                continue
-        
-        return padres
-    
-    def cruzar(self, padre1: List[int], padre2: List[int]) -> Tuple[List[int], List[int]]:
-        """Realiza cruza entre dos padres para generar dos hijos."""
-        # Caso especial: si algún padre está vacío o tiene solo un elemento, 
-        # simplemente devolvemos copias de los padres
-        if not padre1 or not padre2 or len(padre1) <= 1 or len(padre2) <= 1:
-            return padre1.copy(), padre2.copy()
-        
-        # Calculamos el punto de corte de manera segura
-        max_punto_corte = min(len(padre1), len(padre2)) - 1
-        
-        # Verificación adicional para evitar rangos vacíos
-        if max_punto_corte < 1:
-            return padre1.copy(), padre2.copy()
-        
-        punto_corte = random.randint(1, max_punto_corte)
+        if not len(poblacion):
+            return []
         
-        hijo1 = padre1[:punto_corte] + padre2[punto_corte:]
-        hijo2 = padre2[:punto_corte] + padre1[punto_corte:]
+        if metodo == "torneo":
+            # Tamaño del torneo entre 1 y 3, dependiendo del tamaño de la población
+            indices = seleccionar(fitness, num_padres, metodo, tamano_torneo=min(3, len(poblacion)))
+        else:
+            indices = seleccionar(fitness, num_padres, metodo)
         
-        return hijo1, hijo2
+        return [poblacion[indice] for indice in indices.tolist()]
     
-    def mutar(self, horario: List[int], tasa_mutacion: float, 
-             estudiante: Estudiante) -> List[int]:
-        """Aplica mutación a un horario."""
-        if not horario or random.random() > tasa_mutacion:
-            return horario
-        
-        # Elegir grupo a mutar
-        idx_mutar = random.randint(0, len(horario) - 1)
-        id_grupo_actual = horario[idx_mutar]
-        id_materia_actual = self.grupos[id_grupo_actual].id_materia
-        
-        # Intentar reemplazar por otro grupo de la misma materia
-        otros_grupos = [id_grupo for id_grupo in self.materia_a_grupos.get(id_materia_actual, []) 
-                       if id_grupo != id_grupo_actual]
-        
-        if otros_grupos:
-            nuevo_grupo = random.choice(otros_grupos)
-            
-            # Verificar conflictos de horario
-            conflicto = False
-            for id_grupo in horario:
-                if id_grupo != id_grupo_actual and self.hay_conflicto_horario(
-                    self.grupos[nuevo_grupo].horarios, self.grupos[id_grupo].horarios):
-                    conflicto = True
-                    break
-            
-            if not conflicto:
-                horario_mutado = horario.copy()
-                horario_mutado[idx_mutar] = nuevo_grupo
-                return horario_mutado
+    def cruzar(self, padre1, padre2, hijo1, hijo2, espacio, intercambiar):
+        """Realiza cruza entre dos padres escribiendo los dos hijos en su lugar.
         
-        # Si no podemos mutar el grupo, intentar reemplazar la materia
-        materias_disponibles = self.get_materias_disponibles(estudiante)
-        materias_actuales = {self.grupos[id_grupo].id_materia for id_grupo in horario}
-        nuevas_materias = [m for m in materias_disponibles if m not in materias_actuales]
+        Los individuos son filas de la matriz de genes de la población (una
+        columna por materia con su grupo o SIN_GRUPO). Cruce uniforme por materia:
+        para cada columna, un hijo hereda el gen de un padre y el otro hijo el del
+        otro (incluida la ausencia de la materia), así que un hijo nunca tiene dos
+        grupos de la misma materia. Después los hijos se reparan (conflictos de
+        horario, cupo, máximo de materias y créditos); un hijo que se queda sin
+        materias conserva a su padre.
         
-        if nuevas_materias:
-            nueva_materia = random.choice(nuevas_materias)
-            grupos_nuevos = self.materia_a_grupos.get(nueva_materia, [])
-            
-            if grupos_nuevos:
-                random.shuffle(grupos_nuevos)
-                for nuevo_grupo in grupos_nuevos:
-                    # Verificar cupo
-                    if not self.grupos[nuevo_grupo].tiene_cupo():
-                        continue
-                    
-                    # Verificar conflictos de horario
-                    conflicto = False
-                    for id_grupo in horario:
-                        if id_grupo != id_grupo_actual and self.hay_conflicto_horario(
-                            self.grupos[nuevo_grupo].horarios, self.grupos[id_grupo].horarios):
-                            conflicto = True
-                            break
-                    
-                    if not conflicto:
-                        horario_mutado = horario.copy()
-                        horario_mutado[idx_mutar] = nuevo_grupo
-                        return horario_mutado
-        
-        return horario
-    
+        Args:
+            padre1 (numpy.ndarray): Fila de genes del primer padre
+            padre2 (numpy.ndarray): Fila de genes del segundo padre
+            hijo1 (numpy.ndarray): Fila libre donde se escribe el primer hijo
+            hijo2 (numpy.ndarray): Fila libre donde se escribe el segundo hijo
+            espacio (EspacioBusqueda): Espacio factible usado para reparar
+            intercambiar (numpy.ndarray): Columnas (bool) en las que cada hijo hereda del otro padre
+        """
+        np.copyto(hijo1, padre1)
+        np.copyto(hijo1, padre2, where=intercambiar)
+        np.copyto(hijo2, padre2)
+        np.copyto(hijo2, padre1, where=intercambiar)
+        
+        for hijo, padre in ((hijo1, padre1), (hijo2, padre2)):
+            if not espacio.reparar(hijo, self.MAX_MATERIAS):
+                np.copyto(hijo, padre)
     
     def generar_horario_semanal(self, horario):
         """Genera una representación del horario semanal para visualización."""
@@ -1080,25 +911,18 @@ class Optimizador:
         
         Args:
             id_materia: ID de la materia a verificar
-            materias_aprobadas: Conjunto de IDs de materias aprobadas
+            materias_aprobadas: Materias aprobadas (ConjuntoMaterias, conjunto de IDs
+                o máscara de bits)
             
         Returns:
             bool: True si cumple con todos los prerrequisitos, False en caso contrario
         """
-        # Verificar seriación
-        if id_materia in self.seriacion:
-            for prerequisito in self.seriacion[id_materia]:
-                if prerequisito not in materias_aprobadas:
-                    return False
-        
-        # Verificar dependencias de proyectos
-        materia = self.materias.get(id_materia)
-        if materia and materia.tipo == "Proyecto Integrador":
-            for dep_materia in self.dependencias_proyectos.get(id_materia, []):
-                if dep_materia not in materias_aprobadas:
-                    return False
-        
-        return True 
+        indice = self.indice_requisitos()
+        if not isinstance(materias_aprobadas, int):
+            materias_aprobadas = indice.mascara(materias_aprobadas)
+        
+        # Seriación y, para proyectos integradores, dependencias de proyectos
+        return indice.cumple_requisitos(id_materia, materias_aprobadas)
     
     def verificar_prerequisitos_para_estadia(self, id_estadia, materias_aprobadas):
         """Verifica los prerrequisitos específicos para cursar una estadía."""
@@ -1106,66 +930,55 @@ class Optimizador:
         if not materia or materia.tipo != "Estadía":
             return False
         
-        # Estadía 1 (cuatrimestre 6)
+        indice = self.indice_requisitos()
+        if not isinstance(materias_aprobadas, int):
+            materias_aprobadas = indice.mascara(materias_aprobadas)
+        
+        # Estadía 1 (cuatrimestre 6): Proyecto Integrador 2 (ID 35) y sus materias relacionadas
         if materia.cuatrimestre == 6:
-            # Verificar Proyecto Integrador 2 (ID 35)
-            proyecto_integrador_2_id = 35
-            if proyecto_integrador_2_id not in materias_aprobadas:
+            if indice.estadia1_verificacion & ~materias_aprobadas:
                 return False
-            
-            # Verificar materias relacionadas con Proyecto Integrador 2
-            materias_relacionadas = [32, 33, 34]  # IDs de las materias relacionadas
-            for id_materia in materias_relacionadas:
-                if id_materia not in materias_aprobadas:
-                    return False
         
         # Estadía 2 (cuatrimestre 10)
         elif materia.cuatrimestre == 10:
             # Verificar si ha aprobado el Proyecto Integrador 3 (requisito mínimo)
-            proyecto_integrador_3_id = 57
-            if proyecto_integrador_3_id not in materias_aprobadas:
+            if not indice.proyecto_integrador_3 & materias_aprobadas:
                 return False
-                
-            # Si ha aprobado PI3, verificamos si todas las demás materias (excepto Estadía 2) están aprobadas
-            todas_materias_excepto_estadias = [
-                id_mat for id_mat, mat in self.materias.items() 
-                if mat.tipo != "Estadía" and id_mat != id_estadia
-            ]
             
-            # Si todas las materias están aprobadas, permitir Estadía 2 independientemente del cuatrimestre
-            if all(id_mat in materias_aprobadas for id_mat in todas_materias_excepto_estadias):
+            # Si todas las materias (excepto estadías) están aprobadas, permitir
+            # Estadía 2 independientemente del cuatrimestre
+            if not indice.no_estadias & ~materias_aprobadas:
                 return True
         
         # Verificar seriación general
-        return self.verificar_prerequisitos(id_estadia, materias_aprobadas)
+        return indice.cumple_requisitos(id_estadia, materias_aprobadas)
     
-    def planificar_trayectoria_completa(self, estudiante):
-        """Genera un plan completo de trayectoria académica hasta la graduación."""
+    def planificar_trayectoria_completa(self, estudiante, grupos_reales=False, en_procesos=None):
+        """Genera un plan completo de trayectoria académica hasta la graduación.
+        
+        Las materias de cada cuatrimestre salen del grafo del plan de estudios
+        (ver services.planificador_trayectoria): el plan tiene el mínimo de
+        cuatrimestres posible cuando "plan_optimo" es True, y en cualquier caso
+        se informa la cota inferior de cuatrimestres para graduarse.
+        
+        Args:
+            estudiante (Estudiante): Estudiante a planificar
+            grupos_reales (bool): Si es True, el horario de cada cuatrimestre se
+                optimiza con los grupos reales (ver planificar_con_grupos_reales);
+                si no, se simula a partir de la carga horaria de cada materia
+            en_procesos (callable, optional): Planifica cuatrimestres con grupos reales
+                en otros procesos (ver planificar_con_grupos_reales)
+        """
         MAX_CUATRIMESTRES = 15  # Límite máximo de cuatrimestres permitidos
         
         try:
-            # Obtener todas las materias del plan de estudios organizadas por cuatrimestre
-            materias_por_cuatrimestre = {}
-            for id_materia, materia in self.materias.items():
-                if materia.cuatrimestre not in materias_por_cuatrimestre:
-                    materias_por_cuatrimestre[materia.cuatrimestre] = []
-                materias_por_cuatrimestre[materia.cuatrimestre].append(id_materia)
-            
-            # Determinar el cuatrimestre actual del estudiante
-            cuatrimestre_actual = estudiante.cuatrimestre
-            
             # Obtener todas las materias aprobadas
-            materias_aprobadas = set(estudiante.materias_aprobadas)
-            
-            # Obtener todas las materias pendientes (no aprobadas) organizadas por cuatrimestre
-            materias_pendientes_por_cuatrimestre = {}
-            for cuatrimestre, materias in materias_por_cuatrimestre.items():
-                materias_pendientes = [m for m in materias if m not in materias_aprobadas]
-                if materias_pendientes:
-                    materias_pendientes_por_cuatrimestre[cuatrimestre] = materias_pendientes
+            materias_aprobadas = ConjuntoMaterias(estudiante.materias_aprobadas)
+            cuatrimestre_actual = estudiante.cuatrimestre
             
-            # Calcular el total de materias pendientes
-            total_materias_pendientes = sum(len(materias) for materias in materias_pendientes_por_cuatrimestre.values())
+            # Calendarización de las materias pendientes (compartida entre historiales iguales)
+            plan = self.grafo_plan().planificar(materias_aprobadas, cuatrimestre_actual)
+            total_materias_pendientes = sum(len(materias) for materias in plan.cuatrimestres) + len(plan.no_planificables)
             
             # Inicializar la estructura del plan completo
             plan_completo = {
@@ -1184,273 +997,64 @@ class Optimizador:
                 plan_completo["mensaje"] = "El estudiante ha completado todas las materias del plan de estudios"
                 return plan_completo
             
-            # Organizar materias pendientes respetando seriaciones y dependencias
-            # Empezamos desde el cuatrimestre actual y planificamos hacia adelante
-            simulacion_aprobadas = set(materias_aprobadas)  # Materias que se consideran "aprobadas" en simulación
-            cuatrimestre_planificacion = cuatrimestre_actual
-            estudiante_simulado = copy.deepcopy(estudiante)  # Copia para simulación
-            estudiante_simulado.inscripciones_simuladas = []  # Inicializar el atributo
+            # Horarios con grupos reales, optimizados antes de armar el plan
+            cargas_reales = {}
+            if grupos_reales:
+                cargas_reales = self.planificar_con_grupos_reales(estudiante, plan, en_procesos)
+                plan_completo["materias_sin_horario"] = sorted(
+                    id_materia for carga in cargas_reales.values() for id_materia in carga.get("materias_sin_horario", [])
+                )
             
-            # Límite para evitar bucles infinitos
-            max_ciclos = 20
-            ciclo_actual = 0
+            # Simulación sobre el estudiante (no lo copia ni lo modifica)
+            estudiante_simulado = EstudianteSimulado(estudiante)
             
-            # Para estudiantes regulares, mostrar estadías en sus cuatrimestres correspondientes (6 y 10)
-            es_regular = estudiante_simulado.es_regular()
-            id_estadia1 = None
-            id_estadia2 = None
-            
-            # Buscar IDs de las estadías para mostrarlas en los cuatrimestres correspondientes
-            if es_regular:
-                for id_materia, materia in self.materias.items():
-                    if materia.tipo == "Estadía":
-                        if materia.cuatrimestre == 6:
-                            id_estadia1 = id_materia
-                        elif materia.cuatrimestre == 10:
-                            id_estadia2 = id_materia
-            
-            while materias_pendientes_por_cuatrimestre and cuatrimestre_planificacion <= MAX_CUATRIMESTRES and ciclo_actual < max_ciclos:
-                ciclo_actual += 1
-                
+            for cuatrimestre_planificacion, materias_a_cursar in plan.por_cuatrimestre():
                 # Actualizar el cuatrimestre del estudiante simulado
                 estudiante_simulado.cuatrimestre = cuatrimestre_planificacion
-                
-                # Limpiar inscripciones simuladas anteriores
                 estudiante_simulado.inscripciones_simuladas = []
                 
-                # CASO ESPECIAL PARA REGULARES: Mostrar estadías en cuatrimestres 6 y 10
-                if es_regular and ((cuatrimestre_planificacion == 6 and id_estadia1) or 
-                                (cuatrimestre_planificacion == 10 and id_estadia2)):
-                    
-                    id_estadia = id_estadia1 if cuatrimestre_planificacion == 6 else id_estadia2
-                    materia_estadia = self.materias[id_estadia]
-                    
-                    # Para alumnos regulares, mostrar la estadía sin verificar prerrequisitos
-                    carga_cuatrimestre = {
+                if not materias_a_cursar:
+                    # Ninguna materia pendiente se imparte todavía en este cuatrimestre
+                    plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = {
                         "cuatrimestre": cuatrimestre_planificacion,
-                        "materias_inscritas": [{
-                            "id_materia": id_estadia,
-                            "nombre_materia": materia_estadia.nombre,
-                            "id_grupo": 0,  # Grupo simulado
-                            "profesor": "Por asignar",
-                            "creditos": materia_estadia.creditos,
-                            "cuatrimestre": materia_estadia.cuatrimestre,
-                            "tipo": materia_estadia.tipo,
-                            "horarios": []
-                        }],
-                        "creditos_totales": materia_estadia.creditos,
-                        "num_materias": 1,
-                        "horario_semanal": {},
-                        "carga_por_dia": {1:0, 2:0, 3:0, 4:0, 5:0}
+                        "materias_inscritas": [],
+                        "creditos_totales": 0,
+                        "num_materias": 0,
+                        "advertencia": "No hay materias disponibles para este cuatrimestre"
                     }
-                    
-                    plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = carga_cuatrimestre
-                    simulacion_aprobadas.add(id_estadia)
-                    
-                    # Eliminar de pendientes
-                    for cuatri in list(materias_pendientes_por_cuatrimestre.keys()):
-                        if id_estadia in materias_pendientes_por_cuatrimestre[cuatri]:
-                            materias_pendientes_por_cuatrimestre[cuatri].remove(id_estadia)
-                            total_materias_pendientes -= 1
-                    
-                    # Ya no buscar más materias para este cuatrimestre
-                    cuatrimestre_planificacion += 1
-                    continue
-                    
-                # Para casos que no son estadías regulares, continuamos con la lógica normal
-                
-                # Obtener materias de estadía disponibles para verificación especial
-                # (Esto aplica principalmente para irregulares o regulares en otros cuatrimestres)
-                estadias_disponibles = []
-                for id_materia, materia in self.materias.items():
-                    if (materia.tipo == "Estadía" and 
-                        materia.cuatrimestre == cuatrimestre_planificacion and
-                        id_materia not in simulacion_aprobadas):
-                        
-                        # Para irregulares, verificar prerrequisitos para estadía
-                        if not es_regular:
-                            if self.verificar_prerequisitos_para_estadia(id_materia, simulacion_aprobadas):
-                                estadias_disponibles.append(id_materia)
-                        # Para regulares, agregar automáticamente si coincide con el cuatrimestre
-                        else:
-                            estadias_disponibles.append(id_materia)
-                
-                # Si hay estadías disponibles y cumplen prerrequisitos, planificar solo la estadía
-                if estadias_disponibles:
-                    id_estadia = estadias_disponibles[0]  # Tomar la primera estadía disponible
-                    materia_estadia = self.materias[id_estadia]
-                    
-                    # Planificar estadía
-                    carga_cuatrimestre = {
-                        "cuatrimestre": cuatrimestre_planificacion,
-                        "materias_inscritas": [{
-                            "id_materia": id_estadia,
-                            "nombre_materia": materia_estadia.nombre,
-                            "id_grupo": 0,  # Grupo simulado
-                            "profesor": "Por asignar",
-                            "creditos": materia_estadia.creditos,
-                            "cuatrimestre": materia_estadia.cuatrimestre,
-                            "tipo": materia_estadia.tipo,
-                            "horarios": []
-                        }],
-                        "creditos_totales": materia_estadia.creditos,
-                        "num_materias": 1,
-                        "horario_semanal": {},
-                        "carga_por_dia": {1:0, 2:0, 3:0, 4:0, 5:0}
-                    }
-                    
-                    plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = carga_cuatrimestre
-                    simulacion_aprobadas.add(id_estadia)
-                    
-                    # Eliminar de pendientes
-                    for cuatri in list(materias_pendientes_por_cuatrimestre.keys()):
-                        if id_estadia in materias_pendientes_por_cuatrimestre[cuatri]:
-                            materias_pendientes_por_cuatrimestre[cuatri].remove(id_estadia)
-                            total_materias_pendientes -= 1
-                    
-                    # Ya no buscar más materias para este cuatrimestre
-                    cuatrimestre_planificacion += 1
                     continue
                 
-                # CAMBIO IMPORTANTE: Para estudiantes regulares, tomar TODAS las materias del cuatrimestre actual
-                if es_regular:
-                    # Obtener todas las materias pendientes de este cuatrimestre
-                    materias_cuatrimestre = materias_por_cuatrimestre.get(cuatrimestre_planificacion, [])
-                    materias_pendientes_cuatrimestre = [m for m in materias_cuatrimestre if m not in simulacion_aprobadas]
-                    
-                    # Verificar si hay materias pendientes para este cuatrimestre
-                    if materias_pendientes_cuatrimestre:
-                        # Verificar seriación para cada materia
-                        materias_a_cursar = []
-                        for id_materia in materias_pendientes_cuatrimestre:
-                            if self.verificar_prerequisitos(id_materia, simulacion_aprobadas):
-                                materias_a_cursar.append(id_materia)
-                        
-                        # Simular horario con todas estas materias
-                        if materias_a_cursar:
-                            carga_cuatrimestre = self.simular_planificacion_cuatrimestre(
-                                estudiante_simulado, 
-                                materias_a_cursar, 
-                                cuatrimestre_planificacion
-                            )
-                            
-                            # Añadir al plan completo
-                            plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = carga_cuatrimestre
-                            
-                            # Actualizar materias "aprobadas" para la simulación
-                            for materia_inscrita in carga_cuatrimestre["materias_inscritas"]:
-                                id_materia = materia_inscrita["id_materia"]
-                                simulacion_aprobadas.add(id_materia)
-                                
-                                # Actualizar inscripciones simuladas
-                                estudiante_simulado.inscripciones_simuladas.append(id_materia)
-                                
-                                # Eliminar de pendientes
-                                for cuatri in list(materias_pendientes_por_cuatrimestre.keys()):
-                                    if id_materia in materias_pendientes_por_cuatrimestre[cuatri]:
-                                        materias_pendientes_por_cuatrimestre[cuatri].remove(id_materia)
-                                        total_materias_pendientes -= 1
-                        else:
-                            plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = {
-                                "cuatrimestre": cuatrimestre_planificacion,
-                                "materias_inscritas": [],
-                                "creditos_totales": 0,
-                                "num_materias": 0,
-                                "advertencia": "No hay materias disponibles para este cuatrimestre debido a seriaciones"
-                            }
-                    else:
-                        plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = {
-                            "cuatrimestre": cuatrimestre_planificacion,
-                            "materias_inscritas": [],
-                            "creditos_totales": 0,
-                            "num_materias": 0,
-                            "advertencia": "No hay materias pendientes para este cuatrimestre"
-                        }
+                # Una estadía se cursa sola en su cuatrimestre
+                if self.materias[materias_a_cursar[0]].tipo == "Estadía":
+                    carga_cuatrimestre = self._carga_estadia(materias_a_cursar[0], cuatrimestre_planificacion)
+                elif grupos_reales:
+                    carga_cuatrimestre = cargas_reales[cuatrimestre_planificacion]
                 else:
-                    # Para irregulares, seguimos con la lógica original más flexible
-                    # Obtener materias disponibles con restricciones
-                    materias_disponibles = []
-                    for id_materia, materia in self.materias.items():
-                        # No considerar materias ya aprobadas en simulación
-                        if id_materia in simulacion_aprobadas:
-                            continue
-                        
-                        # No considerar materias de cuatrimestres futuros
-                        if materia.cuatrimestre > cuatrimestre_planificacion:
-                            continue
-                        
-                        # Verificar seriación y prerrequisitos
-                        if self.verificar_prerequisitos(id_materia, simulacion_aprobadas):
-                            materias_disponibles.append(id_materia)
-                    
-                    if materias_disponibles:
-                        # Priorizar materias para irregulares
-                        materias_priorizadas = self.priorizar_materias(
-                            materias_disponibles, estudiante_simulado, cuatrimestre_planificacion
-                        )
-                        
-                        # Limitar a 5 materias para irregulares
-                        materias_a_cursar = materias_priorizadas[:7]
-                        
-                        # Simular la planificación
-                        carga_cuatrimestre = self.simular_planificacion_cuatrimestre(
-                            estudiante_simulado, 
-                            materias_a_cursar, 
-                            cuatrimestre_planificacion
-                        )
-                        
-                        # Añadir al plan completo
-                        if carga_cuatrimestre and carga_cuatrimestre.get("materias_inscritas"):
-                            plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = carga_cuatrimestre
-                            
-                            # Actualizar materias "aprobadas" para la simulación
-                            for materia_inscrita in carga_cuatrimestre["materias_inscritas"]:
-                                id_materia = materia_inscrita["id_materia"]
-                                simulacion_aprobadas.add(id_materia)
-                                
-                                # Actualizar inscripciones simuladas
-                                estudiante_simulado.inscripciones_simuladas.append(id_materia)
-                                
-                                # Eliminar de pendientes
-                                for cuatri in list(materias_pendientes_por_cuatrimestre.keys()):
-                                    if id_materia in materias_pendientes_por_cuatrimestre[cuatri]:
-                                        materias_pendientes_por_cuatrimestre[cuatri].remove(id_materia)
-                                        total_materias_pendientes -= 1
-                        else:
-                            plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = {
-                                "cuatrimestre": cuatrimestre_planificacion,
-                                "materias_inscritas": [],
-                                "creditos_totales": 0,
-                                "num_materias": 0,
-                                "advertencia": "No se pudieron planificar materias para este cuatrimestre"
-                            }
-                    else:
-                        plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = {
-                            "cuatrimestre": cuatrimestre_planificacion,
-                            "materias_inscritas": [],
-                            "creditos_totales": 0,
-                            "num_materias": 0,
-                            "advertencia": "No hay materias disponibles para este cuatrimestre"
-                        }
-                
-                # Limpiar listas vacías de materias pendientes
-                materias_pendientes_por_cuatrimestre = {
-                    c: materias for c, materias in materias_pendientes_por_cuatrimestre.items() 
-                    if materias
-                }
+                    carga_cuatrimestre = self.simular_planificacion_cuatrimestre(
+                        estudiante_simulado,
+                        list(materias_a_cursar),
+                        cuatrimestre_planificacion
+                    )
+                plan_completo["plan_por_cuatrimestre"][cuatrimestre_planificacion] = carga_cuatrimestre
                 
-                # Avanzar al siguiente cuatrimestre
-                cuatrimestre_planificacion += 1
+                # Actualizar materias "aprobadas" para la simulación
+                for materia_inscrita in carga_cuatrimestre["materias_inscritas"]:
+                    estudiante_simulado.materias_aprobadas.add(materia_inscrita["id_materia"])
+                    estudiante_simulado.inscripciones_simuladas.append(materia_inscrita["id_materia"])
             
-            # Verificar si alcanzamos el máximo de ciclos (posible ciclo infinito)
-            if ciclo_actual >= max_ciclos:
-                plan_completo["advertencia"] = "Se alcanzó el máximo de iteraciones en la planificación"
+            if plan.no_planificables:
+                plan_completo["advertencia"] = (f"Las materias {list(plan.no_planificables)} no se pueden planificar "
+                                                f"porque sus requisitos no pueden cumplirse")
+            elif cuatrimestre_actual + plan.num_cuatrimestres - 1 > MAX_CUATRIMESTRES:
+                plan_completo["advertencia"] = f"El plan excede el máximo de {MAX_CUATRIMESTRES} cuatrimestres"
             
             # Actualizar estadísticas finales
             plan_completo["cuatrimestres_restantes"] = len(plan_completo["plan_por_cuatrimestre"])
+            plan_completo["cota_inferior_cuatrimestres"] = plan.cota_inferior
+            plan_completo["plan_optimo"] = plan.es_optimo
             plan_completo["fecha_estimada_graduacion"] = self.calcular_fecha_graduacion(cuatrimestre_actual, plan_completo["cuatrimestres_restantes"])
-            plan_completo["estadisticas"]["materias_pendientes"] = total_materias_pendientes
-            plan_completo["estadisticas"]["porcentaje_avance"] = round(len(materias_aprobadas) / max(1, (len(materias_aprobadas) + total_materias_pendientes)) * 100, 2)
+            plan_completo["estadisticas"]["materias_pendientes"] = len(plan.no_planificables)
+            plan_completo["estadisticas"]["porcentaje_avance"] = round(len(materias_aprobadas) / max(1, (len(materias_aprobadas) + len(plan.no_planificables))) * 100, 2)
             
             return plan_completo
         except Exception as e:
@@ -1470,17 +1074,115 @@ class Optimizador:
                     "porcentaje_avance": 0
                 }
             }
+    
+    def planificar_con_grupos_reales(self, estudiante, plan, en_procesos=None, tamano_poblacion=100,
+                                     num_generaciones=30):
+        """Optimiza con grupos reales el horario de cada cuatrimestre de un plan de trayectoria.
+        
+        Las materias de cada cuatrimestre ya están fijas en el plan, así que los
+        cuatrimestres son independientes entre sí. El primero se optimiza con la
+        mitad de la población y de las generaciones de una ejecución normal; su
+        patrón (franja y días, ver preferencias.patron_horario) arranca en caliente
+        a los demás, que se optimizan con la cuarta parte de cada uno y, si se
+        proporciona en_procesos, en paralelo. En total cuesta aproximadamente lo mismo que
+        una ejecución normal del algoritmo genético.
+        
+        Args:
+            estudiante (Estudiante): Estudiante a planificar
+            plan (PlanTrayectoria): Materias por cuatrimestre (ver grafo_plan)
+            en_procesos (callable, optional): Recibe las tareas (argumentos de
+                planificar_cuatrimestre) y devuelve sus cargas calculadas en otros
+                procesos, o None para calcularlas aquí (ver ProcesosTrayectoria.planificar)
+            tamano_poblacion (int): Tamaño de población de una ejecución normal
+            num_generaciones (int): Generaciones de una ejecución normal
+            
+        Returns:
+            dict: Número de cuatrimestre -> carga (como planificar_cuatrimestre), sin
+            los cuatrimestres vacíos ni los de estadía
+        """
+        # Estudiante simulado de cada cuatrimestre, con lo aprobado en los anteriores
+        tareas = []
+        estudiante_simulado = EstudianteSimulado(estudiante)
+        for num_cuatrimestre, materias in plan.por_cuatrimestre():
+            if materias and self.materias[materias[0]].tipo != "Estadía":
+                tareas.append((estudiante_simulado.bifurcar(cuatrimestre=num_cuatrimestre), list(materias), num_cuatrimestre))
+            estudiante_simulado.materias_aprobadas.update(materias)
+        if not tareas:
+            return {}
+        
+        # Primer cuatrimestre: define el patrón para el resto
+        primera = tareas[0]
+        cargas = [self.planificar_cuatrimestre(*primera, tamano_poblacion=max(20, tamano_poblacion // 2),
+                                               num_generaciones=max(5, num_generaciones // 2))]
+        patron = patron_horario(self.grupos, [m["id_grupo"] for m in cargas[0]["materias_inscritas"]]) or None
+        
+        # Resto de los cuatrimestres, arrancados en caliente
+        restantes = [(*tarea, patron, max(20, tamano_poblacion // 4), max(5, num_generaciones // 4))
+                     for tarea in tareas[1:]]
+        cargas_restantes = None
+        if en_procesos is not None and len(restantes) > 1:
+            cargas_restantes = en_procesos(restantes)
+        if cargas_restantes is None:
+            cargas_restantes = [self.planificar_cuatrimestre(*tarea) for tarea in restantes]
+        cargas.extend(cargas_restantes)
+        
+        # Materias del plan que no se pudieron acomodar con los grupos existentes
+        resultado = {}
+        for (_, materias, num_cuatrimestre), carga in zip(tareas, cargas):
+            inscritas = {m["id_materia"] for m in carga["materias_inscritas"]}
+            faltantes = [id_materia for id_materia in materias if id_materia not in inscritas]
+            if faltantes:
+                carga["materias_sin_horario"] = faltantes
+                carga.setdefault("advertencia", f"Sin grupos compatibles con cupo para las materias {faltantes}")
+            resultado[num_cuatrimestre] = carga
+        return resultado
+    
+    def _carga_estadia(self, id_estadia, num_cuatrimestre):
+        """Carga de un cuatrimestre dedicado a una estadía dentro de la trayectoria."""
+        materia_estadia = self.materias[id_estadia]
+        return {
+            "cuatrimestre": num_cuatrimestre,
+            "materias_inscritas": [{
+                "id_materia": id_estadia,
+                "nombre_materia": materia_estadia.nombre,
+                "id_grupo": 0,  # Grupo simulado
+                "profesor": "Por asignar",
+                "creditos": materia_estadia.creditos,
+                "cuatrimestre": materia_estadia.cuatrimestre,
+                "tipo": materia_estadia.tipo,
+                "horarios": []
+            }],
+            "creditos_totales": materia_estadia.creditos,
+            "num_materias": 1,
+            "horario_semanal": {},
+            "carga_por_dia": {1:0, 2:0, 3:0, 4:0, 5:0}
+        }
         
     def optimizar_carga_academica(self, estudiante, tamano_poblacion=100, num_generaciones=30, 
-                         tasa_cruce=0.8, tasa_mutacion=0.2, grupos_disponibles=None):
-        """Ejecuta el algoritmo genético para optimizar la carga académica."""
+                         tasa_cruce=0.8, tasa_mutacion=0.2, grupos_disponibles=None, estadisticas=None,
+                         patron=None):
+        """Ejecuta el algoritmo genético para optimizar la carga académica.
+        
+        Si se proporciona una lista en estadisticas, se le agregan las métricas de
+        diversidad de cada generación (ver Poblacion.metricas).
+        
+        Si se proporciona un patrón (franja y días de otro horario, ver
+        preferencias.patron_horario), la mitad de la población inicial se construye
+        prefiriendo los grupos que lo siguen y con tantas materias como el horario
+        del patrón (arranque en caliente); el fitness no cambia.
+        """
         # Verificar estudiante válido
         if not estudiante:
             print("Error: Estudiante no válido para optimización")
             return []
         
-        # Determinar materias disponibles
-        materias_disponibles = grupos_disponibles or self.get_materias_disponibles(estudiante)
+        # Determinar materias disponibles (los grupos dados se traducen a su materia)
+        if grupos_disponibles is not None:
+            materias_disponibles = list(dict.fromkeys(
+                self.grupos[id_grupo].id_materia for id_grupo in grupos_disponibles
+                if id_grupo in self.grupos))
+        else:
+            materias_disponibles = self.get_materias_disponibles(estudiante)
         if not materias_disponibles:
             print("Advertencia: No hay materias disponibles para el estudiante")
             return []
@@ -1495,9 +1197,13 @@ class Optimizador:
             # Cuando una estadía está disponible, es la única materia que debe cursarse
             mejor_horario = []
             
+            permitidos = set(grupos_disponibles) if grupos_disponibles is not None else None
+            
             # Obtener todos los grupos de la estadía
             for id_estadia in estadias:
                 grupos_estadia = self.materia_a_grupos.get(id_estadia, [])
+                if permitidos is not None:
+                    grupos_estadia = [g for g in grupos_estadia if g in permitidos]
                 
                 # Si hay grupos disponibles, elegir uno (el que tenga menor ocupación)
                 if grupos_estadia:
@@ -1518,25 +1224,31 @@ class Optimizador:
         
         # Si no hay estadías o no se pudo asignar, continuar con el algoritmo genético normal
         
+        # Poda previa: grupos con cupo, compatibilidades y materias excluyentes.
+        # El espacio es local a esta ejecución (el optimizador se comparte entre hilos)
+        espacio = self.construir_espacio_busqueda(estudiante, grupos_disponibles)
+        
+        # Espacios pequeños: búsqueda exacta en lugar del algoritmo genético
+        if not espacio.esta_vacio() and espacio.tamano_estimado() <= self.UMBRAL_BUSQUEDA_EXACTA:
+            return self.optimizar_exacto(estudiante, espacio)
+        
         # Determinar si usar grupos específicos o generar basados en materias disponibles
         if grupos_disponibles is None:
-            if not materias_disponibles:
-                print("Advertencia: No hay materias disponibles para el estudiante")
-                return []
-                
             # Generar población inicial basada en materias disponibles para el estudiante
-            poblacion = self.generar_poblacion_inicial(estudiante, tamano_poblacion)
+            poblacion = self.generar_poblacion_inicial(estudiante, tamano_poblacion, espacio)
         else:
-            # Verificar que grupos_disponibles no esté vacío
-            if not grupos_disponibles:
-                print("Advertencia: No hay grupos disponibles para optimizar")
-                return []
-                
             # Generar población inicial basada en grupos específicos
             poblacion = self.generar_poblacion_inicial_con_grupos(
-                estudiante, tamano_poblacion, grupos_disponibles
+                estudiante, tamano_poblacion, grupos_disponibles, espacio
             )
         
+        # Arranque en caliente: la mitad de la población sigue el patrón indicado
+        pesos_patron = calcular_afinidades(self.grupos, espacio.materia_de_grupo, patron) if patron else {}
+        if pesos_patron and not espacio.esta_vacio():
+            guiados = espacio.generar_poblacion(tamano_poblacion // 2, min_materias=patron.get('num_materias', 2),
+                                                max_materias=self.MAX_MATERIAS, pesos=pesos_patron)
+            poblacion = guiados + poblacion[:tamano_poblacion - len(guiados)]
+        
         # Si no se pudo generar población, retornar horario vacío
         if not poblacion:
             print("Error: No se pudo generar población inicial")
@@ -1548,20 +1260,51 @@ class Optimizador:
             return []
         
         mejor_horario = None
+        mejor_estado = None
         mejor_fitness = 0
         
+        # Cada individuo lleva su EstadoHorario: los hijos parten del estado de su
+        # padre y solo aplican los grupos que cambiaron. La cache de aportes por
+        # grupo, las afinidades y el historial de fitness son locales a esta ejecución.
+        cache_grupos = {}
+        historial_fitness = {}
+        
+        # Afinidad del estudiante con cada grupo candidato, calculada una sola vez:
+        # evaluar un horario solo suma la afinidad de cada uno de sus grupos
+        afinidades = calcular_afinidades(self.grupos, espacio.materia_de_grupo,
+                                         getattr(estudiante, 'preferencias', None))
+        
+        def nuevo_estado(horario):
+            return EstadoHorario(self.grupos, self.materias, estudiante, horario, cache_grupos, afinidades)
+        
+        # Población sin duplicados; los faltantes se completan con individuos nuevos.
+        # Se reservan dos poblaciones (actual y siguiente) que se alternan entre
+        # generaciones: el cruce y la mutación escriben los hijos directamente en
+        # las filas libres de la matriz de genes de la siguiente
+        actual = Poblacion(tamano_poblacion, espacio, historial_fitness)
+        nueva = Poblacion(tamano_poblacion, espacio, historial_fitness)
+        generador = np.random.default_rng(random.getrandbits(64))
+        max_intentos = tamano_poblacion * 2
+        for horario in poblacion:
+            if horario not in actual:
+                actual.agregar(horario, nuevo_estado(horario))
+        self._completar_poblacion(actual, espacio, tamano_poblacion, nuevo_estado)
+        
         # Ejecutar el algoritmo genético por un número limitado de generaciones
         for generacion in range(num_generaciones):
             # Verificar que la población no esté vacía
-            if not poblacion:
+            if not len(actual):
                 print(f"Advertencia: Población vacía en generación {generacion}")
                 break
-                
-            # Calcular fitness para cada individuo
-            fitness = [self.calcular_fitness(estudiante, horario) for horario in poblacion]
+            
+            # Calcular fitness para cada individuo (solo los que no se han evaluado antes)
+            fitness = actual.evaluar()
+            
+            if estadisticas is not None:
+                estadisticas.append({'generacion': generacion, **actual.metricas(fitness)})
             
             # Verificar que haya valores de fitness válidos
-            if not fitness or all(f == 0 for f in fitness):
+            if not fitness.any():
                 print(f"Advertencia: No hay individuos con fitness válido en generación {generacion}")
                 if generacion == 0:  # Si es la primera generación, no hay solución posible
                     return []
@@ -1569,33 +1312,34 @@ class Optimizador:
                     break
             
             # Encontrar el mejor de esta generación
-            if fitness:
-                idx_mejor = fitness.index(max(fitness))
-                if fitness[idx_mejor] > mejor_fitness:
-                    mejor_fitness = fitness[idx_mejor]
-                    mejor_horario = poblacion[idx_mejor].copy()
+            idx_mejor = int(np.argmax(fitness))
+            if fitness[idx_mejor] > mejor_fitness:
+                mejor_fitness = float(fitness[idx_mejor])
+                mejor_horario = actual.horario(idx_mejor)
+                mejor_estado = actual.estados[idx_mejor]
             
-            # Seleccionar padres (con protección contra población vacía)
-            num_padres = max(2, min(tamano_poblacion // 2, len(poblacion)))
-            padres = self.seleccionar_padres(poblacion, fitness, num_padres)
+            # Seleccionar padres (índices de fila en la población)
+            num_padres = max(2, min(tamano_poblacion // 2, len(actual)))
+            padres = self.seleccionar_padres(range(len(actual)), fitness, num_padres)
             
             # Verificar que haya padres seleccionados
             if not padres:
                 print(f"Advertencia: No se seleccionaron padres en generación {generacion}")
                 break
             
-            # Crear nueva generación
-            nueva_poblacion = []
+            # Crear nueva generación en la población libre
+            nueva.vaciar()
+            # Columnas que intercambia cada cruce de la generación, sorteadas de una vez
+            intercambios = generador.random((max_intentos, actual.genes.shape[1])) < 0.5
             
             # Elitismo: mantener al mejor
             if mejor_horario:
-                nueva_poblacion.append(mejor_horario)
+                nueva.agregar(mejor_horario, mejor_estado)
             
             # Cruzar y mutar
             intentos = 0
-            max_intentos = tamano_poblacion * 2
             
-            while len(nueva_poblacion) < tamano_poblacion and intentos < max_intentos:
+            while len(nueva) < tamano_poblacion and intentos < max_intentos:
                 intentos += 1
                 
                 if len(padres) >= 2:
@@ -1603,48 +1347,90 @@ class Optimizador:
                     indices = list(range(len(padres)))
                     if len(indices) >= 2:
                         idx1, idx2 = random.sample(indices, 2)
-                        padre1, padre2 = padres[idx1], padres[idx2]
+                        fila1, fila2 = padres[idx1], padres[idx2]
                     else:
                         # Si solo hay un padre, usarlo dos veces
-                        padre1 = padre2 = padres[0]
+                        fila1 = fila2 = padres[0]
+                    padre1, padre2 = actual.genes[fila1], actual.genes[fila2]
+                    libre1, libre2 = nueva.filas_libres()
+                    hijo1, hijo2 = nueva.genes[libre1], nueva.genes[libre2]
                     
                     # Probabilidad de cruce
-                    if random.random() < tasa_cruce and len(padre1) > 1 and len(padre2) > 1:
+                    if (random.random() < tasa_cruce and len(actual.estados[fila1].horario) > 1
+                            and len(actual.estados[fila2].horario) > 1):
                         try:
-                            hijo1, hijo2 = self.cruzar(padre1, padre2)
+                            self.cruzar(padre1, padre2, hijo1, hijo2, espacio, intercambios[intentos - 1])
                         except Exception as e:
                             print(f"Error en cruce: {e} - Usando padres directamente")
-                            hijo1, hijo2 = padre1.copy(), padre2.copy()
+                            np.copyto(hijo1, padre1)
+                            np.copyto(hijo2, padre2)
                     else:
-                        hijo1, hijo2 = padre1.copy(), padre2.copy()
+                        np.copyto(hijo1, padre1)
+                        np.copyto(hijo2, padre2)
                     
                     # Mutación
                     try:
-                        hijo1 = self.mutar(hijo1, tasa_mutacion, estudiante, grupos_disponibles)
-                        hijo2 = self.mutar(hijo2, tasa_mutacion, estudiante, grupos_disponibles)
+                        self.mutar(hijo1, tasa_mutacion, espacio)
+                        self.mutar(hijo2, tasa_mutacion, espacio)
                     except Exception as e:
                         print(f"Error en mutación: {e}")
                     
-                    nueva_poblacion.append(hijo1)
-                    if len(nueva_poblacion) < tamano_poblacion:
-                        nueva_poblacion.append(hijo2)
+                    # Los hijos repetidos se rechazan
+                    nueva.confirmar_hijo(libre1, actual, fila1)
+                    if len(nueva) < tamano_poblacion:
+                        nueva.confirmar_hijo(libre2, actual, fila2)
                 else:
                     # Si no hay suficientes padres, duplicar los existentes
-                    nueva_poblacion.extend(padres)
+                    for fila in padres:
+                        nueva.copiar_de(actual, fila)
                     break
             
+            # Reemplazar los duplicados rechazados por individuos nuevos del espacio factible
+            self._completar_poblacion(nueva, espacio, tamano_poblacion, nuevo_estado)
+            
             # Verificar que la nueva población no esté vacía
-            if not nueva_poblacion:
+            if not len(nueva):
                 print(f"Advertencia: Nueva población vacía en generación {generacion}")
                 break
                 
-            # Actualizar población
-            poblacion = nueva_poblacion
+            # Actualizar población (la anterior queda libre para la siguiente generación)
+            actual, nueva = nueva, actual
         
         return mejor_horario or []
     
-    def planificar_cuatrimestre(self, estudiante, materias_disponibles, num_cuatrimestre):
-        """Planifica la carga óptima para un cuatrimestre específico."""
+    def _completar_poblacion(self, poblacion, espacio, tamano_poblacion, nuevo_estado):
+        """Completa una población con individuos nuevos del espacio factible.
+        
+        Se hacen pocas rondas: en espacios pequeños puede no haber suficientes
+        horarios distintos y la población se queda con menos individuos.
+        
+        Args:
+            poblacion (Poblacion): Población a completar
+            espacio (EspacioBusqueda): Espacio factible del estudiante
+            tamano_poblacion (int): Tamaño buscado
+            nuevo_estado (callable): Construye el EstadoHorario de un horario
+        """
+        for _ in range(3):
+            faltantes = tamano_poblacion - len(poblacion)
+            if faltantes <= 0:
+                return
+            for horario in espacio.generar_poblacion(faltantes):
+                if horario not in poblacion:
+                    poblacion.agregar(horario, nuevo_estado(horario))
+    
+    def planificar_cuatrimestre(self, estudiante, materias_disponibles, num_cuatrimestre, patron=None,
+                                tamano_poblacion=100, num_generaciones=30):
+        """Planifica la carga óptima para un cuatrimestre específico con los grupos reales.
+        
+        Args:
+            estudiante (Estudiante): Estudiante (o su simulación en ese cuatrimestre)
+            materias_disponibles (list): IDs de las materias a cursar
+            num_cuatrimestre (int): Cuatrimestre planificado
+            patron (dict, optional): Patrón de otro cuatrimestre para arrancar en
+                caliente el algoritmo genético (ver optimizar_carga_academica)
+            tamano_poblacion (int): Tamaño de la población del algoritmo genético
+            num_generaciones (int): Generaciones del algoritmo genético
+        """
         # Verificar que haya materias disponibles
         if not materias_disponibles:
             print(f"Advertencia: No hay materias disponibles para el cuatrimestre {num_cuatrimestre}")
@@ -1664,9 +1450,7 @@ class Optimizador:
         # Creamos un estudiante simulado para este cuatrimestre si es en el futuro
         estudiante_simulado = estudiante
         if num_cuatrimestre > estudiante.cuatrimestre:
-            import copy
-            estudiante_simulado = copy.deepcopy(estudiante)
-            estudiante_simulado.cuatrimestre = num_cuatrimestre
+            estudiante_simulado = EstudianteSimulado(estudiante, cuatrimestre=num_cuatrimestre)
         
         # Obtener grupos disponibles para estas materias
         grupos_disponibles = []
@@ -1691,11 +1475,12 @@ class Optimizador:
         # Usar algoritmo genético para optimizar esta carga
         mejor_horario = self.optimizar_carga_academica(
             estudiante_simulado,
-            tamano_poblacion=100,
-            num_generaciones=30,
+            tamano_poblacion=tamano_poblacion,
+            num_generaciones=num_generaciones,
             tasa_cruce=0.8,
             tasa_mutacion=0.2,
-            grupos_disponibles=grupos_disponibles
+            grupos_disponibles=grupos_disponibles,
+            patron=patron
         )
         
         # Si no se encontró un horario válido o el horario está vacío
@@ -1730,7 +1515,7 @@ class Optimizador:
                         "creditos": materia.creditos,
                         "cuatrimestre": materia.cuatrimestre,
                         "tipo": materia.tipo,
-                        "horarios": grupo.horarios
+                        "horarios": grupo.horarios_formateados()
                     })
                     creditos_totales += materia.creditos
         
@@ -1809,90 +1594,67 @@ class Optimizador:
     
 
     
-    def mutar(self, horario, tasa_mutacion, estudiante, grupos_disponibles=None):
-        """Aplica mutación a un horario con posible limitación de grupos."""
-        if not horario or random.random() > tasa_mutacion:
-            return horario
-        
-        # Elegir grupo a mutar
-        idx_mutar = random.randint(0, len(horario) - 1)
-        id_grupo_actual = horario[idx_mutar]
-        id_materia_actual = self.grupos[id_grupo_actual].id_materia
-        
-        # Determinar grupos disponibles para esta materia
-        if grupos_disponibles:
-            grupos_para_materia = [
-                id_grupo for id_grupo in grupos_disponibles 
-                if self.grupos.get(id_grupo) and self.grupos[id_grupo].id_materia == id_materia_actual
-            ]
-        else:
-            grupos_para_materia = self.materia_a_grupos.get(id_materia_actual, [])
+    def mutar(self, fila, tasa_mutacion, espacio):
+        """Aplica mutación en su lugar a una fila de la matriz de genes de la población.
         
-        # Intentar reemplazar por otro grupo de la misma materia
-        otros_grupos = [id_grupo for id_grupo in grupos_para_materia if id_grupo != id_grupo_actual]
+        Primero intenta cambiar un grupo por otro de la misma materia (misma
+        columna) y, si no es posible, sustituir su materia por una que no esté en
+        el horario (el gen pasa a la columna de la nueva materia). Los grupos
+        permitidos y sus máscaras se toman del espacio de la ejecución (ver
+        construir_espacio_busqueda), así que el costo depende del tamaño del
+        horario y de los grupos de una materia, no del número de grupos candidatos.
         
+        Returns:
+            bool: True si la fila cambió
+        """
+        if random.random() > tasa_mutacion:
+            return False
+        columnas_ocupadas = np.flatnonzero(fila != SIN_GRUPO).tolist()
+        if not columnas_ocupadas:
+            return False
+        
+        mascaras = espacio.mascaras
+        columna_mutar = random.choice(columnas_ocupadas)
+        id_grupo_actual = int(fila[columna_mutar])
+        id_materia_actual = espacio.materias[columna_mutar]
+        resto = [int(fila[columna]) for columna in columnas_ocupadas if columna != columna_mutar]
+        
+        # Horas ocupadas por el resto del horario
+        ocupado = 0
+        for id_grupo in resto:
+            ocupado |= mascaras[id_grupo]
+        
+        # Intentar reemplazar por otro grupo de la misma materia
+        otros_grupos = [id_grupo for id_grupo in espacio.grupos_por_materia[id_materia_actual]
+                        if id_grupo != id_grupo_actual]
         if otros_grupos:
             nuevo_grupo = random.choice(otros_grupos)
-            
-            # Verificar conflictos de horario
-            conflicto = False
-            for id_grupo in horario:
-                if id_grupo != id_grupo_actual and self.hay_conflicto_horario(
-                    self.grupos[nuevo_grupo].horarios, self.grupos[id_grupo].horarios):
-                    conflicto = True
-                    break
-            
-            if not conflicto:
-                horario_mutado = horario.copy()
-                horario_mutado[idx_mutar] = nuevo_grupo
-                return horario_mutado
+            if not mascaras[nuevo_grupo] & ocupado:
+                fila[columna_mutar] = nuevo_grupo
+                return True
         
         # Si no podemos mutar el grupo, intentar reemplazar la materia
-        if grupos_disponibles:
-            # Materias disponibles a través de los grupos disponibles
-            materias_disponibles = set()
-            for id_grupo in grupos_disponibles:
-                grupo = self.grupos.get(id_grupo)
-                if grupo:
-                    materias_disponibles.add(grupo.id_materia)
-        else:
-            materias_disponibles = self.get_materias_disponibles(estudiante)
-        
-        materias_actuales = {self.grupos[id_grupo].id_materia for id_grupo in horario}
-        nuevas_materias = [m for m in materias_disponibles if m not in materias_actuales]
+        materias_actuales = set()
+        excluidas = set()
+        for id_grupo in resto:
+            id_materia = espacio.materia_de_grupo[id_grupo]
+            materias_actuales.add(id_materia)
+            excluidas |= espacio.materias_excluyentes.get(id_materia, set())
+        nuevas_materias = [id_materia for id_materia in espacio.materias
+                           if id_materia != id_materia_actual and id_materia not in materias_actuales
+                           and id_materia not in excluidas]
         
         if nuevas_materias:
             nueva_materia = random.choice(nuevas_materias)
-            
-            if grupos_disponibles:
-                grupos_nuevos = [
-                    id_grupo for id_grupo in grupos_disponibles
-                    if self.grupos.get(id_grupo) and self.grupos[id_grupo].id_materia == nueva_materia
-                ]
-            else:
-                grupos_nuevos = self.materia_a_grupos.get(nueva_materia, [])
-            
-            if grupos_nuevos:
-                random.shuffle(grupos_nuevos)
-                for nuevo_grupo in grupos_nuevos:
-                    # Verificar cupo
-                    if not self.grupos[nuevo_grupo].tiene_cupo():
-                        continue
-                    
-                    # Verificar conflictos de horario
-                    conflicto = False
-                    for id_grupo in horario:
-                        if id_grupo != id_grupo_actual and self.hay_conflicto_horario(
-                            self.grupos[nuevo_grupo].horarios, self.grupos[id_grupo].horarios):
-                            conflicto = True
-                            break
-                    
-                    if not conflicto:
-                        horario_mutado = horario.copy()
-                        horario_mutado[idx_mutar] = nuevo_grupo
-                        return horario_mutado
+            # Los grupos del espacio ya tienen cupo
+            opciones = [id_grupo for id_grupo in espacio.grupos_por_materia[nueva_materia]
+                        if not mascaras[id_grupo] & ocupado]
+            if opciones:
+                fila[columna_mutar] = SIN_GRUPO
+                fila[espacio.columnas[nueva_materia]] = random.choice(opciones)
+                return True
         
-        return horario
+        return False
     
     def calcular_fecha_graduacion(self, cuatrimestre_actual, cuatrimestres_restantes):
         """Calcula la fecha estimada de graduación.
@@ -1950,4 +1712,5 @@ class Optimizador:
         else:
             mes_graduacion = "Diciembre"
         
-        return f"{mes_graduacion} {nuevo_ano}"
\ No newline at end of file
+        return f"{mes_graduacion} {nuevo_ano}"
+
@@ -0,0 +1,401 @@
+"""Planificación de trayectorias como calendarización sobre el grafo del plan de estudios.
+
+El plan de estudios es un grafo dirigido acíclico: cada materia depende de su
+seriación, de las dependencias de proyectos integradores y de las reglas de
+estadía. Planificar la trayectoria de un estudiante es calendarizar sus
+materias pendientes en cuatrimestres con capacidad fija (7 materias), donde
+cada materia no puede cursarse antes de su cuatrimestre en el plan ni antes
+de aprobar sus requisitos, y cada estadía ocupa un cuatrimestre completo.
+
+Las estructuras del grafo (orden topológico, predecesores, descendientes y
+prioridades de ruta crítica) se calculan una vez por versión del catálogo. Por
+estudiante solo se calculan los cuatrimestres más tempranos de sus materias
+pendientes, una cota inferior del número de cuatrimestres y el calendario; si
+el calendario alcanza la cota, es de longitud mínima.
+"""
+
+from itertools import product
+
+from models.conjunto_materias import ConjuntoMaterias
+
+
+class PlanTrayectoria:
+    """Materias a cursar por cuatrimestre hasta la graduación.
+
+    Los planes se comparten entre estudiantes con el mismo historial, por lo que
+    no deben modificarse.
+    """
+
+    __slots__ = ('cuatrimestre_inicial', 'cuatrimestres', 'cota_inferior', 'no_planificables')
+
+    def __init__(self, cuatrimestre_inicial, cuatrimestres, cota_inferior, no_planificables=()):
+        """Crea el plan.
+
+        Args:
+            cuatrimestre_inicial (int): Cuatrimestre del primer elemento de cuatrimestres
+            cuatrimestres (tuple): Tupla de tuplas con los IDs de materia de cada cuatrimestre
+            cota_inferior (int): Mínimo de cuatrimestres con el que es posible graduarse
+            no_planificables (tuple): Materias pendientes que no pueden cursarse (requisitos
+                fuera del catálogo o seriación circular)
+        """
+        self.cuatrimestre_inicial = cuatrimestre_inicial
+        self.cuatrimestres = cuatrimestres
+        self.cota_inferior = cota_inferior
+        self.no_planificables = no_planificables
+
+    @property
+    def num_cuatrimestres(self):
+        return len(self.cuatrimestres)
+
+    @property
+    def es_optimo(self):
+        """Indica si el plan tiene el mínimo de cuatrimestres posible."""
+        return len(self.cuatrimestres) <= self.cota_inferior
+
+    def por_cuatrimestre(self):
+        """Itera (número de cuatrimestre, IDs de materia) en orden."""
+        for desplazamiento, materias in enumerate(self.cuatrimestres):
+            yield self.cuatrimestre_inicial + desplazamiento, materias
+
+
+class GrafoPlanEstudios:
+    """Grafo de requisitos del plan de estudios, calculado una vez por versión del catálogo.
+
+    Los nodos se guardan en orden topológico y se identifican por su posición en
+    ese orden; los conjuntos de nodos son máscaras de bits de INDICE_MATERIAS
+    (ver models.conjunto_materias), igual que las materias aprobadas.
+
+    La prioridad de cada materia es su cola: el mínimo de cuatrimestres que deben
+    transcurrir después de cursarla para completar todas las materias que
+    dependen de ella, considerando la capacidad por cuatrimestre (plazos
+    modificados de Garey y Johnson). Una materia de cola k cursada en el
+    cuatrimestre t impide terminar antes del cuatrimestre t + k.
+    """
+
+    # Máximo de calendarios con estadías fijas que se prueban por estudiante
+    MAX_INTENTOS_ESTADIAS = 256
+
+    # Máximo de planes guardados por historial (se vacía al llenarse)
+    MAX_PLANES_EN_CACHE = 4096
+
+    def __init__(self, materias, dependencias_proyectos, indice, capacidad=7):
+        """Construye el grafo.
+
+        Args:
+            materias (dict): Diccionario de objetos Materia por ID
+            dependencias_proyectos (dict): id_proyecto -> lista de materias dependientes
+            indice (IndiceRequisitos): Máscaras de requisitos del mismo catálogo
+            capacidad (int): Máximo de materias por cuatrimestre
+        """
+        self.capacidad = capacidad
+        bit = indice.bit
+        todas = 0
+        for id_materia in materias:
+            todas |= bit[id_materia]
+
+        # Requisitos de cada materia, incluyendo las reglas de estadía
+        estadias = sorted(indice.estadias, key=lambda id_materia: materias[id_materia].cuatrimestre)
+        requisitos = {}
+        for id_materia, materia in materias.items():
+            mascara = indice.requisitos[id_materia]
+            if id_materia in indice.estadias:
+                mascara |= indice.mascara(dependencias_proyectos.get(id_materia, ()))
+                if materia.cuatrimestre == 6:
+                    # Estadía 1: Proyecto Integrador 2 y sus materias relacionadas
+                    mascara |= (indice.estadia1_disponible | indice.estadia1_verificacion) & todas
+                elif materia.cuatrimestre == 10:
+                    # Estadía 2: cierra la carrera, después de todas las demás materias
+                    mascara |= (indice.proyecto_integrador_3 | indice.no_estadias) & todas
+                # Las estadías se cursan en el orden del plan
+                for id_estadia in estadias:
+                    if materias[id_estadia].cuatrimestre < materia.cuatrimestre:
+                        mascara |= bit[id_estadia]
+            requisitos[id_materia] = mascara & ~bit[id_materia]
+
+        # Orden topológico (Kahn); las materias con seriación circular quedan fuera
+        por_bit = {bit[id_materia]: id_materia for id_materia in materias}
+        sucesores = {id_materia: [] for id_materia in materias}
+        faltantes = {}
+        for id_materia in materias:
+            internos = requisitos[id_materia] & todas
+            faltantes[id_materia] = internos.bit_count()
+            while internos:
+                menor = internos & -internos
+                sucesores[por_bit[menor]].append(id_materia)
+                internos ^= menor
+        listos = [id_materia for id_materia in materias if not faltantes[id_materia]]
+        orden = []
+        while listos:
+            id_materia = listos.pop(0)
+            orden.append(id_materia)
+            for id_sucesor in sucesores[id_materia]:
+                faltantes[id_sucesor] -= 1
+                if not faltantes[id_sucesor]:
+                    listos.append(id_sucesor)
+
+        self.ciclicas = 0
+        if len(orden) < len(materias):
+            circulares = [id_materia for id_materia in materias if faltantes[id_materia]]
+            print(f"Advertencia: las materias {circulares} tienen seriación circular o dependen de ella; "
+                  f"no se planificarán")
+            for id_materia in circulares:
+                self.ciclicas |= bit[id_materia]
+
+        posicion = {id_materia: i for i, id_materia in enumerate(orden)}
+        self.todas = todas & ~self.ciclicas
+        self.ids = orden
+        self.bits = [bit[id_materia] for id_materia in orden]
+        self.requisitos = [requisitos[id_materia] for id_materia in orden]
+        self.externos = [requisitos[id_materia] & ~todas for id_materia in orden]
+        self.con_externos = any(self.externos)
+        self.predecesores = [tuple(posicion[p] for p in self._ids_de(requisitos[id_materia] & todas, por_bit))
+                             for id_materia in orden]
+        self.sucesores = [tuple(posicion[s] for s in sucesores[id_materia] if s in posicion)
+                          for id_materia in orden]
+        self.liberacion = [materias[id_materia].cuatrimestre for id_materia in orden]
+        self.es_estadia = [id_materia in indice.estadias for id_materia in orden]
+        # Capacidad que ocupa cada materia en su cuatrimestre (una estadía lo ocupa completo)
+        self.peso = [capacidad if estadia else 1 for estadia in self.es_estadia]
+
+        # Descendientes de cada nodo
+        self.descendientes = [0] * len(orden)
+        for i in range(len(orden) - 1, -1, -1):
+            mascara = 0
+            for s in self.sucesores[i]:
+                mascara |= self.bits[s] | self.descendientes[s]
+            self.descendientes[i] = mascara
+
+        self._indice_de_bit = {b: i for i, b in enumerate(self.bits)}
+        self.colas = self._calcular_colas(self.todas)
+        self.orden_prioridad = self._ordenar(self.colas)
+        self._planes = {}
+
+    @staticmethod
+    def _ids_de(mascara, por_bit):
+        while mascara:
+            menor = mascara & -mascara
+            yield por_bit[menor]
+            mascara ^= menor
+
+    def _calcular_colas(self, pendientes):
+        """Calcula la cola de cada nodo pendiente considerando solo descendientes pendientes.
+
+        La cola de un nodo es el máximo, sobre los valores c de cola de sus
+        descendientes, de c + ceil(n(c) / capacidad), donde n(c) es la capacidad
+        que ocupan los descendientes con cola >= c; sin descendientes es 0. Solo
+        cuentan los descendientes alcanzables por materias pendientes: una materia
+        aprobada ya no encadena a las que dependen de ella.
+        """
+        bits = self.bits
+        colas = [0] * len(self.ids)
+        descendientes = [0] * len(self.ids)
+        capacidad = self.capacidad
+        indice_de_bit = self._indice_de_bit
+        for i in range(len(self.ids) - 1, -1, -1):
+            if not bits[i] & pendientes:
+                continue
+            mascara = 0
+            for s in self.sucesores[i]:
+                if bits[s] & pendientes:
+                    mascara |= bits[s] | descendientes[s]
+            descendientes[i] = mascara
+            if not mascara:
+                continue
+            ocupado_por_cola = {}
+            while mascara:
+                menor = mascara & -mascara
+                j = indice_de_bit[menor]
+                ocupado_por_cola[colas[j]] = ocupado_por_cola.get(colas[j], 0) + self.peso[j]
+                mascara ^= menor
+            cola = 0
+            ocupado = 0
+            for c in sorted(ocupado_por_cola, reverse=True):
+                ocupado += ocupado_por_cola[c]
+                cola = max(cola, c + -(-ocupado // capacidad))
+            colas[i] = cola
+        return colas
+
+    def _ordenar(self, colas):
+        """Nodos por prioridad: mayor cola, materias antes que estadías, cuatrimestre del plan."""
+        return sorted(range(len(self.ids)),
+                      key=lambda i: (-colas[i], self.es_estadia[i], self.liberacion[i], i))
+
+    def planificar(self, materias_aprobadas, cuatrimestre_inicial):
+        """Calcula el plan de longitud mínima (o cercana a la mínima) de un estudiante.
+
+        Args:
+            materias_aprobadas (ConjuntoMaterias, set or int): Materias aprobadas
+            cuatrimestre_inicial (int): Primer cuatrimestre a planificar
+
+        Returns:
+            PlanTrayectoria: Plan del estudiante (compartido entre historiales iguales)
+        """
+        aprobadas = (materias_aprobadas if isinstance(materias_aprobadas, int)
+                     else ConjuntoMaterias.mascara_de(materias_aprobadas))
+        clave = (aprobadas, cuatrimestre_inicial)
+        plan = self._planes.get(clave)
+        if plan is None:
+            plan = self._planificar(aprobadas, cuatrimestre_inicial)
+            if len(self._planes) >= self.MAX_PLANES_EN_CACHE:
+                self._planes.clear()
+            self._planes[clave] = plan
+        return plan
+
+    def _planificar(self, aprobadas, t0):
+        bits = self.bits
+
+        # Materias pendientes; las que dependen de requisitos imposibles no se planifican
+        pendientes = self.todas & ~aprobadas
+        bloqueadas = self.ciclicas & ~aprobadas
+        if self.con_externos:
+            for i, b in enumerate(bits):
+                if b & pendientes and (self.externos[i] & ~aprobadas or self.requisitos[i] & bloqueadas):
+                    bloqueadas |= b
+                    pendientes &= ~b
+        no_planificables = tuple(ConjuntoMaterias(bits=bloqueadas))
+        nodos = [i for i, b in enumerate(bits) if b & pendientes]
+        if not nodos:
+            return PlanTrayectoria(t0, (), 0, no_planificables)
+
+        # Las colas precalculadas valen si los descendientes de lo pendiente también
+        # están pendientes (no hay materias aprobadas sin sus requisitos)
+        colas = self.colas
+        orden = self.orden_prioridad
+        for i in nodos:
+            if self.descendientes[i] & ~pendientes:
+                colas = self._calcular_colas(pendientes)
+                orden = self._ordenar(colas)
+                break
+
+        # Cuatrimestre más temprano de cada materia pendiente
+        temprano = [0] * len(bits)
+        liberacion = self.liberacion
+        for i in nodos:
+            t = liberacion[i] if liberacion[i] > t0 else t0
+            for p in self.predecesores[i]:
+                if temprano[p] >= t and bits[p] & pendientes:
+                    t = temprano[p] + 1
+            temprano[i] = t
+
+        cota = self._cota_inferior(nodos, temprano, colas, t0)
+
+        # Primero se busca un calendario de longitud igual a la cota; si no se
+        # encuentra, se parte del calendario por listas y se busca uno más corto
+        estadias = [i for i in nodos if self.es_estadia[i]]
+        mejor = None
+        if estadias:
+            mejor = self._calendarizar_con_estadias(pendientes, t0, orden, estadias, temprano, colas, cota)
+        if mejor is None:
+            mejor = self._calendarizar(pendientes, t0, orden)
+            for longitud in range(cota + 1, len(mejor)) if estadias else ():
+                calendario = self._calendarizar_con_estadias(pendientes, t0, orden, estadias,
+                                                             temprano, colas, longitud)
+                if calendario is not None:
+                    mejor = calendario
+                    break
+
+        cuatrimestres = tuple(tuple(self.ids[i] for i in materias) for materias in mejor)
+        return PlanTrayectoria(t0, cuatrimestres, cota, no_planificables)
+
+    def _cota_inferior(self, nodos, temprano, colas, t0):
+        """Mínimo de cuatrimestres para cursar los nodos pendientes.
+
+        Para cada par (r, q), las materias que no pueden cursarse antes del
+        cuatrimestre r y tienen cola >= q deben caber entre r y el último
+        cuatrimestre menos q: r - t0 + q + estadías + ceil(materias / capacidad).
+        Con una sola materia es la ruta crítica (cuatrimestre temprano + cola).
+        """
+        # Capacidad ocupada por cuatrimestre temprano y cola
+        ocupado = {}
+        for i in nodos:
+            clave = (temprano[i], colas[i])
+            ocupado[clave] = ocupado.get(clave, 0) + self.peso[i]
+        tempranos = sorted({r for r, _ in ocupado}, reverse=True)
+        colas_distintas = sorted({q for _, q in ocupado}, reverse=True)
+
+        capacidad = self.capacidad
+        cota = 0
+        # Capacidad acumulada de las materias con temprano >= r, por cola
+        acumulado = dict.fromkeys(colas_distintas, 0)
+        for r in tempranos:
+            total = 0
+            for q in colas_distintas:
+                acumulado[q] += ocupado.get((r, q), 0)
+                total += acumulado[q]
+                if total:
+                    cota = max(cota, r - t0 + q + -(-total // capacidad))
+        return cota
+
+    def _calendarizar(self, pendientes, t0, orden, estadias_fijas=None, ultimo=None):
+        """Calendarización por listas con capacidad por cuatrimestre.
+
+        En cada cuatrimestre se toman, por prioridad, las materias cuyos requisitos
+        se aprobaron en cuatrimestres anteriores y cuyo cuatrimestre del plan ya
+        llegó. Sin estadías fijas, una estadía se cursa cuando es la materia
+        lista de mayor prioridad; con estadías fijas ({cuatrimestre: nodo}), cada
+        una se cursa en su cuatrimestre.
+
+        Returns:
+            list: Lista de listas de nodos por cuatrimestre, o None si una estadía
+            fija no está lista en su cuatrimestre o se rebasa el cuatrimestre ultimo
+        """
+        bits = self.bits
+        requisitos = self.requisitos
+        liberacion = self.liberacion
+        es_estadia = self.es_estadia
+        capacidad = self.capacidad
+        if ultimo is None:
+            ultimo = t0 + len(bits) + max(liberacion, default=0)
+
+        # Nodos pendientes en orden de prioridad; se quitan al calendarizarse
+        candidatos = [i for i in orden if bits[i] & pendientes]
+        calendario = []
+        t = t0
+        while candidatos:
+            if t > ultimo:
+                return None
+            fija = estadias_fijas.get(t) if estadias_fijas else None
+            if fija is not None:
+                if requisitos[fija] & pendientes or liberacion[fija] > t:
+                    return None
+                tomadas = [fija]
+            else:
+                tomadas = []
+                for i in candidatos:
+                    if requisitos[i] & pendientes or liberacion[i] > t:
+                        continue
+                    if es_estadia[i]:
+                        if not tomadas and estadias_fijas is None:
+                            tomadas.append(i)
+                            break
+                        continue
+                    tomadas.append(i)
+                    if len(tomadas) == capacidad:
+                        break
+            if tomadas:
+                for i in tomadas:
+                    pendientes &= ~bits[i]
+                candidatos = [i for i in candidatos if bits[i] & pendientes]
+            calendario.append(tomadas)
+            t += 1
+        return calendario
+
+    def _calendarizar_con_estadias(self, pendientes, t0, orden, estadias, temprano, colas, longitud):
+        """Busca un calendario de la longitud dada probando cuatrimestres para las estadías.
+
+        Cada estadía se prueba entre su cuatrimestre más temprano y el último que
+        deja lugar a su cola; el resto de las materias se calendariza por listas.
+        """
+        ultimo = t0 + longitud - 1
+        ventanas = [range(temprano[i], ultimo - colas[i] + 1) for i in estadias]
+        intentos = 0
+        for cuatrimestres in product(*ventanas):
+            if len(set(cuatrimestres)) < len(cuatrimestres):
+                continue
+            intentos += 1
+            if intentos > self.MAX_INTENTOS_ESTADIAS:
+                break
+            calendario = self._calendarizar(pendientes, t0, orden, dict(zip(cuatrimestres, estadias)), ultimo)
+            if calendario is not None:
+                return calendario
+        return None
@@ -0,0 +1,211 @@
+import numpy as np
+
+# Valor de las posiciones vacías de la matriz de genes (materia sin grupo)
+SIN_GRUPO = -1
+
+
+class Poblacion:
+    """Población del algoritmo genético sin individuos repetidos.
+
+    Los individuos se guardan en una matriz de genes int32 de ancho fijo,
+    reservada una sola vez: una fila por individuo y una columna por materia del
+    espacio de búsqueda, con el ID del grupo elegido para esa materia o
+    SIN_GRUPO. Como cada materia tiene su columna, la fila ya es la forma
+    canónica del horario (dos listas con los mismos grupos en otro orden dan la
+    misma fila) y sus bytes son la clave con la que se rechazan los duplicados.
+    El cruce y la mutación escriben directamente en las filas libres (ver
+    filas_libres y confirmar).
+
+    El fitness se guarda en un vector de NumPy paralelo a las filas, que la
+    selección usa directamente, y el fitness de cada clave en un historial que
+    puede compartirse entre generaciones: un individuo que reaparece no vuelve a
+    evaluarse. La población se reutiliza entre generaciones (ver vaciar).
+    """
+
+    def __init__(self, capacidad, espacio, historial=None):
+        """Reserva una población vacía.
+
+        Args:
+            capacidad (int): Número máximo de individuos
+            espacio (EspacioBusqueda): Espacio de la ejecución; sus materias son las columnas
+            historial (dict, optional): Fitness por clave, compartido entre generaciones
+        """
+        self.capacidad = capacidad
+        self.columnas = espacio.columnas
+        self.materia_de_grupo = espacio.materia_de_grupo
+        # Una fila más que la capacidad: el segundo hijo de un cruce siempre tiene dónde escribirse
+        self.genes = np.full((capacidad + 1, len(espacio.materias)), SIN_GRUPO, dtype=np.int32)
+        self.fitness = np.zeros(capacidad, dtype=np.float64)
+        self.estados = [None] * capacidad
+        self.claves = [None] * capacidad
+        self.historial = historial if historial is not None else {}
+        self._indices = {}
+        self.vaciar()
+
+    def vaciar(self):
+        """Quita todos los individuos conservando la memoria reservada y el historial.
+
+        Las filas no se borran: quien escribe en una fila libre la escribe completa.
+        """
+        self.tamano = 0
+        self._indices.clear()
+        self.duplicados_rechazados = 0
+        self.evaluaciones = 0
+
+    def __len__(self):
+        return self.tamano
+
+    def __contains__(self, horario):
+        return self._codificar(horario) in self._indices
+
+    def llena(self):
+        """Indica si ya no caben más individuos."""
+        return self.tamano >= self.capacidad
+
+    def filas_libres(self):
+        """Devuelve los índices de las dos siguientes filas libres (para los hijos de un cruce)."""
+        return self.tamano, self.tamano + 1
+
+    def escribir(self, fila, horario):
+        """Escribe un horario (lista de IDs de grupo) en una fila de la matriz."""
+        genes = self.genes[fila]
+        genes.fill(SIN_GRUPO)
+        if horario:
+            genes[[self.columnas[self.materia_de_grupo[id_grupo]] for id_grupo in horario]] = horario
+
+    def _codificar(self, horario):
+        """Escribe un horario en la siguiente fila libre y devuelve su clave."""
+        self.escribir(self.tamano, horario)
+        return self.genes[self.tamano].tobytes()
+
+    def confirmar(self, fila, estado):
+        """Incorpora a la población el individuo escrito en una fila libre.
+
+        Args:
+            fila (int): Fila libre donde se escribió el individuo (ver filas_libres)
+            estado (EstadoHorario): Estado del horario, usado para evaluarlo y derivar hijos
+
+        Returns:
+            bool: True si se agregó; False si era un duplicado o la población está llena
+        """
+        clave = self.genes[fila].tobytes()
+        if clave in self._indices:
+            self.duplicados_rechazados += 1
+            return False
+        if self.llena():
+            return False
+
+        if fila != self.tamano:
+            self.genes[self.tamano] = self.genes[fila]
+        self._indices[clave] = self.tamano
+        self.estados[self.tamano] = estado
+        self.claves[self.tamano] = clave
+        self.tamano += 1
+        return True
+
+    def confirmar_hijo(self, fila, padres, fila_padre):
+        """Incorpora un hijo escrito en una fila libre derivando su estado del de su padre.
+
+        El estado del padre se reutiliza si el hijo tiene los mismos genes; si no,
+        se copia y se le aplican solo los grupos que cambiaron. Los duplicados se
+        rechazan antes de derivar el estado.
+
+        Args:
+            fila (int): Fila libre donde se escribió el hijo
+            padres (Poblacion): Población del padre
+            fila_padre (int): Fila del padre en esa población
+
+        Returns:
+            bool: True si se agregó, False si no (ver confirmar)
+        """
+        clave = self.genes[fila].tobytes()
+        if clave in self._indices:
+            self.duplicados_rechazados += 1
+            return False
+
+        estado = padres.estados[fila_padre]
+        if clave != padres.claves[fila_padre]:
+            estado = estado.copiar()
+            estado.transformar_en(self.horario(fila))
+        return self.confirmar(fila, estado)
+
+    def agregar(self, horario, estado):
+        """Agrega un individuo dado como lista de IDs de grupo si no está ya en la población.
+
+        Returns:
+            bool: True si se agregó, False si no (ver confirmar)
+        """
+        self.escribir(self.tamano, horario)
+        return self.confirmar(self.tamano, estado)
+
+    def copiar_de(self, otra, fila):
+        """Agrega el individuo de una fila de otra población (con su estado).
+
+        Returns:
+            bool: True si se agregó, False si no (ver confirmar)
+        """
+        self.genes[self.tamano] = otra.genes[fila]
+        return self.confirmar(self.tamano, otra.estados[fila])
+
+    def horario(self, fila):
+        """Devuelve el horario de una fila como lista nueva de IDs de grupo."""
+        genes = self.genes[fila]
+        return genes[genes != SIN_GRUPO].tolist()
+
+    def evaluar(self):
+        """Calcula el fitness de cada individuo, reutilizando el historial.
+
+        Returns:
+            numpy.ndarray: Vista del vector de fitness (un valor por individuo)
+        """
+        fitness = self.fitness
+        for fila in range(self.tamano):
+            clave = self.claves[fila]
+            valor = self.historial.get(clave)
+            if valor is None:
+                valor = self.estados[fila].fitness()
+                self.historial[clave] = valor
+                self.evaluaciones += 1
+            fitness[fila] = valor
+        return fitness[:self.tamano]
+
+    def metricas(self, fitness=None):
+        """Calcula métricas de diversidad de la población con NumPy sobre la matriz de genes.
+
+        Args:
+            fitness (numpy.ndarray, optional): Fitness de los individuos (resultado de evaluar())
+
+        Returns:
+            dict: tamano, duplicados_rechazados, evaluaciones, evaluaciones_totales
+                (tamaño del historial), grupos_distintos, diversidad (grupos
+                distintos entre grupos totales), distancia_media (distancia de
+                Jaccard promedio al mejor individuo) y, si se da el fitness,
+                fitness_maximo y fitness_promedio
+        """
+        genes = self.genes[:self.tamano]
+        ocupados = genes != SIN_GRUPO
+        total_grupos = int(ocupados.sum())
+        grupos_distintos = int(np.unique(genes[ocupados]).size)
+
+        distancia_media = 0.0
+        if self.tamano:
+            indice_mejor = int(np.argmax(fitness)) if fitness is not None and len(fitness) else 0
+            # Un grupo solo puede estar en la columna de su materia: basta comparar columna a columna
+            comunes = ((genes == genes[indice_mejor]) & ocupados).sum(axis=1)
+            union = ocupados.sum(axis=1) + int(ocupados[indice_mejor].sum()) - comunes
+            distancias = np.where(union > 0, 1 - comunes / np.maximum(union, 1), 0.0)
+            distancia_media = float(distancias.mean())
+
+        metricas = {
+            'tamano': self.tamano,
+            'duplicados_rechazados': self.duplicados_rechazados,
+            'evaluaciones': self.evaluaciones,
+            'evaluaciones_totales': len(self.historial),
+            'grupos_distintos': grupos_distintos,
+            'diversidad': grupos_distintos / total_grupos if total_grupos else 0.0,
+            'distancia_media': distancia_media
+        }
+        if fitness is not None and len(fitness):
+            metricas['fitness_maximo'] = float(fitness.max())
+            metricas['fitness_promedio'] = float(fitness.mean())
+        return metricas
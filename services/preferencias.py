@@ -0,0 +1,151 @@
+"""Afinidad de un estudiante con cada grupo según sus preferencias.
+
+La afinidad de un grupo es un número entre 0 y 1 que combina:
+
+- Hora: fracción de las horas de clase dentro de la franja preferida
+  (mañana, tarde o noche).
+- Días: fracción de las horas de clase en los días preferidos.
+- Profesor: 1 si el profesor del grupo está entre los preferidos.
+
+Los criterios sin preferencia declarada no cuentan y los pesos de los demás se
+reparten entre ellos. Las afinidades se calculan una vez por ejecución para los
+grupos candidatos, de modo que evaluar un horario solo suma un valor por grupo.
+"""
+
+from services.mascaras import hora_a_entero
+
+# Franjas de cada preferencia de hora: [inicio, fin)
+FRANJAS_PREFERENCIA = {
+    'mañana': (6, 12),
+    'tarde': (12, 18),
+    'noche': (18, 23),
+}
+
+# Peso de la afinidad media del horario en el fitness
+PESO_PREFERENCIAS = 0.15
+
+# Peso de cada criterio dentro de la afinidad de un grupo
+PESO_HORA = 0.4
+PESO_DIAS = 0.4
+PESO_PROFESOR = 0.2
+
+
+def afinidad_grupo(grupo, franja, dias_preferidos, profesores_preferidos):
+    """Calcula la afinidad de un grupo con preferencias ya normalizadas.
+
+    Args:
+        grupo (Grupo): Grupo evaluado
+        franja (tuple or None): (hora_inicio, hora_fin) de la franja preferida
+        dias_preferidos (set): Días preferidos (1 = lunes)
+        profesores_preferidos (set): Nombres de profesores preferidos
+
+    Returns:
+        float: Afinidad entre 0 y 1
+    """
+    horas_totales = 0
+    horas_en_franja = 0
+    horas_en_dias = 0
+    for dia, hora_inicio, hora_fin, _ in grupo.horarios or []:
+        try:
+            inicio = hora_a_entero(hora_inicio)
+            fin = hora_a_entero(hora_fin)
+        except (ValueError, TypeError):
+            continue
+        duracion = max(0, fin - inicio)
+        horas_totales += duracion
+        if franja:
+            horas_en_franja += max(0, min(fin, franja[1]) - max(inicio, franja[0]))
+        if dia in dias_preferidos:
+            horas_en_dias += duracion
+
+    puntaje = 0.0
+    pesos = 0.0
+    if franja:
+        puntaje += PESO_HORA * (horas_en_franja / horas_totales if horas_totales else 0.0)
+        pesos += PESO_HORA
+    if dias_preferidos:
+        puntaje += PESO_DIAS * (horas_en_dias / horas_totales if horas_totales else 0.0)
+        pesos += PESO_DIAS
+    if profesores_preferidos:
+        puntaje += PESO_PROFESOR * (1.0 if grupo.profesor in profesores_preferidos else 0.0)
+        pesos += PESO_PROFESOR
+
+    return puntaje / pesos if pesos else 0.0
+
+
+def calcular_afinidades(grupos, ids_grupos, preferencias):
+    """Calcula la afinidad de un estudiante con cada grupo indicado.
+
+    Args:
+        grupos (dict): Diccionario de objetos Grupo por ID
+        ids_grupos (iterable): IDs de los grupos a evaluar
+        preferencias (dict): Preferencias del estudiante (preferencia_hora,
+            dias_preferidos, profesores_preferidos)
+
+    Returns:
+        dict: id_grupo -> afinidad (vacío si el estudiante no tiene preferencias)
+    """
+    if not preferencias:
+        return {}
+
+    franja = FRANJAS_PREFERENCIA.get(str(preferencias.get('preferencia_hora') or '').strip().lower())
+    dias_preferidos = set()
+    for dia in preferencias.get('dias_preferidos') or []:
+        try:
+            dias_preferidos.add(int(dia))
+        except (ValueError, TypeError):
+            continue
+    profesores_preferidos = set(preferencias.get('profesores_preferidos') or [])
+
+    # Sin ningún criterio utilizable las preferencias no afectan al fitness
+    if not (franja or dias_preferidos or profesores_preferidos):
+        return {}
+
+    afinidades = {}
+    for id_grupo in ids_grupos:
+        grupo = grupos.get(id_grupo)
+        if grupo is not None:
+            afinidades[id_grupo] = afinidad_grupo(grupo, franja, dias_preferidos, profesores_preferidos)
+    return afinidades
+
+
+def patron_horario(grupos, horario):
+    """Describe el patrón de un horario en el formato de las preferencias.
+
+    Sirve para arrancar en caliente la optimización de otro cuatrimestre a partir
+    de un horario ya resuelto: la franja con más horas de clase y los días con
+    clases se usan como preferencias para construir parte de la población inicial.
+
+    Args:
+        grupos (dict): Diccionario de objetos Grupo por ID
+        horario (list): IDs de los grupos del horario
+
+    Returns:
+        dict: preferencia_hora, dias_preferidos y num_materias del horario (vacío si
+        el horario no tiene clases)
+    """
+    horas_por_franja = dict.fromkeys(FRANJAS_PREFERENCIA, 0)
+    dias = set()
+    for id_grupo in horario:
+        grupo = grupos.get(id_grupo)
+        if grupo is None:
+            continue
+        for dia, hora_inicio, hora_fin, _ in grupo.horarios or []:
+            try:
+                inicio = hora_a_entero(hora_inicio)
+                fin = hora_a_entero(hora_fin)
+            except (ValueError, TypeError):
+                continue
+            if fin <= inicio:
+                continue
+            dias.add(dia)
+            for nombre, (franja_inicio, franja_fin) in FRANJAS_PREFERENCIA.items():
+                horas_por_franja[nombre] += max(0, min(fin, franja_fin) - max(inicio, franja_inicio))
+
+    if not dias:
+        return {}
+    return {
+        'preferencia_hora': max(horas_por_franja, key=horas_por_franja.get),
+        'dias_preferidos': sorted(dias),
+        'num_materias': len(horario)
+    }
@@ -0,0 +1,111 @@
+import multiprocessing
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+class ProcesosTrayectoria:
+    """Procesos trabajadores de larga vida para planificar trayectorias con grupos reales.
+
+    El conjunto de procesos se crea una vez al iniciar el trabajador del servidor
+    y se reutiliza en todas las peticiones; solo se reemplaza cuando cambia la
+    versión del catálogo activo. Cada proceso recibe el optimizador una sola vez
+    (al iniciar) y después solo las tareas de cada cuatrimestre.
+
+    Los procesos se crean con forkserver cuando está disponible: nunca se hace
+    fork() de un trabajador que ya tiene varios hilos atendiendo peticiones.
+    Entre procesos las materias viajan como listas de IDs (ver
+    ConjuntoMaterias.__reduce__), no como máscaras de bits, cuyas posiciones son
+    propias de cada proceso. Los cupos ocupados que ven los procesos son los del
+    catálogo al crearlos.
+    """
+
+    def __init__(self, procesos, obtener_catalogo):
+        """Inicializa el conjunto de procesos (sin crearlos todavía).
+
+        Args:
+            procesos (int): Número de procesos (1 = sin paralelismo)
+            obtener_catalogo (callable): Devuelve el DataLoader activo
+        """
+        self.procesos = procesos
+        self.obtener_catalogo = obtener_catalogo
+        metodos = multiprocessing.get_all_start_methods()
+        self._contexto = multiprocessing.get_context('forkserver' if 'forkserver' in metodos else 'spawn')
+        self._ejecutor = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Crea los procesos para el catálogo activo (al iniciar el trabajador)."""
+        if self.procesos <= 1:
+            return
+        catalogo = self.obtener_catalogo()
+        with self._lock:
+            ejecutor = self._ejecutor_para(catalogo)
+            # Lanzar ya todos los procesos en lugar de hacerlo en la primera petición
+            futuros = [ejecutor.submit(_sin_operacion) for _ in range(self.procesos)]
+        for futuro in futuros:
+            futuro.result()
+
+    def detener(self):
+        """Termina los procesos trabajadores."""
+        with self._lock:
+            if self._ejecutor is not None:
+                self._ejecutor.shutdown(wait=False)
+            self._ejecutor = None
+            self._version = None
+
+    def planificar(self, catalogo, tareas):
+        """Planifica cuatrimestres de una trayectoria en los procesos trabajadores.
+
+        Args:
+            catalogo (DataLoader): Catálogo con el que se atiende la petición
+            tareas (list): Argumentos de Optimizador.planificar_cuatrimestre por cuatrimestre
+
+        Returns:
+            list: Cargas de cada tarea, o None si deben calcularse en el proceso actual
+            (sin paralelismo o petición atendida con un catálogo que ya se reemplazó)
+        """
+        if self.procesos <= 1 or catalogo is not self.obtener_catalogo():
+            return None
+        # Se encola bajo el lock para que otra petición no cierre el ejecutor entretanto
+        with self._lock:
+            ejecutor = self._ejecutor_para(catalogo)
+            futuros = [ejecutor.submit(_planificar_cuatrimestre_en_proceso, tarea) for tarea in tareas]
+        return [futuro.result() for futuro in futuros]
+
+    def _ejecutor_para(self, catalogo):
+        """Devuelve el ejecutor de la versión del catálogo, reemplazándolo si cambió (con el lock)."""
+        if self._ejecutor is None or self._version != catalogo.version_catalogo:
+            if self._ejecutor is not None:
+                # Las tareas ya encoladas en el ejecutor anterior terminan normalmente
+                self._ejecutor.shutdown(wait=False)
+            self._ejecutor = ProcessPoolExecutor(max_workers=self.procesos, mp_context=self._contexto,
+                                                 initializer=_inicializar_proceso,
+                                                 initargs=(catalogo.obtener_optimizador(),))
+            self._version = catalogo.version_catalogo
+        return self._ejecutor
+
+
+# Optimizador de cada proceso trabajador (se recibe una sola vez al iniciar el proceso)
+_optimizador_proceso = None
+
+
+def _inicializar_proceso(optimizador):
+    """Guarda el optimizador en el proceso trabajador."""
+    global _optimizador_proceso
+    _optimizador_proceso = optimizador
+    # Los procesos creados desde el mismo servidor comparten el estado del generador aleatorio
+    random.seed()
+
+
+def _sin_operacion():
+    """Tarea vacía para lanzar los procesos por adelantado."""
+    return None
+
+
+def _planificar_cuatrimestre_en_proceso(tarea):
+    """Planifica un cuatrimestre de una trayectoria en un proceso trabajador."""
+    estudiante, materias, num_cuatrimestre, patron, tamano_poblacion, num_generaciones = tarea
+    return _optimizador_proceso.planificar_cuatrimestre(estudiante, materias, num_cuatrimestre, patron,
+                                                        tamano_poblacion, num_generaciones)
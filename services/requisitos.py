@@ -0,0 +1,76 @@
+"""Máscaras de requisitos por materia para verificar seriación con operaciones de bits.
+
+Cada materia tiene una posición de bit (ver models.conjunto_materias) y sus
+requisitos se precalculan como una máscara: una materia es elegible si
+(requisitos & ~aprobadas) == 0, sin recorrer su lista de prerrequisitos.
+"""
+
+from models.conjunto_materias import INDICE_MATERIAS, ConjuntoMaterias
+
+# Materias con reglas propias de estadía
+PROYECTO_INTEGRADOR_2 = 35
+PROYECTO_INTEGRADOR_3 = 57
+MATERIAS_RELACIONADAS_PI2 = (32, 33, 34)
+
+
+class IndiceRequisitos:
+    """Máscaras de requisitos del catálogo, calculadas una vez por versión del catálogo."""
+
+    def __init__(self, materias, seriacion, dependencias_proyectos):
+        """Calcula las máscaras.
+
+        Args:
+            materias (dict): Diccionario de objetos Materia por ID
+            seriacion (dict): id_materia -> lista de prerrequisitos
+            dependencias_proyectos (dict): id_proyecto -> lista de materias dependientes
+        """
+        bit = INDICE_MATERIAS.bit
+        mascara = INDICE_MATERIAS.mascara
+
+        # Posiciones en el orden del catálogo
+        self.bit = {id_materia: bit(id_materia) for id_materia in materias}
+
+        # Solo seriación, y seriación más dependencias de proyectos integradores
+        # (también para materias con seriación que no están en el catálogo)
+        self.seriacion = {}
+        self.requisitos = {}
+        for id_materia in list(materias) + [m for m in seriacion if m not in materias]:
+            requisitos = mascara(seriacion.get(id_materia, ()))
+            self.seriacion[id_materia] = requisitos
+            materia = materias.get(id_materia)
+            if materia is not None and materia.tipo == "Proyecto Integrador":
+                requisitos |= mascara(dependencias_proyectos.get(id_materia, ()))
+            self.requisitos[id_materia] = requisitos
+
+        # Materias por cuatrimestre, conservando el orden del catálogo
+        self.por_cuatrimestre = {}
+        for id_materia, materia in materias.items():
+            self.por_cuatrimestre.setdefault(materia.cuatrimestre, []).append(id_materia)
+
+        self.estadias = {id_materia for id_materia, materia in materias.items() if materia.tipo == "Estadía"}
+        self.no_estadias = mascara(id_materia for id_materia in materias if id_materia not in self.estadias)
+
+        # Estadía 1: Proyecto Integrador 2 y sus materias dependientes
+        self.estadia1_disponible = bit(PROYECTO_INTEGRADOR_2) | mascara(
+            dependencias_proyectos.get(PROYECTO_INTEGRADOR_2, ()))
+        self.estadia1_verificacion = bit(PROYECTO_INTEGRADOR_2) | mascara(MATERIAS_RELACIONADAS_PI2)
+        self.proyecto_integrador_3 = bit(PROYECTO_INTEGRADOR_3)
+
+    @staticmethod
+    def mascara(materias_aprobadas):
+        """Máscara de un conjunto de materias aprobadas (ConjuntoMaterias o iterable de IDs)."""
+        return ConjuntoMaterias.mascara_de(materias_aprobadas)
+
+    def cumple_seriacion(self, id_materia, aprobadas):
+        """Indica si la máscara aprobadas incluye todos los prerrequisitos de seriación."""
+        requisitos = self.seriacion.get(id_materia)
+        if requisitos is None:
+            return True
+        return not requisitos & ~aprobadas
+
+    def cumple_requisitos(self, id_materia, aprobadas):
+        """Como cumple_seriacion, incluyendo las dependencias de proyectos integradores."""
+        requisitos = self.requisitos.get(id_materia)
+        if requisitos is None:
+            return True
+        return not requisitos & ~aprobadas
@@ -0,0 +1,134 @@
+"""Operadores de selección vectorizados para los algoritmos genéticos.
+
+Cada operador recibe el vector de fitness de la generación y devuelve, en una
+sola operación de NumPy, los índices de todos los padres seleccionados. Los
+índices pueden repetirse (un individuo puede ser padre varias veces).
+"""
+
+import random
+import numpy as np
+
+
+def _generador(generador):
+    """Devuelve el generador de NumPy a usar.
+
+    Si no se indica uno, se crea con una semilla tomada del módulo random, de modo
+    que random.seed() sigue haciendo reproducible la ejecución completa.
+    """
+    if generador is None:
+        return np.random.default_rng(random.getrandbits(64))
+    return generador
+
+
+def seleccion_torneo(fitness, num_padres, tamano_torneo=3, generador=None):
+    """Selección por torneo: cada padre es el mejor de tamano_torneo individuos al azar.
+
+    Todos los torneos de la generación se sortean juntos (con reemplazo) y el
+    ganador de cada uno se obtiene con argmax sobre el fitness.
+
+    Args:
+        fitness (array-like): Fitness de cada individuo
+        num_padres (int): Número de padres a seleccionar
+        tamano_torneo (int): Participantes por torneo
+        generador (numpy.random.Generator, optional): Generador de números aleatorios
+
+    Returns:
+        numpy.ndarray: Índices de los padres seleccionados
+    """
+    fitness = np.asarray(fitness, dtype=np.float64)
+    if not len(fitness) or num_padres <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    generador = _generador(generador)
+    participantes = generador.integers(0, len(fitness), size=(num_padres, max(1, tamano_torneo)))
+    ganadores = np.argmax(fitness[participantes], axis=1)
+    return participantes[np.arange(num_padres), ganadores]
+
+
+def seleccion_ranking(fitness, num_padres, presion=1.5, generador=None):
+    """Selección por ranking lineal.
+
+    La probabilidad de cada individuo depende solo de su posición al ordenar por
+    fitness: el mejor tiene presion / n y el peor (2 - presion) / n.
+
+    Args:
+        fitness (array-like): Fitness de cada individuo
+        num_padres (int): Número de padres a seleccionar
+        presion (float): Presión selectiva, entre 1.0 (uniforme) y 2.0
+        generador (numpy.random.Generator, optional): Generador de números aleatorios
+
+    Returns:
+        numpy.ndarray: Índices de los padres seleccionados
+    """
+    fitness = np.asarray(fitness, dtype=np.float64)
+    n = len(fitness)
+    if not n or num_padres <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    generador = _generador(generador)
+    if n == 1:
+        return np.zeros(num_padres, dtype=np.intp)
+
+    rangos = np.empty(n, dtype=np.float64)
+    rangos[np.argsort(fitness, kind='stable')] = np.arange(n)  # 0 = peor, n - 1 = mejor
+    probabilidades = ((2 - presion) + 2 * (presion - 1) * rangos / (n - 1)) / n
+    return generador.choice(n, size=num_padres, p=probabilidades / probabilidades.sum())
+
+
+def seleccion_estocastica_universal(fitness, num_padres, generador=None):
+    """Muestreo estocástico universal (SUS).
+
+    Coloca num_padres punteros equiespaciados sobre la ruleta de fitness con un
+    solo número aleatorio, por lo que cada individuo recibe un número de copias
+    muy cercano a su proporción esperada. Si hay fitness negativos se desplazan
+    para que el peor valga cero; si todos valen lo mismo la selección es uniforme.
+
+    Args:
+        fitness (array-like): Fitness de cada individuo
+        num_padres (int): Número de padres a seleccionar
+        generador (numpy.random.Generator, optional): Generador de números aleatorios
+
+    Returns:
+        numpy.ndarray: Índices de los padres seleccionados (en orden de la ruleta)
+    """
+    fitness = np.asarray(fitness, dtype=np.float64)
+    n = len(fitness)
+    if not n or num_padres <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    generador = _generador(generador)
+    pesos = fitness - min(0.0, fitness.min())
+    total = pesos.sum()
+    if total <= 0:
+        pesos = np.ones(n)
+        total = float(n)
+
+    paso = total / num_padres
+    punteros = generador.uniform(0, paso) + paso * np.arange(num_padres)
+    indices = np.searchsorted(np.cumsum(pesos), punteros, side='right')
+    return np.minimum(indices, n - 1)
+
+
+METODOS = {
+    'torneo': seleccion_torneo,
+    'ranking': seleccion_ranking,
+    'sus': seleccion_estocastica_universal,
+}
+
+
+def seleccionar(fitness, num_padres, metodo='torneo', generador=None, **opciones):
+    """Selecciona padres con el método indicado ('torneo', 'ranking' o 'sus').
+
+    Args:
+        fitness (array-like): Fitness de cada individuo
+        num_padres (int): Número de padres a seleccionar
+        metodo (str): Nombre del método de selección
+        generador (numpy.random.Generator, optional): Generador de números aleatorios
+        **opciones: Parámetros propios del método (tamano_torneo, presion)
+
+    Returns:
+        numpy.ndarray: Índices de los padres seleccionados
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método de selección desconocido: {metodo}")
+    return METODOS[metodo](fitness, num_padres, generador=generador, **opciones)
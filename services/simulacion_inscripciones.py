@@ -0,0 +1,211 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from models.grupo import Grupo
+from models.inscripcion import Inscripcion
+from services.optimizador import Optimizador
+
+
+def priorizar_materias(materias, materias_disponibles, max_materias, aleatorio=random):
+    """Prioriza materias para inscripción, dando prioridad a las de cuatrimestres anteriores.
+
+    Args:
+        materias (dict): Diccionario de objetos Materia por ID
+        materias_disponibles (list): IDs de las materias que el estudiante puede cursar
+        max_materias (int): Número máximo de materias a seleccionar
+        aleatorio: Generador de números aleatorios (módulo random o random.Random)
+
+    Returns:
+        list: IDs de las materias seleccionadas
+    """
+    # Agrupar por cuatrimestre
+    materias_por_cuatrimestre = {}
+    for id_materia in materias_disponibles:
+        materia = materias.get(id_materia)
+        if not materia:
+            continue
+        materias_por_cuatrimestre.setdefault(materia.cuatrimestre, []).append(id_materia)
+
+    # Seleccionar materias priorizando las de cuatrimestres anteriores
+    materias_seleccionadas = []
+    for cuatrimestre in sorted(materias_por_cuatrimestre):
+        materias_cuatrimestre = materias_por_cuatrimestre[cuatrimestre]
+        aleatorio.shuffle(materias_cuatrimestre)  # Para variedad
+
+        for id_materia in materias_cuatrimestre:
+            materias_seleccionadas.append(id_materia)
+            if len(materias_seleccionadas) >= max_materias:
+                return materias_seleccionadas
+
+    return materias_seleccionadas
+
+
+class SimuladorInscripciones:
+    """Genera inscripciones simuladas sobre índices compartidos del catálogo.
+
+    La simulación se divide en dos pasos:
+
+    1. Propuesta (independiente por estudiante, paralelizable): materias
+       disponibles, materias seleccionadas y, para cada una, sus grupos en orden
+       aleatorio.
+    2. Asignación (secuencial): recorre las propuestas en orden de estudiante y
+       toma, para cada materia, el primer grupo con cupo cuya máscara de horario
+       no choque con lo ya inscrito. Como el orden de los grupos es aleatorio,
+       esto equivale a elegir al azar entre los grupos válidos.
+
+    Así los cupos solo se consultan y se ocupan en un lugar, y el resultado no
+    depende de cuántos procesos generaron las propuestas.
+    """
+
+    def __init__(self, materias, grupos, seriacion, dependencias_proyectos, materia_a_grupos, mascaras_grupos):
+        """Inicializa el simulador.
+
+        Args:
+            materias (dict): Diccionario de objetos Materia por ID
+            grupos (dict): Diccionario de objetos Grupo por ID
+            seriacion (dict): Prerrequisitos por materia
+            dependencias_proyectos (dict): Dependencias de los proyectos integradores
+            materia_a_grupos (dict): Índice id_materia -> lista de IDs de grupo
+            mascaras_grupos (dict): Índice id_grupo -> máscara de horario
+        """
+        self.materias = materias
+        self.grupos = grupos
+        self.materia_a_grupos = materia_a_grupos
+        self.mascaras_grupos = mascaras_grupos
+        self.optimizador = Optimizador(materias, grupos, seriacion, dependencias_proyectos,
+                                       materia_a_grupos=materia_a_grupos,
+                                       mascaras_grupos=mascaras_grupos)
+
+    def proponer(self, estudiantes, semilla=None):
+        """Genera las propuestas de inscripción de un conjunto de estudiantes.
+
+        Args:
+            estudiantes (list): Objetos Estudiante, en el orden en que se inscribirán
+            semilla (int, optional): Semilla del generador aleatorio
+
+        Returns:
+            list: Tuplas (id_estudiante, cuatrimestre, [(id_materia, [id_grupo, ...]), ...])
+        """
+        aleatorio = random.Random(semilla)
+        propuestas = []
+
+        for estudiante in estudiantes:
+            # Solo consideramos estudiantes en cuatrimestres activos (1-9)
+            if not 1 <= estudiante.cuatrimestre <= 9:
+                continue
+
+            materias_disponibles = self.optimizador.get_materias_disponibles(estudiante)
+
+            # Regulares: 6-7 materias, Irregulares: 3-5 materias
+            if estudiante.status == "Regular":
+                num_materias = min(len(materias_disponibles), aleatorio.randint(6, 7))
+            else:
+                num_materias = min(len(materias_disponibles), aleatorio.randint(3, 5))
+
+            materias_seleccionadas = priorizar_materias(
+                self.materias, materias_disponibles, num_materias, aleatorio)
+
+            opciones = []
+            for id_materia in materias_seleccionadas:
+                grupos_materia = list(self.materia_a_grupos.get(id_materia, ()))
+                aleatorio.shuffle(grupos_materia)
+                opciones.append((id_materia, grupos_materia))
+
+            propuestas.append((estudiante.id, estudiante.cuatrimestre, opciones))
+
+        return propuestas
+
+    def asignar(self, propuestas, id_inicial=1, fecha_inscripcion="2025-02-01"):
+        """Convierte las propuestas en inscripciones respetando cupos y horarios.
+
+        Actualiza el cupo_actual de los grupos asignados.
+
+        Args:
+            propuestas (list): Resultado de proponer(), en orden de estudiante
+            id_inicial (int): ID de la primera inscripción generada
+            fecha_inscripcion (str): Fecha asignada a las inscripciones
+
+        Returns:
+            list: Objetos Inscripcion generados
+        """
+        # Cupos en variables locales: evita atributos y multiplicaciones en el ciclo
+        cupos = {id_grupo: grupo.cupo_actual for id_grupo, grupo in self.grupos.items()}
+        limites = {id_grupo: grupo.cupo_maximo * Grupo.FACTOR_CUPO for id_grupo, grupo in self.grupos.items()}
+        mascaras = self.mascaras_grupos
+
+        inscripciones = []
+        id_inscripcion = id_inicial
+
+        for id_estudiante, cuatrimestre, opciones in propuestas:
+            ocupado = 0
+            for _, grupos_materia in opciones:
+                for id_grupo in grupos_materia:
+                    mascara = mascaras.get(id_grupo, 0)
+                    if cupos[id_grupo] < limites[id_grupo] and not mascara & ocupado:
+                        break
+                else:
+                    continue  # Ningún grupo válido para esta materia
+
+                ocupado |= mascara
+                cupos[id_grupo] += 1
+                inscripciones.append(Inscripcion(
+                    id_inscripcion=id_inscripcion,
+                    id_estudiante=id_estudiante,
+                    id_grupo=id_grupo,
+                    cuatrimestre=cuatrimestre,
+                    fecha_inscripcion=fecha_inscripcion,
+                    activa=True
+                ))
+                id_inscripcion += 1
+
+        for id_grupo, cupo in cupos.items():
+            self.grupos[id_grupo].cupo_actual = cupo
+
+        return inscripciones
+
+    def simular(self, estudiantes, procesos=1, semilla=None, tamano_lote=2000, id_inicial=1):
+        """Genera inscripciones simuladas para una lista de estudiantes.
+
+        Args:
+            estudiantes (list): Objetos Estudiante
+            procesos (int): Procesos para generar las propuestas (1 = sin paralelismo)
+            semilla (int, optional): Semilla base; cada lote usa semilla + número de lote
+            tamano_lote (int): Estudiantes por lote
+            id_inicial (int): ID de la primera inscripción generada
+
+        Returns:
+            list: Objetos Inscripcion generados
+        """
+        if semilla is None:
+            semilla = random.getrandbits(32)
+
+        # Los lotes y sus semillas no dependen del número de procesos, por lo que
+        # la misma semilla produce las mismas inscripciones con o sin paralelismo
+        lotes = [estudiantes[inicio:inicio + tamano_lote] for inicio in range(0, len(estudiantes), tamano_lote)]
+        semillas = [semilla + i for i in range(len(lotes))]
+
+        if procesos <= 1 or len(lotes) <= 1:
+            resultados = map(self.proponer, lotes, semillas)
+            propuestas = [propuesta for resultado in resultados for propuesta in resultado]
+        else:
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                                     initargs=(self,)) as ejecutor:
+                resultados = ejecutor.map(_proponer_lote, lotes, semillas)
+                propuestas = [propuesta for resultado in resultados for propuesta in resultado]
+
+        # La asignación es secuencial para verificar los cupos sobre el total
+        return self.asignar(propuestas, id_inicial)
+
+
+# Simulador de cada proceso trabajador (se recibe una sola vez al iniciar el proceso)
+_simulador_proceso = None
+
+
+def _inicializar_proceso(simulador):
+    """Guarda el simulador en el proceso trabajador."""
+    global _simulador_proceso
+    _simulador_proceso = simulador
+
+
+def _proponer_lote(estudiantes, semilla):
+    """Genera las propuestas de un lote de estudiantes en un proceso trabajador."""
+    return _simulador_proceso.proponer(estudiantes, semilla)
@@ -0,0 +1,62 @@
+"""Servidor de producción de UNICARGA.
+
+Uso:
+    python servidor.py [--trabajadores N] [--hilos N] [--puerto P]
+
+En sistemas con fork() se usa gunicorn (procesos trabajadores con el catálogo
+precargado); en caso contrario se recurre a waitress, un servidor WSGI en Python
+puro de un solo proceso con varios hilos.
+"""
+import argparse
+import os
+import sys
+
+
+def parsear_argumentos():
+    parser = argparse.ArgumentParser(description="Servidor de producción de UNICARGA")
+    parser.add_argument('--host', help="Dirección de escucha")
+    parser.add_argument('--puerto', type=int, help="Puerto de escucha")
+    parser.add_argument('--trabajadores', type=int, help="Número de procesos trabajadores")
+    parser.add_argument('--hilos', type=int, help="Hilos por trabajador")
+    return parser.parse_args()
+
+
+def main():
+    args = parsear_argumentos()
+
+    # Los argumentos se traducen a variables de entorno para que config.py los lea
+    valores = {
+        'UNICARGA_HOST': args.host,
+        'UNICARGA_PUERTO': args.puerto,
+        'UNICARGA_TRABAJADORES': args.trabajadores,
+        'UNICARGA_HILOS': args.hilos,
+    }
+    for variable, valor in valores.items():
+        if valor is not None:
+            os.environ[variable] = str(valor)
+
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        WSGIApplication = None
+
+    if WSGIApplication is not None and hasattr(os, 'fork'):
+        ruta_config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+        sys.argv = [sys.argv[0], '-c', ruta_config, 'wsgi:app']
+        WSGIApplication("%(prog)s [OPTIONS] [APP_MODULE]").run()
+        return
+
+    import config
+    from waitress import serve
+    from wsgi import app
+    from api.routes import iniciar_procesos_trayectoria, iniciar_vigilancia_catalogo
+
+    iniciar_procesos_trayectoria()
+    iniciar_vigilancia_catalogo()
+
+    print(f"Sirviendo UNICARGA con waitress en {config.HOST}:{config.PUERTO} ({config.HILOS} hilos)")
+    serve(app, host=config.HOST, port=config.PUERTO, threads=config.HILOS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""Pruebas de concurrencia de las inscripciones.
+
+Varios hilos (o procesos, con el almacén SQLite) intentan ocupar los lugares de
+un mismo grupo a la vez: exactamente los lugares del cupo deben concederse, y
+la bitácora de inscripciones debe reproducir el mismo estado al recargar,
+también después de compactarse mientras llegan reservas.
+
+Se ejecutan con: python -m unittest discover tests (o python -m pytest tests)
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from models.grupo import Grupo
+from services.almacen_inscripciones import AlmacenInscripciones
+from services.data_loader import DataLoader
+
+CARPETA_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+ID_GRUPO_PRUEBA = 9001
+CUPO_MAXIMO_PRUEBA = 10
+NUM_HILOS = 24
+
+
+def lugares_del_cupo(cupo_maximo):
+    """Número de reservas que admite un grupo vacío (misma regla que Grupo.tiene_cupo)."""
+    return sum(1 for ocupados in range(10 * cupo_maximo) if ocupados < cupo_maximo * Grupo.FACTOR_CUPO)
+
+
+def reservar_en_hilos(data_loader, id_grupo, estudiantes):
+    """Lanza un hilo por estudiante que reserva un lugar en el grupo; todos arrancan a la vez.
+
+    Returns:
+        list: Inscripciones creadas (las reservas rechazadas por cupo no aparecen)
+    """
+    barrera = threading.Barrier(len(estudiantes))
+    resultados = []
+    errores = []
+    lock = threading.Lock()
+
+    def reservar(id_estudiante):
+        barrera.wait()
+        try:
+            inscripcion = data_loader.reservar_lugar(id_estudiante, id_grupo)
+        except Exception as e:
+            with lock:
+                errores.append(e)
+            return
+        if inscripcion is not None:
+            with lock:
+                resultados.append(inscripcion)
+
+    hilos = [threading.Thread(target=reservar, args=(id_estudiante,)) for id_estudiante in estudiantes]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    if errores:
+        raise errores[0]
+    return resultados
+
+
+def _reservar_en_proceso(argumentos):
+    """Reserva un lugar desde otro proceso con su propia conexión al almacén."""
+    ruta_bd, id_estudiante, id_grupo = argumentos
+    inscripcion, _ = AlmacenInscripciones(ruta_bd).reservar_lugar(id_estudiante, id_grupo, 1)
+    return inscripcion is not None
+
+
+class PruebaInscripcionesConcurrentes(unittest.TestCase):
+    """Reservas simultáneas sobre un grupo con cupo limitado."""
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp(prefix="unicarga_")
+        self.datos = os.path.join(self.carpeta, "data")
+        shutil.copytree(CARPETA_DATOS, self.datos)
+
+    def tearDown(self):
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    def cargar(self, ruta_bd=None):
+        data_loader = DataLoader(self.datos, ruta_bd=ruta_bd)
+        data_loader.cargar_todo()
+        return data_loader
+
+    def agregar_grupo_prueba(self, data_loader):
+        id_materia = next(iter(data_loader.materias))
+        data_loader.agregar_grupo(Grupo(ID_GRUPO_PRUEBA, id_materia, "Profesor de prueba", CUPO_MAXIMO_PRUEBA, 0))
+        return list(data_loader.estudiantes)[:NUM_HILOS]
+
+    def estado_inscripciones(self, data_loader):
+        return {
+            id_inscripcion: (inscripcion.id_estudiante, inscripcion.id_grupo, bool(inscripcion.activa))
+            for id_inscripcion, inscripcion in data_loader._inscripciones_por_id.items()
+        }
+
+    def test_hilos_sin_almacen_ocupan_exactamente_el_cupo(self):
+        data_loader = self.cargar()
+        estudiantes = self.agregar_grupo_prueba(data_loader)
+        lugares = lugares_del_cupo(CUPO_MAXIMO_PRUEBA)
+        self.assertLess(lugares, len(estudiantes))
+
+        reservas = reservar_en_hilos(data_loader, ID_GRUPO_PRUEBA, estudiantes)
+
+        self.assertEqual(len(reservas), lugares)
+        self.assertEqual(len({inscripcion.id for inscripcion in reservas}), lugares)
+        self.assertEqual(data_loader.grupos[ID_GRUPO_PRUEBA].cupo_actual, lugares)
+        self.assertEqual(len(data_loader.inscripciones_activas_por_grupo[ID_GRUPO_PRUEBA]), lugares)
+
+    def test_hilos_con_almacen_ocupan_exactamente_el_cupo(self):
+        ruta_bd = os.path.join(self.carpeta, "inscripciones.db")
+        data_loader = self.cargar(ruta_bd)
+        estudiantes = self.agregar_grupo_prueba(data_loader)
+        lugares = lugares_del_cupo(CUPO_MAXIMO_PRUEBA)
+
+        reservas = reservar_en_hilos(data_loader, ID_GRUPO_PRUEBA, estudiantes)
+
+        self.assertEqual(len(reservas), lugares)
+        self.assertEqual(data_loader.almacen.obtener_cupos()[ID_GRUPO_PRUEBA], lugares)
+        self.assertEqual(len(data_loader.almacen.obtener_inscripciones_grupo(ID_GRUPO_PRUEBA)), lugares)
+
+    def test_procesos_con_almacen_ocupan_exactamente_el_cupo(self):
+        ruta_bd = os.path.join(self.carpeta, "inscripciones.db")
+        almacen = AlmacenInscripciones(ruta_bd)
+        almacen.sincronizar_cupos({ID_GRUPO_PRUEBA: Grupo(ID_GRUPO_PRUEBA, 1, "Profesor de prueba",
+                                                          CUPO_MAXIMO_PRUEBA, 0)})
+        lugares = lugares_del_cupo(CUPO_MAXIMO_PRUEBA)
+
+        argumentos = [(ruta_bd, id_estudiante, ID_GRUPO_PRUEBA) for id_estudiante in range(1, NUM_HILOS + 1)]
+        with ProcessPoolExecutor(max_workers=4) as ejecutor:
+            concedidas = sum(ejecutor.map(_reservar_en_proceso, argumentos))
+
+        self.assertEqual(concedidas, lugares)
+        self.assertEqual(almacen.obtener_cupos()[ID_GRUPO_PRUEBA], lugares)
+        self.assertEqual(len(almacen.obtener_inscripciones_grupo(ID_GRUPO_PRUEBA)), lugares)
+
+    def test_bitacora_reproduce_las_reservas_al_recargar(self):
+        data_loader = self.cargar()
+        estudiantes = self.agregar_grupo_prueba(data_loader)
+        # Compactar cada pocas entradas para que la compactación coincida con las reservas
+        data_loader.bitacora.umbral_compactacion = 3
+
+        reservas = reservar_en_hilos(data_loader, ID_GRUPO_PRUEBA, estudiantes)
+        data_loader.liberar_lugar(reservas[0].id)
+        id_base = next(iter(data_loader._estado_base_inscripciones))
+        data_loader.eliminar_inscripcion(id_base)
+        esperado = self.estado_inscripciones(data_loader)
+
+        recargado = self.cargar()
+        self.assertEqual(self.estado_inscripciones(recargado), esperado)
+        self.assertEqual(len(recargado.inscripciones_activas_por_grupo[ID_GRUPO_PRUEBA]),
+                         lugares_del_cupo(CUPO_MAXIMO_PRUEBA) - 1)
+
+    def test_compactar_conserva_el_estado(self):
+        data_loader = self.cargar()
+        id_grupo = next(id_grupo for id_grupo, grupo in data_loader.grupos.items() if grupo.tiene_cupo())
+        ids_estudiantes = [id_estudiante for id_estudiante in data_loader.estudiantes
+                           if not any(inscripcion.id_grupo == id_grupo
+                                      for inscripcion in data_loader.inscripciones.get(id_estudiante, []))]
+        inscripcion = data_loader.reservar_lugar(ids_estudiantes[0], id_grupo)
+        data_loader.liberar_lugar(inscripcion.id)
+        data_loader.actualizar_inscripcion(inscripcion.id, True)
+        for id_base in list(data_loader._estado_base_inscripciones)[:3]:
+            data_loader.eliminar_inscripcion(id_base)
+        esperado = self.estado_inscripciones(data_loader)
+        cupo_esperado = data_loader.grupos[id_grupo].cupo_actual
+
+        data_loader.compactar_inscripciones()
+        with open(data_loader.bitacora.ruta, encoding="utf-8") as archivo:
+            self.assertEqual(sum(1 for _ in archivo), len(data_loader.entradas_netas_inscripciones()))
+
+        recargado = self.cargar()
+        self.assertEqual(self.estado_inscripciones(recargado), esperado)
+        self.assertEqual(recargado.grupos[id_grupo].cupo_actual, cupo_esperado)
+
+
+if __name__ == '__main__':
+    unittest.main()
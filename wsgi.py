@@ -0,0 +1,8 @@
+"""Punto de entrada WSGI para servidores de producción.
+
+Ejemplo:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app import app
+
+application = app